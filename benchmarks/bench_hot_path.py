@@ -0,0 +1,148 @@
+"""
+Routing hot-path benchmark suite (in-process fake adapters, no network).
+
+    PYTHONPATH=src python benchmarks/bench_hot_path.py                 # run + compare to baseline
+    PYTHONPATH=src python benchmarks/bench_hot_path.py --update-baseline
+    PYTHONPATH=src python benchmarks/bench_hot_path.py -k route --latency lognormal:2,0.5 --error-rate 0.1
+
+Reports ops/s, p50/p95/p99 (µs) and per-op allocations (peak traced bytes,
+retained blocks) for each case. Against benchmarks/baseline.json, a case
+regresses when ops/s drops, or p99 / allocations grow, by more than --tolerance.
+The exit status is 1 on regression. Baselines are machine-specific: refresh them
+on the machine that runs the comparison.
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from harness import FakeAdapter, measure  # noqa: E402
+
+from roaudter_agent import logsink  # noqa: E402
+from roaudter_agent.contracts import TaskEnvelope  # noqa: E402
+from roaudter_agent.health import HealthMonitor  # noqa: E402
+from roaudter_agent.lam_entrypoint import RoaudterComAgent  # noqa: E402
+from roaudter_agent.policy import RouterPolicy  # noqa: E402
+from roaudter_agent.providers.base import ProviderState  # noqa: E402
+from roaudter_agent.router import RouterAgent  # noqa: E402
+
+BASELINE = Path(__file__).with_name("baseline.json")
+NAMES = ["deepseek", "grok", "claude", "gemini", "openai", "ollama", "ollama_cloud"]
+
+
+def _task(intent: str = "chat") -> TaskEnvelope:
+    return TaskEnvelope(task_id="bench", agent="bench", intent=intent, payload={"msg": "ping"})
+
+
+def _providers(args: argparse.Namespace, first_error_rate: float | None = None) -> list[ProviderState]:
+    out = []
+    for i, name in enumerate(NAMES):
+        rate = first_error_rate if (first_error_rate is not None and i == 0) else args.error_rate
+        out.append(ProviderState(FakeAdapter(name, latency=args.latency, error_rate=rate, seed=i)))
+    return out
+
+
+def _router(providers: list[ProviderState]) -> RouterAgent:
+    return RouterAgent(
+        policy=RouterPolicy(default_chain=list(NAMES)),
+        providers=providers,
+        retry_base_backoff_ms=0,
+        retry_max_backoff_ms=0,
+    )
+
+
+def cases(args: argparse.Namespace) -> dict[str, Callable[[], Any]]:
+    route_ok = _router(_providers(args))
+    # hinted head always fails with 503: after warmup its circuit is open, so this is
+    # the steady-state cost of routing around a dead provider
+    route_fallback = _router(_providers(args, first_error_rate=1.0))
+    fallback_task = TaskEnvelope(
+        task_id="bench", agent="bench", intent="chat", payload={"msg": "ping"}, provider_hint="deepseek"
+    )
+    policy = RouterPolicy(default_chain=list(NAMES))
+    providers = _providers(args)
+    health = HealthMonitor()
+    health_p = providers[0]
+    agent = RoaudterComAgent()
+    agent.router = _router(_providers(args))
+    payload = {"task_id": "bench", "msg": "ping", "intent": "chat"}
+    chat, code = _task(), _task("code")
+
+    return {
+        "route.happy": lambda: route_ok.route(chat),
+        "route.fallback": lambda: route_fallback.route(fallback_task),
+        "policy.select_chain": lambda: policy.select_chain(code, providers),
+        "health.is_healthy": lambda: health.is_healthy(health_p),
+        "agent.answer": lambda: agent.answer(payload),
+    }
+
+
+def compare(results: dict[str, dict], baseline: dict[str, dict], tolerance: float) -> list[str]:
+    regressions = []
+    for name, r in results.items():
+        b = baseline.get(name)
+        if not b:
+            continue
+        if r["ops_per_s"] < b["ops_per_s"] * (1 - tolerance):
+            regressions.append(f"{name}: ops/s {r['ops_per_s']} < baseline {b['ops_per_s']}")
+        if r["p99_us"] > b["p99_us"] * (1 + tolerance):
+            regressions.append(f"{name}: p99 {r['p99_us']}us > baseline {b['p99_us']}us")
+        if r["alloc_peak_bytes"] > b["alloc_peak_bytes"] * (1 + tolerance) + 256:
+            regressions.append(f"{name}: alloc {r['alloc_peak_bytes']}B > baseline {b['alloc_peak_bytes']}B")
+    return regressions
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="routing hot-path benchmarks")
+    ap.add_argument("-k", default="", help="only run cases whose name contains this")
+    ap.add_argument("--iterations", type=int, default=5000)
+    ap.add_argument("--latency", default="0", help="fake adapter latency (ms): 0 | const:5 | uniform:1,10 | lognormal:5,0.5")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="fraction of fake adapter calls that fail")
+    ap.add_argument("--tolerance", type=float, default=0.25)
+    ap.add_argument("--baseline", type=Path, default=BASELINE)
+    ap.add_argument("--update-baseline", action="store_true")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+
+    # keep the run hermetic: no env-driven cache/prober, delivery logs to /dev/null
+    for var in ("ROAUDTER_CACHE", "ROAUDTER_HEALTH_PROBE_SECONDS", "ROAUDTER_METRICS_PORT", "ROAUDTER_TRACE"):
+        os.environ.pop(var, None)
+    devnull = open(os.devnull, "w")
+    logsink.set_default_sink(logsink.JsonlSink(devnull))
+
+    results = {}
+    for name, op in cases(args).items():
+        if args.k in name:
+            results[name] = measure(op, iterations=args.iterations)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        cols = ("ops_per_s", "p50_us", "p95_us", "p99_us", "alloc_peak_bytes", "retained_blocks")
+        print(f"{'case':<22}" + "".join(f"{c:>18}" for c in cols))
+        for name, r in results.items():
+            print(f"{name:<22}" + "".join(f"{r[c]:>18}" for c in cols))
+
+    if args.update_baseline:
+        merged = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        merged.update(results)
+        args.baseline.write_text(json.dumps(merged, indent=2, sort_keys=True) + "\n")
+        print(f"baseline written: {args.baseline}")
+        return 0
+
+    if not args.baseline.exists() or args.latency != "0" or args.error_rate:
+        return 0  # baseline is recorded for the default zero-latency, error-free profile
+    regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
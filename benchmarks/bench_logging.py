@@ -0,0 +1,112 @@
+"""
+Per-route logging overhead: legacy import-per-event vs the logsink fast path.
+
+    PYTHONPATH=src python benchmarks/bench_logging.py [--routes N]
+
+Rows (router.route() with an instant in-memory provider, µs/route):
+  no-logging        _emit patched out entirely (floor)
+  legacy/absent     `from lam_logging import log` attempted per event (module missing)
+  fast/absent       logger resolved once; events skipped before kwargs are built
+  fast/filtered     lam_logging present, LAM_LOG_EVENTS excludes router events
+  fast/enabled      lam_logging present (no-op log), all events pass
+Delivery fallback (lam_logging missing, per event, µs):
+  legacy print      print() of a dict repr to /dev/null on the request thread
+  jsonl sink        JsonlSink.put(); JSON encoding + write happen on the sink thread
+"""
+
+from __future__ import annotations
+import argparse
+import os
+import sys
+import time
+import types
+from dataclasses import dataclass
+
+from roaudter_agent import logsink
+from roaudter_agent import router as router_mod
+from roaudter_agent.contracts import TaskEnvelope
+from roaudter_agent.policy import RouterPolicy
+from roaudter_agent.providers.base import ProviderState
+from roaudter_agent.router import RouterAgent
+
+
+@dataclass
+class InstantProvider:
+    name: str = "ollama"
+    def healthcheck(self) -> bool: return True
+    def generate(self, task): return {"text": "pong", "usage": {"total_tokens": 2}}
+
+
+def _legacy_emit(level: str, event: str, msg: str, **fields) -> None:
+    try:
+        from lam_logging import log  # type: ignore
+        log(level, event, msg, **fields)
+    except Exception:
+        return
+
+
+def _time_routes(n: int) -> float:
+    router = RouterAgent(policy=RouterPolicy(default_chain=[]), providers=[ProviderState(InstantProvider())])
+    task = TaskEnvelope(task_id="b", agent="bench", intent="chat", payload={"msg": "ping"})
+    for _ in range(200):
+        router.route(task)
+    t0 = time.perf_counter()
+    for _ in range(n):
+        router.route(task)
+    return (time.perf_counter() - t0) / n * 1e6
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="per-route logging overhead")
+    ap.add_argument("--routes", type=int, default=20_000)
+    args = ap.parse_args()
+    sys.modules.pop("lam_logging", None)
+    orig_emit, orig_on = router_mod._emit, router_mod._log_on
+    rows = []
+
+    router_mod._emit, router_mod._log_on = (lambda *a, **k: None), (lambda level, event: False)
+    rows.append(("no-logging", _time_routes(args.routes)))
+
+    router_mod._emit, router_mod._log_on = _legacy_emit, (lambda level, event: True)
+    rows.append(("legacy/absent", _time_routes(args.routes)))
+
+    router_mod._emit, router_mod._log_on = orig_emit, orig_on
+    logsink.configure()
+    rows.append(("fast/absent", _time_routes(args.routes)))
+
+    fake = types.ModuleType("lam_logging")
+    fake.log = lambda level, event, msg, **fields: None
+    sys.modules["lam_logging"] = fake
+    logsink.configure(events="comm.*")
+    rows.append(("fast/filtered", _time_routes(args.routes)))
+    logsink.configure(events="")
+    rows.append(("fast/enabled", _time_routes(args.routes)))
+    del sys.modules["lam_logging"]
+    logsink.configure()
+
+    floor = rows[0][1]
+    print(f"{'mode':<16} {'us/route':>9} {'overhead_us':>12}")
+    for name, us in rows:
+        print(f"{name:<16} {us:>9.2f} {us - floor:>12.2f}")
+
+    fields = {"recipient": "comm", "status": "ok", "provider_used": "ollama", "latency_ms": 3, "attempts": 1}
+    n = args.routes
+    with open(os.devnull, "w") as devnull:
+        t0 = time.perf_counter()
+        for _ in range(n):
+            print(f"[roaudter.deliver] level=info msg=deliver fields={fields}", file=devnull)
+        legacy = (time.perf_counter() - t0) / n * 1e6
+        sink = logsink.JsonlSink(devnull, max_queue=n + 1)
+        t0 = time.perf_counter()
+        for _ in range(n):
+            sink.put({"event": "roaudter.deliver", "level": "info", "msg": "deliver", **fields})
+        buffered = (time.perf_counter() - t0) / n * 1e6
+        sink.flush()
+        sink.close()
+    print(f"\n{'delivery fallback':<16} {'us/event':>9}")
+    print(f"{'legacy print':<16} {legacy:>9.2f}")
+    print(f"{'jsonl sink':<16} {buffered:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
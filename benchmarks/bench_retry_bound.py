@@ -0,0 +1,195 @@
+"""
+Worst-case latency bound of one failing Ollama provider: legacy vs single retry layer.
+
+Legacy:  the pre-change OllamaAdapter.generate (reproduced below): urllib.request.urlopen
+         with a fixed timeout=60 and no deadline awareness, looped 4x internally
+         (sleeps 0.2/0.6/1.5s); RouterAgent retried the whole thing retry_max_attempts
+         times -> up to 12 HTTP attempts.
+Now:     the adapter makes one HTTP attempt and reports retryable/retry_after_ms;
+         RouterAgent.retry owns backoff, budget and the task deadline.
+
+Both run under the same fault profile on a virtual clock (no real sleeping): every
+HTTP attempt either "hangs" for the full socket timeout it was given and then times
+out, or is refused at once. Each case runs with the router's default retry budget
+and with one large enough that router retries actually stack on the adapter's.
+
+    PYTHONPATH=src python benchmarks/bench_retry_bound.py [--json]
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import os
+import socket
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from roaudter_agent.contracts import TaskEnvelope
+from roaudter_agent.policy import RouterPolicy
+from roaudter_agent.providers.base import ProviderError, ProviderState
+from roaudter_agent.providers.ollama import OllamaAdapter
+from roaudter_agent.retry import RetryPolicy
+from roaudter_agent.router import RouterAgent
+from roaudter_agent.transport import HttpResponse
+
+
+class VirtualClock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += max(0.0, seconds)
+
+
+@dataclass
+class FaultyNetwork:
+    """Every POST burns its whole timeout on the virtual clock and times out, or is refused."""
+    clock: VirtualClock
+    hang: bool = True
+    attempts: int = 0
+
+    def fail(self, timeout: float) -> None:
+        self.attempts += 1
+        if self.hang:
+            self.clock.sleep(timeout)
+            raise socket.timeout("timed out")
+        raise ConnectionRefusedError("refused")
+
+    # roaudter_agent.transport.Transport (current adapter)
+    def request(self, method, url, *, body=None, headers=None, timeout=60.0):
+        if method == "GET":
+            return HttpResponse(200, "OK", {}, b"{}")
+        self.fail(timeout)
+
+    # urllib.request.urlopen (legacy adapter)
+    def urlopen(self, req, timeout=None, **kwargs):
+        self.fail(timeout)
+
+
+@dataclass
+class LegacyOllamaAdapter:
+    """OllamaAdapter.generate before the change, minus the offline test mode."""
+    name: str = "ollama"
+    base_url: str = "http://172.31.80.1:11434"
+    default_model: str = "llama3.2:1b"
+
+    def healthcheck(self) -> bool:
+        return True
+
+    def generate(self, task: TaskEnvelope) -> Any:
+        msg = task.payload.get("msg") or task.payload.get("text") or ""
+        model = task.constraints.get("model") or self.default_model
+        body = {
+            "model": model,
+            "messages": [{"role": "user", "content": msg}],
+            "temperature": task.constraints.get("temperature", 0.2),
+        }
+        req = urllib.request.Request(
+            url=f"{self.base_url}/v1/chat/completions",
+            data=json.dumps(body).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+
+        backoffs = [0.2, 0.6, 1.5]
+        last_exc: Exception | None = None
+        for i, delay in enumerate([0.0] + backoffs):
+            if delay:
+                time.sleep(delay)
+            t0 = time.time()
+            try:
+                with urllib.request.urlopen(req, timeout=60) as r:
+                    data = json.loads(r.read().decode("utf-8"))
+                return {
+                    "provider": "ollama",
+                    "model": model,
+                    "latency_ms": int((time.time() - t0) * 1000),
+                    "text": data["choices"][0]["message"]["content"],
+                    "raw": data,
+                }
+            except urllib.error.HTTPError as e:
+                if e.code == 429 and i < len(backoffs):
+                    last_exc = e
+                    continue
+                raise ProviderError(
+                    f"ollama v1 call failed: HTTP {e.code} {e.reason}",
+                    code="http_error",
+                    http_status=e.code,
+                    retryable=False,
+                    meta={"model": model},
+                ) from e
+            except Exception as e:
+                last_exc = e
+                if i < len(backoffs):
+                    continue
+                raise ProviderError(
+                    f"ollama v1 call failed: {e}",
+                    code="network_error",
+                    retryable=True,
+                    meta={"model": model},
+                ) from e
+        raise ProviderError(f"ollama v1 call failed: {last_exc}", code="unknown_error", retryable=False)
+
+
+def run(legacy: bool, *, hang: bool, deadline_ms: Optional[int], retry_budget_ms: int) -> dict[str, Any]:
+    clock = VirtualClock()
+    net = FaultyNetwork(clock, hang=hang)
+    real_time, real_sleep, real_urlopen = time.time, time.sleep, urllib.request.urlopen
+    time.time, time.sleep, urllib.request.urlopen = clock.time, clock.sleep, net.urlopen
+    try:
+        adapter = LegacyOllamaAdapter() if legacy else OllamaAdapter(transport=net)
+        router = RouterAgent(
+            policy=RouterPolicy(default_chain=[]),
+            providers=[ProviderState(adapter)],
+            retry_budget_ms=retry_budget_ms,
+        )
+        constraints = {"deadline_ms": deadline_ms} if deadline_ms else {}
+        task = TaskEnvelope(task_id="b", agent="bench", intent="chat", payload={"msg": "ping"}, constraints=constraints)
+        t0 = clock.time()
+        res = router.route(task)
+        return {
+            "http_attempts": net.attempts,
+            "router_attempts": res.attempts,
+            "latency_s": round(clock.time() - t0, 3),
+        }
+    finally:
+        time.time, time.sleep, urllib.request.urlopen = real_time, real_sleep, real_urlopen
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--json", action="store_true", help="print machine-readable results")
+    ap.add_argument("--deadline-ms", type=int, default=5000)
+    ap.add_argument("--retry-budget-ms", type=int, default=900_000, help="the large router retry budget")
+    args = ap.parse_args()
+    os.environ["ROAUDTER_OFFLINE_TEST_MODE"] = "0"
+
+    rows = []
+    for scenario, hang in (("socket timeout", True), ("connection refused", False)):
+        for budget in (RetryPolicy().budget_ms, args.retry_budget_ms):
+            for label, legacy in (("legacy", True), ("single-layer", False)):
+                for deadline in (None, args.deadline_ms):
+                    r = run(legacy, hang=hang, deadline_ms=deadline, retry_budget_ms=budget)
+                    rows.append({"scenario": scenario, "retry": label, "budget_ms": budget,
+                                 "deadline_ms": deadline, **r})
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+    print(f"{'scenario':<20} {'retry':<13} {'budget_ms':>9} {'deadline_ms':>11} {'router':>6} {'http':>5} "
+          f"{'worst_latency_s':>16}")
+    for r in rows:
+        print(
+            f"{r['scenario']:<20} {r['retry']:<13} {r['budget_ms']:>9} {str(r['deadline_ms'] or '-'):>11} "
+            f"{r['router_attempts']:>6} {r['http_attempts']:>5} {r['latency_s']:>16}"
+        )
+
+
+if __name__ == "__main__":
+    main()
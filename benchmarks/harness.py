@@ -0,0 +1,139 @@
+"""
+Shared pieces for the benchmarks: in-process fake adapters with configurable
+latency / error distributions, and a measurement loop reporting ops/s,
+p50/p95/p99 and allocations per op (tracemalloc).
+"""
+
+from __future__ import annotations
+import gc
+import random
+import statistics
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from roaudter_agent.contracts import TaskEnvelope
+from roaudter_agent.providers.base import ProviderError
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """
+    Latency distribution in ms -> sampler returning seconds.
+      "0" / "const:5"        fixed
+      "uniform:1,10"         uniform between a and b
+      "lognormal:5,0.5"      median 5ms, sigma 0.5 (heavy right tail)
+    """
+    kind, _, args = spec.partition(":")
+    if not args:
+        kind, args = "const", kind
+    nums = [float(x) for x in args.split(",")]
+    if kind == "const":
+        return lambda rng: nums[0] / 1000.0
+    if kind == "uniform":
+        return lambda rng: rng.uniform(nums[0], nums[1]) / 1000.0
+    if kind == "lognormal":
+        import math
+        mu = math.log(nums[0])
+        return lambda rng: rng.lognormvariate(mu, nums[1]) / 1000.0
+    raise ValueError(f"unknown latency distribution: {spec}")
+
+
+@dataclass
+class FakeAdapter:
+    """
+    ProviderAdapter stand-in. `error_rate` of calls fail; `error_mix` picks the
+    failure by weight: "503" (retryable outage), "429" (rate limited), "400" (fatal).
+    """
+    name: str
+    latency: str = "0"
+    error_rate: float = 0.0
+    error_mix: dict[str, float] = field(default_factory=lambda: {"503": 1.0})
+    seed: int = 0
+    calls: int = 0
+
+    def __post_init__(self) -> None:
+        self._rng = random.Random(self.seed)
+        self._latency = parse_latency(self.latency)
+        self._codes = list(self.error_mix)
+        self._weights = list(self.error_mix.values())
+
+    def healthcheck(self) -> bool:
+        return True
+
+    def generate(self, task: TaskEnvelope) -> Any:
+        self.calls += 1
+        delay = self._latency(self._rng)
+        if delay > 0:
+            time.sleep(delay)
+        if self.error_rate and self._rng.random() < self.error_rate:
+            status = int(self._rng.choices(self._codes, self._weights)[0])
+            raise ProviderError(
+                f"HTTP {status}",
+                code="rate_limited" if status == 429 else "http_error",
+                http_status=status,
+                retryable=status in (429, 503),
+            )
+        return {
+            "provider": self.name,
+            "model": "fake",
+            "text": "pong",
+            "usage": {"prompt_tokens": 4, "completion_tokens": 1, "total_tokens": 5},
+        }
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def measure(
+    op: Callable[[], Any],
+    *,
+    iterations: int,
+    warmup: int = 100,
+    alloc_samples: int = 200,
+    setup: Optional[Callable[[], Any]] = None,
+) -> dict[str, float]:
+    """Time `iterations` calls of op(); then sample per-op allocations under tracemalloc."""
+    if setup is not None:
+        setup()
+    for _ in range(warmup):
+        op()
+
+    gc.collect()
+    samples = []
+    perf = time.perf_counter
+    t_start = perf()
+    for _ in range(iterations):
+        t0 = perf()
+        op()
+        samples.append(perf() - t0)
+    wall = perf() - t_start
+    samples.sort()
+
+    # allocations: peak traced bytes and live blocks per op (separate pass: tracemalloc is slow)
+    tracemalloc.start()
+    try:
+        peaks = []
+        blocks_before = len(tracemalloc.take_snapshot().traces)
+        for _ in range(alloc_samples):
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            op()
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - base)
+        retained = (len(tracemalloc.take_snapshot().traces) - blocks_before) / alloc_samples
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "ops_per_s": round(iterations / wall, 1),
+        "p50_us": round(percentile(samples, 50) * 1e6, 2),
+        "p95_us": round(percentile(samples, 95) * 1e6, 2),
+        "p99_us": round(percentile(samples, 99) * 1e6, 2),
+        "alloc_peak_bytes": int(statistics.median(peaks)),
+        "retained_blocks": round(retained, 2),
+    }
@@ -0,0 +1,200 @@
+"""
+Offline load generator: replays a JSONL workload through the real HTTP path
+(adapters -> PooledTransport -> local stub servers) at a target request rate.
+
+    PYTHONPATH=src python benchmarks/loadgen.py --rps 50 --requests 500
+    PYTHONPATH=src python benchmarks/loadgen.py --workload requests.jsonl --hint best \\
+        --fault deepseek:rate_5xx=0.2,latency_ms=40 --fault grok:rate_429=0.5,retry_after_s=0.05
+
+One StubLLMServer per provider (OpenAI-compatible for deepseek/grok/openai,
+Anthropic for claude, Gemini for gemini, Ollama for ollama/ollama_cloud); the
+default router is pointed at them with dummy API keys. Each workload line is a
+JSON object. The prompt is taken from "msg", "text", "body" or "title". Optional
+fields: "intent", "provider_hint", "constraints". Lines are replayed round-robin.
+--hint applies a profile or provider to lines without a provider_hint. The
+default chat chain starts at ollama.
+
+Open-loop schedule: request i is due at start + i/rps. Latency is measured from
+the due time, so queueing behind a slow router counts (no coordinated omission).
+Reported: throughput, p50/p95/p99/max latency, status and error codes,
+provider share, fallback rate (answer not from selected_chain[0]), retry
+amplification (HTTP POSTs reaching stubs per routed task), injected faults.
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from roaudter_agent.contracts import TaskEnvelope
+from roaudter_agent.registry import build_default_router
+from roaudter_agent.stub_server import StubFaults, StubLLMServer
+
+# provider -> stub key; API key env / base-url env the adapter reads
+STUBS = ("deepseek", "grok", "claude", "gemini", "openai", "ollama")
+KEY_ENVS = ("DEEPSEEK_API_KEY", "GROK_API_KEY", "ANTHROPIC_API_KEY", "GEMINI_API_KEY", "OPENAI_API_KEY")
+
+
+def parse_fault(spec: str) -> tuple[str, StubFaults]:
+    """'grok:rate_429=0.3,retry_after_s=0.1' -> ("grok", StubFaults(...))"""
+    name, _, kv = spec.partition(":")
+    if name not in STUBS:
+        raise SystemExit(f"unknown stub {name!r}; one of {', '.join(STUBS)}")
+    fields: dict[str, Any] = {}
+    for item in filter(None, kv.split(",")):
+        key, _, value = item.partition("=")
+        fields[key.strip()] = int(value) if key.strip() == "seed" else float(value)
+    return name, StubFaults(**fields)
+
+
+def load_workload(path: Path) -> list[dict[str, Any]]:
+    items = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if not line.strip():
+            continue
+        obj = json.loads(line)
+        msg = obj.get("msg") or obj.get("text") or obj.get("body") or obj.get("title")
+        if msg:
+            items.append({**obj, "msg": msg})
+    if not items:
+        raise SystemExit(f"no replayable lines in {path}")
+    return items
+
+
+def _task(i: int, item: dict[str, Any], hint: str | None) -> TaskEnvelope:
+    return TaskEnvelope(
+        task_id=f"load-{i}",
+        agent="loadgen",
+        intent=item.get("intent", "chat"),
+        payload={"msg": item["msg"]},
+        constraints=dict(item.get("constraints") or {}),
+        provider_hint=item.get("provider_hint") or hint,
+    )
+
+
+def _pct(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, int(round(pct / 100.0 * len(values) + 0.5)) - 1))]
+
+
+def run(args: argparse.Namespace) -> dict[str, Any]:
+    faults = dict(parse_fault(f) for f in args.fault)
+    default = StubFaults(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms)
+    stubs = {
+        name: StubLLMServer(reply="pong from " + name, faults=faults.get(name, default), record_bodies=False).start()
+        for name in STUBS
+    }
+    try:
+        for env in KEY_ENVS:
+            os.environ[env] = "loadgen"  # only ever sent to the local stubs
+        os.environ["DEEPSEEK_BASE_URL"] = stubs["deepseek"].base_url + "/v1"
+        os.environ["GROK_BASE_URL"] = stubs["grok"].base_url + "/v1"
+        os.environ["ROAUDTER_OFFLINE_TEST_MODE"] = "0"
+        for var in ("ROAUDTER_CACHE", "ROAUDTER_HEALTH_PROBE_SECONDS"):
+            os.environ.pop(var, None)
+
+        router = build_default_router()
+        for p in router.providers:
+            a = p.adapter
+            if a.name == "claude":
+                a.base_url = stubs["claude"].base_url + "/v1"
+            elif a.name == "gemini":
+                a.base_url = stubs["gemini"].base_url
+            elif a.name == "openai":
+                a.base_url = stubs["openai"].base_url + "/v1"
+            elif a.name in ("ollama", "ollama_cloud"):
+                a.base_url = stubs["ollama"].base_url
+
+        workload = load_workload(args.workload)
+        n = args.requests
+        latencies: list[float] = []
+        results: list[Any] = []
+        lock = threading.Lock()
+
+        def one(i: int, due: float) -> None:
+            res = router.route(_task(i, workload[i % len(workload)], args.hint))
+            done = time.perf_counter()
+            with lock:
+                latencies.append(done - due)
+                results.append(res)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency, thread_name_prefix="loadgen") as pool:
+            for i in range(n):
+                due = start + i / args.rps
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(one, i, due)
+        wall = time.perf_counter() - start
+
+        latencies.sort()
+        status = Counter(r.status for r in results)
+        ok = [r for r in results if r.status == "ok"]
+        fallbacks = sum(1 for r in ok if r.selected_chain and r.provider_used != r.selected_chain[0])
+        posts = sum(sum(1 for q in s.requests if q["method"] == "POST") for s in stubs.values())
+        return {
+            "requests": n,
+            "target_rps": args.rps,
+            "throughput_rps": round(len(results) / wall, 2),
+            "latency_ms": {
+                "p50": round(_pct(latencies, 50) * 1000, 2),
+                "p95": round(_pct(latencies, 95) * 1000, 2),
+                "p99": round(_pct(latencies, 99) * 1000, 2),
+                "max": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+            },
+            "status": dict(status),
+            "error_codes": dict(Counter((r.error or {}).get("code") for r in results if r.status != "ok")),
+            "provider_share": dict(Counter(r.provider_used for r in ok)),
+            "fallback_rate": round(fallbacks / len(ok), 4) if ok else 0.0,
+            "retry_amplification": round(posts / n, 3) if n else 0.0,
+            "router_attempts_per_task": round(sum(r.attempts for r in results) / n, 3) if n else 0.0,
+            "injected": {name: dict(s.injected) for name, s in stubs.items() if any(s.injected.values())},
+        }
+    finally:
+        for s in stubs.values():
+            s.stop()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="replay a JSONL workload against local stub LLM servers")
+    ap.add_argument("--workload", type=Path, default=Path(__file__).resolve().parent.parent / "requests.jsonl")
+    ap.add_argument("--rps", type=float, default=50.0)
+    ap.add_argument("--requests", type=int, default=500)
+    ap.add_argument("--concurrency", type=int, default=64)
+    ap.add_argument("--hint", help="provider_hint for lines without one, e.g. best / fast / deepseek")
+    ap.add_argument("--latency-ms", type=float, default=5.0, help="default stub latency")
+    ap.add_argument("--jitter-ms", type=float, default=5.0, help="default stub latency jitter")
+    ap.add_argument(
+        "--fault", action="append", default=[],
+        help="per-stub faults, e.g. deepseek:rate_5xx=0.2,latency_ms=40 (repeatable)",
+    )
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+
+    report = run(args)
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+        return
+    lat = report["latency_ms"]
+    print(f"requests      {report['requests']} @ target {report['target_rps']} rps")
+    print(f"throughput    {report['throughput_rps']} rps")
+    print(f"latency ms    p50={lat['p50']} p95={lat['p95']} p99={lat['p99']} max={lat['max']}")
+    print(f"status        {report['status']}  errors={report['error_codes']}")
+    print(f"providers     {report['provider_share']}")
+    print(f"fallback rate {report['fallback_rate']}")
+    print(f"retry amp.    {report['retry_amplification']} HTTP/task  ({report['router_attempts_per_task']} router attempts/task)")
+    print(f"injected      {report['injected']}")
+
+
+if __name__ == "__main__":
+    main()
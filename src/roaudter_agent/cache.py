@@ -0,0 +1,185 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Protocol, Tuple
+
+from roaudter_agent import codec
+from roaudter_agent.contracts import TaskEnvelope
+
+
+def cache_key(task: TaskEnvelope) -> str:
+    """
+    Canonical hash of what the adapters actually send upstream
+    (+ what decides who answers: provider hint / profile, intent, cost cap).
+    """
+    payload = task.payload if isinstance(task.payload, dict) else {}
+    constraints = task.constraints or {}
+    material = {
+        "msg": payload.get("msg") or payload.get("text") or "",
+        "model": constraints.get("model") or payload.get("model") or payload.get("llm_model"),
+        "temperature": constraints.get("temperature", 0.2),
+        "max_tokens": constraints.get("max_tokens"),
+        "provider_hint": (task.provider_hint or payload.get("provider_hint") or "").strip().lower() or None,
+        # RouterPolicy.select_chain orders by intent (CODE_INTENTS) and max_cost ("budget")
+        "intent": (task.intent or "").strip().lower() or None,
+        "max_cost": constraints.get("max_cost"),
+    }
+    if payload.get("messages"):
+        material["messages"] = payload["messages"]
+    raw = json.dumps(material, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def is_cacheable(task: TaskEnvelope, *, force: bool = False) -> bool:
+    """
+    Deterministic requests only: temperature <= 0, unless forced
+    (router-wide `force` or constraints["cache"] == "force"). constraints["cache"] = False opts out.
+    """
+    flag = (task.constraints or {}).get("cache")
+    if flag is False:
+        return False
+    if force or flag == "force":
+        return True
+    try:
+        return float((task.constraints or {}).get("temperature", 0.2)) <= 0.0
+    except (TypeError, ValueError):
+        return False
+
+
+class ResponseCache(Protocol):
+    def get(self, key: str) -> Optional[dict]: ...
+    def set(self, key: str, value: dict) -> None: ...
+
+
+class MemoryCache:
+    """
+    In-process LRU with TTL and a byte budget.
+    Values are stored JSON-encoded: size accounting is exact and every hit
+    returns a fresh object (callers can't mutate the cached copy).
+    """
+    def __init__(
+        self,
+        ttl_seconds: float = 300.0,
+        max_bytes: int = 16 * 1024 * 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key -> (expires_at, encoded)
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self.bytes_used = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _drop(self, key: str) -> None:
+        _expires, encoded = self._entries.pop(key)
+        self.bytes_used -= len(encoded)
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, encoded = entry
+            if self._clock() >= expires_at:
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+        return codec.loads(encoded)
+
+    def set(self, key: str, value: dict) -> None:
+        encoded = codec.dumps(value)
+        if len(encoded) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (self._clock() + self.ttl_seconds, encoded)
+            self.bytes_used += len(encoded)
+            while self.bytes_used > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+
+class SqliteCache:
+    """On-disk tier (stdlib sqlite3); survives restarts, shared by processes on one host."""
+    def __init__(self, path: str, ttl_seconds: float = 86400.0) -> None:
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS roaudter_cache (key TEXT PRIMARY KEY, expires_at REAL, value TEXT)"
+        )
+        self._db.commit()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT expires_at, value FROM roaudter_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if time.time() >= row[0]:
+                self._db.execute("DELETE FROM roaudter_cache WHERE key = ?", (key,))
+                self._db.commit()
+                return None
+        return codec.loads(row[1])
+
+    def set(self, key: str, value: dict) -> None:
+        encoded = codec.dumps_str(value)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO roaudter_cache (key, expires_at, value) VALUES (?, ?, ?)",
+                (key, time.time() + self.ttl_seconds, encoded),
+            )
+            self._db.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class TieredCache:
+    """Memory first, then disk; disk hits are promoted into memory."""
+    def __init__(self, memory: MemoryCache, disk: Optional[ResponseCache] = None) -> None:
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key: str) -> Optional[dict]:
+        value = self.memory.get(key)
+        if value is not None or self.disk is None:
+            return value
+        value = self.disk.get(key)
+        if value is not None:
+            self.memory.set(key, value)
+        return value
+
+    def set(self, key: str, value: dict) -> None:
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+
+def cache_from_env() -> Optional[ResponseCache]:
+    """
+    ROAUDTER_CACHE:
+      memory                -> MemoryCache
+      sqlite:/path/cache.db -> MemoryCache in front of SqliteCache
+    unset/empty -> no cache
+    """
+    raw = os.getenv("ROAUDTER_CACHE", "").strip()
+    if not raw:
+        return None
+    if raw.lower() == "memory":
+        return MemoryCache()
+    if raw.lower().startswith("sqlite:"):
+        return TieredCache(MemoryCache(), SqliteCache(raw[len("sqlite:"):]))
+    return None
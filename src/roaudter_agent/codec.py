@@ -0,0 +1,176 @@
+"""
+JSON codec shared by adapters, streaming parsers, the response cache and the log sink.
+
+Backend: orjson, then msgspec, then stdlib json, whichever imports first.
+ROAUDTER_JSON=orjson|msgspec|stdlib forces one; call configure() after changing env.
+All backends decode straight from bytes (no intermediate str) and encode to UTF-8 bytes.
+
+    loads(b)                   -> object
+    dumps(obj)                 -> bytes; non-JSON values become str(value)
+    decode_fields(b, FIELDS)   -> {"text": ..., "usage": ...} without keeping the payload
+
+FIELDS is a tuple of (name, path) pairs; a path is a tuple of dict keys and list
+indexes, e.g. ("choices", 0, "message", "content"). With msgspec only those
+branches are materialised at all; other backends parse fully and drop the rest
+right away, so the full payload is never held past the call.
+"""
+
+from __future__ import annotations
+import json
+import os
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+Path = Tuple[Union[str, int], ...]
+Fields = Tuple[Tuple[str, Path], ...]
+
+OPENAI_FIELDS: Fields = (("text", ("choices", 0, "message", "content")), ("usage", ("usage",)))
+ANTHROPIC_FIELDS: Fields = (("text", ("content", 0, "text")), ("usage", ("usage",)))
+GEMINI_FIELDS: Fields = (
+    ("text", ("candidates", 0, "content", "parts", 0, "text")),
+    ("usage", ("usageMetadata",)),
+)
+
+BACKENDS = ("orjson", "msgspec", "stdlib")
+
+_name: Optional[str] = None
+_loads: Callable[[Union[bytes, str]], Any] = json.loads
+_dumps: Callable[[Any], bytes]
+_field_types: Dict[Fields, Any] = {}
+
+
+def _use_orjson() -> None:
+    import orjson  # type: ignore
+
+    global _loads, _dumps
+    option = orjson.OPT_NON_STR_KEYS
+    _loads = orjson.loads
+    _dumps = lambda obj: orjson.dumps(obj, default=str, option=option)
+
+
+def _use_msgspec() -> None:
+    import msgspec  # type: ignore
+
+    global _loads, _dumps
+    _loads = msgspec.json.Decoder().decode
+    _dumps = msgspec.json.Encoder(enc_hook=str).encode
+
+
+def _use_stdlib() -> None:
+    global _loads, _dumps
+    _loads = json.loads
+    _dumps = lambda obj: json.dumps(obj, default=str, ensure_ascii=False).encode("utf-8")
+
+
+_SETUP = {"orjson": _use_orjson, "msgspec": _use_msgspec, "stdlib": _use_stdlib}
+
+
+def configure(backend: Optional[str] = None) -> str:
+    """(Re)select the backend; explicit arg overrides ROAUDTER_JSON. Returns the one in use."""
+    global _name
+    wanted = (backend if backend is not None else os.getenv("ROAUDTER_JSON", "")).strip().lower()
+    order = [wanted] if wanted in BACKENDS else list(BACKENDS)
+    for name in order + ["stdlib"]:
+        try:
+            _SETUP[name]()
+        except ImportError:
+            continue
+        _name = name
+        break
+    _field_types.clear()
+    return _name  # type: ignore[return-value]
+
+
+def backend() -> str:
+    if _name is None:
+        configure()
+    return _name  # type: ignore[return-value]
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    if _name is None:
+        configure()
+    return _loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    if _name is None:
+        configure()
+    return _dumps(obj)
+
+
+def dumps_str(obj: Any) -> str:
+    return dumps(obj).decode("utf-8")
+
+
+def pick(data: Any, path: Path) -> Any:
+    """Value at `path` in decoded JSON (dicts or msgspec structs); None when any step is missing."""
+    for step in path:
+        if isinstance(step, int):
+            if not isinstance(data, list) or not -len(data) <= step < len(data):
+                return None
+            data = data[step]
+        elif isinstance(data, dict):
+            data = data.get(step)
+        elif isinstance(data, (list, str, int, float)):
+            return None
+        else:
+            data = getattr(data, step, None)  # msgspec Struct
+        if data is None:
+            return None
+    return data
+
+
+def _struct_type(fields: Fields) -> Any:
+    """msgspec Struct tree covering only the branches named by `fields` (cached per spec)."""
+    cached = _field_types.get(fields)
+    if cached is not None:
+        return cached
+    import msgspec  # type: ignore
+
+    tree: Dict[Any, Any] = {}
+    for _, path in fields:
+        node = tree
+        for step in path[:-1]:
+            nxt = node.get(step)
+            if nxt is Any:
+                break  # a shorter path already takes the whole value
+            node = node.setdefault(step, {})
+        else:
+            node[path[-1]] = Any
+
+    counter = [0]
+
+    def build(node: Dict[Any, Any]) -> Any:
+        keys = [k for k in node if isinstance(k, str)]
+        items = [node[k] for k in node if isinstance(k, int)]
+        if items:
+            # list level: every element decoded with the union of the projected shapes
+            merged: Dict[Any, Any] = {}
+            for sub in items:
+                if sub is Any:
+                    return Optional[list]
+                merged.update(sub)
+            return Optional[list[build(merged)]]  # type: ignore[misc]
+        counter[0] += 1
+        return Optional[msgspec.defstruct(  # type: ignore[misc]
+            f"_Fields{counter[0]}",
+            [(k, Any if node[k] is Any else build(node[k]), None) for k in keys],
+        )]
+
+    typ = build(tree)
+    _field_types[fields] = typ
+    return typ
+
+
+def decode_fields(data: Union[bytes, str], fields: Fields) -> Dict[str, Any]:
+    """Only the named fields of a JSON document; missing ones are None."""
+    if backend() == "msgspec":
+        import msgspec  # type: ignore
+
+        try:
+            obj = msgspec.json.decode(data, type=_struct_type(fields))
+        except msgspec.ValidationError:
+            obj = _loads(data)  # unexpected shape (error body, null list): take the slow path
+    else:
+        obj = _loads(data)
+    return {name: pick(obj, path) for name, path in fields}
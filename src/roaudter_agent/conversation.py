@@ -0,0 +1,143 @@
+"""
+Multi-turn conversations.
+
+payload["messages"] = [{"role": "system" | "user" | "assistant", "content": "..."}, ...]
+is accepted next to the single-turn payload["msg"]. task_messages() gives every
+adapter the same normalized list; the vendor helpers below shape it and mark
+the stable prefix for prompt caching:
+  - Anthropic: cache_control breakpoints on the system prompt and on the last
+    turn before the new user message (the next turn re-reads it from cache)
+  - OpenAI-compatible (OpenAI, Grok, DeepSeek): prefix caching is automatic for
+    a byte-identical prefix, so history is sent verbatim and in order
+  - Ollama: keep_alive keeps the model (and its KV cache) loaded between turns
+  - Gemini: "assistant" -> "model" contents, system -> systemInstruction
+
+ConversationStore keeps the history per context trace_id, so a caller can send
+only the new turn: RouterAgent(conversations=...) expands it and records the
+answer.
+"""
+
+from __future__ import annotations
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from roaudter_agent.contracts import TaskEnvelope
+from roaudter_agent.providers.base import ProviderError
+
+ROLES = ("system", "user", "assistant")
+
+Message = Dict[str, str]
+
+
+def task_messages(task: TaskEnvelope) -> List[Message]:
+    """Normalized chat history of the task (payload["messages"], else msg/text as one user turn)."""
+    raw = task.payload.get("messages")
+    if isinstance(raw, list) and raw:
+        out = []
+        for m in raw:
+            if not isinstance(m, dict):
+                continue
+            role = m.get("role")
+            content = m.get("content")
+            if role not in ROLES or not isinstance(content, str) or not content:
+                raise ProviderError(
+                    "payload.messages: each item needs role system/user/assistant and text content",
+                    code="bad_request",
+                    retryable=False,
+                )
+            out.append({"role": role, "content": content})
+        if out:
+            return out
+    msg = task.payload.get("msg") or task.payload.get("text") or ""
+    if not msg:
+        raise ProviderError("empty payload.msg/text", code="bad_request", retryable=False)
+    return [{"role": "user", "content": msg}]
+
+
+def is_multi_turn(messages: List[Message]) -> bool:
+    return len(messages) > 1
+
+
+def _cacheable(task: TaskEnvelope) -> bool:
+    return task.constraints.get("prompt_cache") is not False
+
+
+_EPHEMERAL = {"type": "ephemeral"}
+
+
+def anthropic_messages(task: TaskEnvelope) -> Tuple[Any, List[dict]]:
+    """(system, messages) for /v1/messages; system is None, a string, or cached text blocks."""
+    messages = task_messages(task)
+    system_parts = [m["content"] for m in messages if m["role"] == "system"]
+    turns: List[dict] = [{"role": m["role"], "content": m["content"]} for m in messages if m["role"] != "system"]
+    cache = _cacheable(task)
+
+    system: Any = "\n\n".join(system_parts) if system_parts else None
+    if system and cache and len(turns) > 1:
+        system = [{"type": "text", "text": system, "cache_control": _EPHEMERAL}]
+    if cache and len(turns) > 1:
+        # breakpoint on the last turn before the new one: everything up to it is the
+        # prefix the next request shares
+        prev = turns[-2]
+        prev["content"] = [{"type": "text", "text": prev["content"], "cache_control": _EPHEMERAL}]
+    return system, turns
+
+
+def gemini_contents(task: TaskEnvelope) -> Tuple[Optional[dict], List[dict]]:
+    """(systemInstruction, contents) for generateContent."""
+    messages = task_messages(task)
+    system_parts = [{"text": m["content"]} for m in messages if m["role"] == "system"]
+    contents = [
+        {"role": "model" if m["role"] == "assistant" else "user", "parts": [{"text": m["content"]}]}
+        for m in messages
+        if m["role"] != "system"
+    ]
+    return ({"parts": system_parts} if system_parts else None), contents
+
+
+class ConversationStore:
+    """
+    In-process chat history per trace_id (LRU over conversations).
+    Only the newest `max_messages` non-system turns are kept; system messages stay.
+    """
+    def __init__(self, max_conversations: int = 1024, max_messages: int = 64) -> None:
+        self.max_conversations = max_conversations
+        self.max_messages = max_messages
+        self._lock = threading.Lock()
+        self._history: "OrderedDict[str, List[Message]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._history)
+
+    def get(self, trace_id: str) -> List[Message]:
+        with self._lock:
+            history = self._history.get(trace_id)
+            if history is None:
+                return []
+            self._history.move_to_end(trace_id)
+            return list(history)
+
+    def append(self, trace_id: str, *messages: Message) -> None:
+        with self._lock:
+            history = self._history.get(trace_id)
+            if history is None:
+                history = self._history[trace_id] = []
+            self._history.move_to_end(trace_id)
+            history.extend({"role": m["role"], "content": m["content"]} for m in messages)
+            turns = [m for m in history if m["role"] != "system"]
+            if len(turns) > self.max_messages:
+                drop = len(turns) - self.max_messages
+                kept: List[Message] = []
+                for m in history:
+                    if m["role"] != "system" and drop:
+                        drop -= 1
+                        continue
+                    kept.append(m)
+                history[:] = kept
+            while len(self._history) > self.max_conversations:
+                self._history.popitem(last=False)
+
+    def clear(self, trace_id: str) -> None:
+        with self._lock:
+            self._history.pop(trace_id, None)
@@ -0,0 +1,253 @@
+"""
+Call cost: a per-provider/model price table, a pre-call estimate from prompt
+length, the post-call cost from provider `usage`, and rolling per-tenant spend.
+
+    spend = SpendTracker({"acme": 5.0, "*": 1.0}, window_s=86400)   # USD per window
+    policy = RouterPolicy(..., spend=spend)     # "budget" profile: cheapest that fits
+    router = RouterAgent(..., spend=spend)      # gate + record; metrics["cost_usd"]
+
+Per task: constraints["max_cost"] (USD) caps a single call, constraints["tenant"]
+(or context tenant / tenant_id) picks the spend limit.
+"""
+
+from __future__ import annotations
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from roaudter_agent.contracts import TaskEnvelope
+from roaudter_agent.tokens import (
+    completion_reserve,
+    estimate_tokens,
+    model_for,
+    model_lookup,
+    task_tokens,
+    tokenizer_for,
+)
+
+
+@dataclass(slots=True, frozen=True)
+class Price:
+    """USD per million tokens; prompt-cache reads/writes default to the input price."""
+    input_per_mtok: float
+    output_per_mtok: float
+    cache_read_per_mtok: Optional[float] = None
+    cache_write_per_mtok: Optional[float] = None
+
+
+# provider -> model (or model prefix) -> Price; "*" = any other model of that provider.
+# List prices; override per deployment by passing pricing= where accepted.
+PRICING: Dict[str, Dict[str, Price]] = {
+    "openai": {
+        "gpt-4o-mini": Price(0.15, 0.60, cache_read_per_mtok=0.075),
+        "gpt-4o": Price(2.50, 10.00, cache_read_per_mtok=1.25),
+        "*": Price(2.50, 10.00),
+    },
+    "claude": {
+        "claude-3-5-haiku": Price(0.80, 4.00, cache_read_per_mtok=0.08, cache_write_per_mtok=1.00),
+        "claude-3-haiku": Price(0.25, 1.25, cache_read_per_mtok=0.03, cache_write_per_mtok=0.30),
+        "claude-3-5-sonnet": Price(3.00, 15.00, cache_read_per_mtok=0.30, cache_write_per_mtok=3.75),
+        "*": Price(3.00, 15.00),
+    },
+    "gemini": {
+        "gemini-1.5-flash": Price(0.075, 0.30),
+        "gemini-1.5-pro": Price(1.25, 5.00),
+        "*": Price(1.25, 5.00),
+    },
+    "grok": {"*": Price(2.00, 10.00)},
+    "deepseek": {"*": Price(0.27, 1.10, cache_read_per_mtok=0.07)},
+    # local GPU / flat subscription: no per-call cost
+    "ollama": {"*": Price(0.0, 0.0)},
+    "ollama_cloud": {"*": Price(0.0, 0.0)},
+}
+
+# usage keys by vendor -> (prompt, completion)
+TOKEN_KEYS = (
+    ("prompt_tokens", "completion_tokens"),  # OpenAI-compatible / Ollama
+    ("input_tokens", "output_tokens"),  # Anthropic
+    ("promptTokenCount", "candidatesTokenCount"),  # Gemini
+)
+
+
+def usage_tokens(usage: Any) -> Tuple[Optional[int], Optional[int]]:
+    """(prompt, completion) token counts from any vendor's usage dict."""
+    if not isinstance(usage, dict):
+        return None, None
+    for prompt_key, completion_key in TOKEN_KEYS:
+        pt, ct = usage.get(prompt_key), usage.get(completion_key)
+        if isinstance(pt, int) or isinstance(ct, int):
+            return (pt if isinstance(pt, int) else None), (ct if isinstance(ct, int) else None)
+    return None, None
+
+
+def usage_cache_tokens(usage: Any) -> Tuple[int, int, bool]:
+    """
+    Prompt-cache tokens in a usage dict: (cache reads, cache writes, reads_in_prompt).
+    reads_in_prompt: the reads are part of the prompt token count (OpenAI, DeepSeek,
+    Gemini) rather than reported next to it (Anthropic).
+    """
+    if not isinstance(usage, dict):
+        return 0, 0, True
+    read, write = usage.get("cache_read_input_tokens"), usage.get("cache_creation_input_tokens")
+    if isinstance(read, int) or isinstance(write, int):
+        return (read if isinstance(read, int) else 0), (write if isinstance(write, int) else 0), False
+    details = usage.get("prompt_tokens_details")
+    if isinstance(details, dict) and isinstance(details.get("cached_tokens"), int):
+        return details["cached_tokens"], 0, True
+    for key in ("prompt_cache_hit_tokens", "cachedContentTokenCount"):  # DeepSeek, Gemini
+        if isinstance(usage.get(key), int):
+            return usage[key], 0, True
+    return 0, 0, True
+
+
+def price_for(provider: str, model: Optional[str], pricing: Dict[str, Dict[str, Price]] = PRICING) -> Optional[Price]:
+    """Exact model, then the longest matching prefix, then the provider's "*"; None if unknown."""
+    return model_lookup(pricing, provider, model)
+
+
+def estimate_prompt_tokens(task: TaskEnvelope, provider: Optional[str] = None) -> int:
+    """Pre-call prompt size with `provider`'s tokenizer approximation (roaudter_agent.tokens)."""
+    return max(1, task_tokens(task, provider))
+
+
+def _cost(price: Price, prompt_tokens: int, completion_tokens: int) -> float:
+    return (prompt_tokens * price.input_per_mtok + completion_tokens * price.output_per_mtok) / 1_000_000
+
+
+def estimate_cost(
+    adapter: Any, task: TaskEnvelope, pricing: Dict[str, Dict[str, Price]] = PRICING
+) -> Optional[float]:
+    """Upper-ish USD estimate before calling `adapter`: prompt estimate + max_tokens completion."""
+    price = price_for(adapter.name, model_for(adapter, task), pricing)
+    if price is None:
+        return None
+    return _cost(price, estimate_prompt_tokens(task, adapter.name), completion_reserve(task))
+
+
+def call_cost(
+    adapter: Any, task: TaskEnvelope, out: Any, pricing: Dict[str, Dict[str, Price]] = PRICING
+) -> Optional[float]:
+    """USD cost of a finished call: provider usage when reported, else estimated from the texts."""
+    model = (out.get("model") if isinstance(out, dict) else None) or model_for(adapter, task)
+    price = price_for(adapter.name, model, pricing)
+    if price is None:
+        return None
+    usage = out.get("usage") if isinstance(out, dict) else None
+    pt, ct = usage_tokens(usage)
+    if pt is None:
+        pt = estimate_prompt_tokens(task, adapter.name)
+    if ct is None:
+        text = out.get("text") if isinstance(out, dict) else None
+        ct = estimate_tokens(text, tokenizer_for(adapter.name)) if isinstance(text, str) else 0
+    read, write, in_prompt = usage_cache_tokens(usage)
+    if in_prompt:
+        pt = max(0, pt - read)
+    cached = (
+        read * (price.input_per_mtok if price.cache_read_per_mtok is None else price.cache_read_per_mtok)
+        + write * (price.input_per_mtok if price.cache_write_per_mtok is None else price.cache_write_per_mtok)
+    ) / 1_000_000
+    return _cost(price, pt, ct) + cached
+
+
+def task_tenant(task: TaskEnvelope) -> str:
+    tenant = task.constraints.get("tenant")
+    if not tenant:
+        ctx = task.context or task.payload.get("context")
+        if isinstance(ctx, dict):
+            tenant = ctx.get("tenant") or ctx.get("tenant_id")
+    return str(tenant) if tenant else "default"
+
+
+class SpendTracker:
+    """
+    Rolling USD spend per tenant over `window_s` seconds.
+    - limits: tenant -> USD per window; "*" applies to tenants without an entry
+      (no entry and no "*" = unlimited, spend is still tracked)
+    - path: optional sqlite3 file; spend is appended there and reloaded on start,
+      so limits survive restarts and are shared by processes on one host
+    """
+    def __init__(
+        self,
+        limits: Optional[Dict[str, float]] = None,
+        window_s: float = 86400.0,
+        path: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.limits = dict(limits or {})
+        self.window_s = window_s
+        self._clock = clock
+        self._lock = threading.Lock()
+        # tenant -> [(ts, usd)], oldest first; running sum alongside
+        self._events: Dict[str, Deque[Tuple[float, float]]] = {}
+        self._totals: Dict[str, float] = {}
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS roaudter_spend (ts REAL, tenant TEXT, usd REAL)")
+            self._db.execute("DELETE FROM roaudter_spend WHERE ts < ?", (clock() - window_s,))
+            self._db.commit()
+            for ts, tenant, usd in self._db.execute("SELECT ts, tenant, usd FROM roaudter_spend ORDER BY ts"):
+                self._events.setdefault(tenant, deque()).append((ts, usd))
+                self._totals[tenant] = self._totals.get(tenant, 0.0) + usd
+
+    def _expire(self, tenant: str, now: float) -> None:
+        events = self._events.get(tenant)
+        if not events:
+            return
+        cutoff = now - self.window_s
+        while events and events[0][0] < cutoff:
+            _ts, usd = events.popleft()
+            self._totals[tenant] -= usd
+        if not events:
+            self._totals[tenant] = 0.0  # drop float drift
+
+    def record(self, tenant: str, usd: Optional[float]) -> None:
+        if not usd:
+            return
+        now = self._clock()
+        with self._lock:
+            self._expire(tenant, now)
+            self._events.setdefault(tenant, deque()).append((now, usd))
+            self._totals[tenant] = self._totals.get(tenant, 0.0) + usd
+            if self._db is not None:
+                self._db.execute("INSERT INTO roaudter_spend (ts, tenant, usd) VALUES (?, ?, ?)", (now, tenant, usd))
+                self._db.commit()
+
+    def spent(self, tenant: str) -> float:
+        with self._lock:
+            self._expire(tenant, self._clock())
+            return self._totals.get(tenant, 0.0)
+
+    def remaining(self, tenant: str) -> Optional[float]:
+        """USD left in the tenant's window; None = no limit."""
+        limit = self.limits.get(tenant, self.limits.get("*"))
+        if limit is None:
+            return None
+        return max(0.0, limit - self.spent(tenant))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+def cost_cap(task: TaskEnvelope, spend: Optional[SpendTracker]) -> Optional[float]:
+    """Most a single call for `task` may cost: min(constraints["max_cost"], tenant's remaining budget)."""
+    cap = task.constraints.get("max_cost")
+    cap = float(cap) if isinstance(cap, (int, float)) and not isinstance(cap, bool) else None
+    if spend is not None:
+        left = spend.remaining(task_tenant(task))
+        if left is not None:
+            cap = left if cap is None else min(cap, left)
+    return cap
+
+
+def spend_from_env(limits: Optional[Dict[str, float]] = None, window_s: float = 86400.0) -> SpendTracker:
+    """ROAUDTER_SPEND_DB=/path/spend.db persists spend (unset -> in-process only)."""
+    path = os.getenv("ROAUDTER_SPEND_DB", "").strip() or None
+    return SpendTracker(limits, window_s=window_s, path=path)
@@ -0,0 +1,59 @@
+"""
+End-to-end request deadline.
+
+TaskEnvelope.constraints["deadline_ms"] is turned into an absolute deadline when
+routing starts. The router publishes it to adapters through a ContextVar around
+each provider call. It survives asyncio.to_thread, and hedging sets it inside the
+worker itself. Adapters size their socket timeout with call_timeout(), so layered
+timeouts can never add up past the task's SLA.
+"""
+
+from __future__ import annotations
+import contextlib
+import time
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
+
+from roaudter_agent.providers.base import ProviderError
+
+_DEADLINE: ContextVar[Optional[float]] = ContextVar("roaudter_deadline", default=None)
+
+
+def task_deadline(task: Any, start: float) -> Optional[float]:
+    """Absolute deadline (time.time() scale) from constraints["deadline_ms"], if any."""
+    ms = (getattr(task, "constraints", None) or {}).get("deadline_ms")
+    if isinstance(ms, bool) or not isinstance(ms, (int, float)) or ms <= 0:
+        return None
+    return start + ms / 1000.0
+
+
+@contextlib.contextmanager
+def deadline_scope(deadline: Optional[float]) -> Iterator[None]:
+    """Publish `deadline` to adapter calls in this context (an outer, earlier deadline wins)."""
+    if deadline is None:
+        yield
+        return
+    outer = _DEADLINE.get()
+    token = _DEADLINE.set(deadline if outer is None else min(outer, deadline))
+    try:
+        yield
+    finally:
+        _DEADLINE.reset(token)
+
+
+def remaining_s() -> Optional[float]:
+    deadline = _DEADLINE.get()
+    return None if deadline is None else deadline - time.time()
+
+
+def call_timeout(default: float) -> float:
+    """
+    Socket timeout for one adapter call: min(default, time left).
+    Raises a non-retryable deadline_exceeded ProviderError once time is up.
+    """
+    left = remaining_s()
+    if left is None:
+        return default
+    if left <= 0:
+        raise ProviderError("deadline exceeded", code="deadline_exceeded", retryable=False)
+    return min(default, left)
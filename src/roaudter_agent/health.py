@@ -1,7 +1,11 @@
 from __future__ import annotations
+import asyncio
+import random
+import threading
 import time
-from dataclasses import dataclass
-from typing import Dict, Tuple
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Tuple
 
 from roaudter_agent.providers.base import ProviderState
 
@@ -16,14 +20,50 @@ class HealthMonitor:
     """
     Caches healthcheck results with TTL and applies cooldown on failures.
     Avoids calling adapter.healthcheck() on every request.
+    Also owns the CircuitBreaker fed by RouterAgent with real call outcomes:
+    an open circuit reports the provider unhealthy without a healthcheck.
+
+    With a HealthProber attached, is_healthy() only reads the snapshot the
+    prober publishes (no healthcheck on the request path).
     """
-    def __init__(self, cfg: HealthConfig | None = None) -> None:
+    def __init__(self, cfg: HealthConfig | None = None, breaker: "CircuitBreaker | None" = None) -> None:
         self.cfg = cfg or HealthConfig()
+        self.breaker = breaker or CircuitBreaker()
         # name -> (last_check_ts, healthy, cooldown_until_ts)
         self._state: Dict[str, Tuple[float, bool, float]] = {}
+        # background mode: immutable name -> healthy, swapped atomically by refresh()
+        self._snapshot: Optional[Mapping[str, bool]] = None
+
+    @property
+    def background(self) -> bool:
+        return self._snapshot is not None
+
+    def use_snapshot(self) -> None:
+        """Switch to background mode; providers count as healthy until first probed."""
+        if self._snapshot is None:
+            self._snapshot = MappingProxyType({})
+
+    def refresh(self, providers: Iterable[ProviderState]) -> Mapping[str, bool]:
+        """Run every healthcheck now and publish a new snapshot."""
+        fresh: Dict[str, bool] = {}
+        for p in providers:
+            try:
+                fresh[p.adapter.name] = bool(p.adapter.healthcheck())
+            except Exception:
+                fresh[p.adapter.name] = False
+        snapshot = MappingProxyType(fresh)
+        self._snapshot = snapshot
+        return snapshot
 
     def is_healthy(self, p: ProviderState) -> bool:
         name = p.adapter.name
+        if self.breaker.state(name) == OPEN:
+            return False
+
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot.get(name, True)
+
         now = time.time()
 
         last_check, healthy, cooldown_until = self._state.get(name, (0.0, True, 0.0))
@@ -45,3 +85,171 @@ class HealthMonitor:
         cooldown = (now + self.cfg.cooldown_seconds) if not ok else 0.0
         self._state[name] = (now, ok, cooldown)
         return ok
+
+
+class HealthProber:
+    """
+    Refreshes HealthMonitor off the request path, every interval_seconds
+    (+/- jitter fraction), either on a daemon thread (start/stop) or as an
+    asyncio task (run_async).
+    """
+    def __init__(
+        self,
+        monitor: HealthMonitor,
+        providers: Iterable[ProviderState],
+        interval_seconds: float = 10.0,
+        jitter: float = 0.2,
+    ) -> None:
+        self.monitor = monitor
+        self.providers = list(providers)
+        self.interval_seconds = interval_seconds
+        self.jitter = jitter
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        monitor.use_snapshot()
+
+    def next_delay(self) -> float:
+        spread = self.interval_seconds * self.jitter
+        return max(0.0, self.interval_seconds + random.uniform(-spread, spread))
+
+    def probe_once(self) -> Mapping[str, bool]:
+        return self.monitor.refresh(self.providers)
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self.probe_once()
+            self._stop.wait(self.next_delay())
+
+    def start(self) -> "HealthProber":
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="roaudter-health", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    async def run_async(self) -> None:
+        """Probe forever on the running loop (healthchecks run in the default executor)."""
+        while True:
+            await asyncio.to_thread(self.probe_once)
+            await asyncio.sleep(self.next_delay())
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+@dataclass(slots=True)
+class BreakerConfig:
+    consecutive_failures: int = 5   # подряд упавших вызовов -> open
+    error_rate: float = 0.5         # доля ошибок в окне -> open
+    window: int = 20                # последние N исходов для error_rate
+    min_calls: int = 10             # error_rate считаем только после N исходов
+    open_seconds: float = 30.0      # сколько держим open до half-open
+    half_open_probes: int = 1       # сколько пробных вызовов пропускаем в half-open
+
+
+@dataclass(slots=True)
+class _Circuit:
+    state: str = CLOSED
+    opened_at: float = 0.0
+    consecutive: int = 0
+    outcomes: list[bool] = field(default_factory=list)  # True = failure
+    probes: int = 0
+
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker fed with real call outcomes (not healthchecks).
+    closed -> open: consecutive failures or error rate over the window
+    open -> half_open: after open_seconds; at most half_open_probes calls go through
+    half_open -> closed on a successful probe, back to open on a failed one
+    """
+    def __init__(self, cfg: BreakerConfig | None = None, clock: Callable[[], float] = time.monotonic) -> None:
+        self.cfg = cfg or BreakerConfig()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._circuits: Dict[str, _Circuit] = {}
+
+    def _circuit(self, name: str) -> _Circuit:
+        c = self._circuits.get(name)
+        if c is None:
+            c = self._circuits[name] = _Circuit()
+        if c.state == OPEN and self._clock() - c.opened_at >= self.cfg.open_seconds:
+            c.state = HALF_OPEN
+            c.probes = 0
+        return c
+
+    def state(self, name: str) -> str:
+        with self._lock:
+            return self._circuit(name).state
+
+    def allow(self, name: str) -> bool:
+        """Admit one call; in half-open this takes a probe slot until record()."""
+        with self._lock:
+            c = self._circuit(name)
+            if c.state == CLOSED:
+                return True
+            if c.state == HALF_OPEN and c.probes < self.cfg.half_open_probes:
+                c.probes += 1
+                return True
+            return False
+
+    def record(self, name: str, failed: Optional[bool]) -> None:
+        """
+        Report the outcome of an admitted call.
+        failed=None: outcome says nothing about availability (e.g. bad request);
+        it only releases a half-open probe slot.
+        """
+        with self._lock:
+            c = self._circuit(name)
+            if c.state == HALF_OPEN:
+                c.probes = max(0, c.probes - 1)
+                if failed is None:
+                    return
+                if failed:
+                    self._open(c)
+                else:
+                    c.state = CLOSED
+                    c.consecutive = 0
+                    c.outcomes.clear()
+                return
+
+            if failed is None or c.state != CLOSED:
+                return
+            c.outcomes.append(failed)
+            if len(c.outcomes) > self.cfg.window:
+                del c.outcomes[0]
+            c.consecutive = c.consecutive + 1 if failed else 0
+
+            if c.consecutive >= self.cfg.consecutive_failures:
+                self._open(c)
+            elif len(c.outcomes) >= self.cfg.min_calls and (
+                sum(c.outcomes) / len(c.outcomes) >= self.cfg.error_rate
+            ):
+                self._open(c)
+
+    def _open(self, c: _Circuit) -> None:
+        c.state = OPEN
+        c.opened_at = self._clock()
+        c.consecutive = 0
+        c.outcomes.clear()
+        c.probes = 0
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                name: {
+                    "state": self._circuit(name).state,
+                    "consecutive_failures": c.consecutive,
+                    "window_failures": sum(c.outcomes),
+                    "window_calls": len(c.outcomes),
+                }
+                for name, c in self._circuits.items()
+            }
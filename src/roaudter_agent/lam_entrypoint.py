@@ -1,25 +1,29 @@
 from __future__ import annotations
 
-from typing import Any, Dict
+from typing import Any, Dict, Iterator
 from datetime import datetime, timezone
 import os
 import uuid
 
-from .contracts import TaskEnvelope
+from . import logsink
+from .contracts import ResultEnvelope, TaskEnvelope
 from .registry import build_default_router
 
 
 def _emit(level: str, event: str, msg: str, **fields: Any) -> None:
     """
-    Try ecosystem logger (LAM) if available; otherwise fallback to a simple print.
+    Try ecosystem logger (LAM) if available; otherwise fallback to buffered
+    JSON lines on stdout (written off the request thread, still grep-friendly).
+    Callers guard with logsink.enabled() so filtered events cost nothing.
     """
-    try:
-        from lam_logging import log  # type: ignore
-        log(level, event, msg, **fields)
-        return
-    except Exception:
-        # minimal fallback, still grep-friendly
-        print(f"[{event}] level={level} msg={msg} fields={fields}")
+    log = logsink.lam_log()
+    if log is not None:
+        try:
+            log(level, event, msg, **fields)
+            return
+        except Exception:
+            pass
+    logsink.default_sink().put({"event": event, "level": level, "msg": msg, **fields})
 
 
 def _set_ctx_best_effort(ctx: Any) -> None:
@@ -114,23 +118,63 @@ class RoaudterComAgent:
     def __init__(self) -> None:
         self.router = build_default_router()
 
-    def answer(self, payload: Dict[str, Any]) -> Dict[str, Any]:
-        payload = dict(payload or {})
+    def close(self) -> None:
+        """Stop the router's background threads (ROAUDTER_HEALTH_PROBE_SECONDS)."""
+        self.router.stop()
+
+    @staticmethod
+    def _task_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"msg": payload.get("msg", "")}
+        if payload.get("messages"):
+            out["messages"] = payload["messages"]  # multi-turn history, see roaudter_agent.conversation
+        return out
+
+    def _build_task(self, payload: Dict[str, Any]) -> TaskEnvelope:
         normalized_ctx = _normalize_payload_context(payload)
         _set_ctx_best_effort(normalized_ctx)
-        task = TaskEnvelope(
+        return TaskEnvelope(
             task_id=normalized_ctx["task_id"],
             agent=payload.get("agent", "comm-agent"),
             intent=payload.get("intent", "chat"),
             priority=payload.get("priority", 0),
-            payload=payload.get("payload", {"msg": payload.get("msg", "")}),
+            payload=payload.get("payload", self._task_payload(payload)),
             context=normalized_ctx,
             constraints=payload.get("constraints", {}),
             provider_hint=payload.get("provider_hint"),
         )
 
+    def answer(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        payload = dict(payload or {})
+        task = self._build_task(payload)
         res = self.router.route(task)
+        return self._deliver(payload, task, res)
 
+    async def aanswer(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """asyncio variant of answer(): routes via RouterAgent.aroute()."""
+        payload = dict(payload or {})
+        task = self._build_task(payload)
+        res = await self.router.aroute(task)
+        return self._deliver(payload, task, res)
+
+    def answer_stream(self, payload: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Incremental reply path: yields {"event": "delta", "task_id", "provider", "text"}
+        chunks as tokens arrive, then one {"event": "reply", "reply": <answer() dict>}.
+        """
+        payload = dict(payload or {})
+        task = self._build_task(payload)
+        for event in self.router.route_stream(task):
+            if event["event"] == "delta":
+                yield {
+                    "event": "delta",
+                    "task_id": task.task_id,
+                    "provider": event["provider"],
+                    "text": event["text"],
+                }
+            else:
+                yield {"event": "reply", "reply": self._deliver(payload, task, event["result"])}
+
+    def _deliver(self, payload: Dict[str, Any], task: TaskEnvelope, res: ResultEnvelope) -> Dict[str, Any]:
         # optional runtime trace: export ROAUDTER_TRACE=1
         
         def _trace_should_log(mode: str, reply: dict) -> bool:
@@ -163,26 +207,27 @@ class RoaudterComAgent:
                 "task_id": res.task_id,
                 "provider_hint": task.provider_hint,
             }
-            if _trace_should_log(mode, reply_dict):
+            if _trace_should_log(mode, reply_dict) and logsink.enabled("info", "roaudter.trace"):
                 _emit("info", "roaudter.trace", "route_summary", **reply_dict)
 
 
         # Observability: reply delivered back to comm-agent layer
         ctx = res.context if isinstance(res.context, dict) else {}
-        _emit(
-            "info",
-            "roaudter.deliver",
-            "deliver",
-            recipient=task.agent,
-            status=res.status,
-            provider_used=res.provider_used,
-            latency_ms=res.latency_ms,
-            attempts=res.attempts,
-            task_id=res.task_id,
-            trace_id=ctx.get("trace_id"),
-            parent_task_id=ctx.get("parent_task_id"),
-            span_id=ctx.get("span_id"),
-        )
+        if logsink.enabled("info", "roaudter.deliver"):
+            _emit(
+                "info",
+                "roaudter.deliver",
+                "deliver",
+                recipient=task.agent,
+                status=res.status,
+                provider_used=res.provider_used,
+                latency_ms=res.latency_ms,
+                attempts=res.attempts,
+                task_id=res.task_id,
+                trace_id=ctx.get("trace_id"),
+                parent_task_id=ctx.get("parent_task_id"),
+                span_id=ctx.get("span_id"),
+            )
 
         reply = {
             "task_id": res.task_id,
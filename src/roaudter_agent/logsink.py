@@ -0,0 +1,159 @@
+"""
+Logging fast path.
+
+- lam_logging.log is resolved once (first use), not imported per event
+- LAM_LOG_LEVEL / LAM_LOG_EVENTS are parsed once; callers test enabled()
+  before building event kwargs, so a filtered event costs one dict lookup
+- JsonlSink batches JSON lines on a daemon thread when lam_logging is absent,
+  keeping stdout writes off the request thread
+
+enabled() applies lam_logging.should_log's rules: levels trace < debug < info <
+warning < error, unknown level names count as warning; LAM_LOG_EVENTS is a
+comma list of event names matched case-insensitively. Unlike should_log, the
+env is read once at first use: later changes are ignored until configure().
+"""
+
+from __future__ import annotations
+import atexit
+import os
+import sys
+import threading
+from collections import deque
+from typing import Any, Callable, Optional, TextIO
+
+from roaudter_agent import codec
+
+# same table and default as lam_logging._level_value
+LEVELS = {"error": 40, "warn": 30, "warning": 30, "info": 20, "debug": 10, "trace": 5}
+UNKNOWN_LEVEL = 30
+
+_UNRESOLVED: Any = object()
+_lam_log: Any = _UNRESOLVED
+_min_level: Optional[int] = None
+_events: Optional[frozenset[str]] = None  # lowercased event names; None = all
+_sink: Optional["JsonlSink"] = None
+_sink_lock = threading.Lock()
+
+
+def _level_value(level: Optional[str]) -> int:
+    return LEVELS.get((level or "").lower(), UNKNOWN_LEVEL)
+
+
+def lam_log() -> Optional[Callable[..., Any]]:
+    """lam_logging.log if importable (resolved once), else None."""
+    global _lam_log
+    if _lam_log is _UNRESOLVED:
+        try:
+            from lam_logging import log  # type: ignore
+        except Exception:
+            log = None
+        _lam_log = log
+    return _lam_log
+
+
+def configure(level: Optional[str] = None, events: Optional[str] = None) -> None:
+    """(Re)read filters; explicit args override LAM_LOG_LEVEL / LAM_LOG_EVENTS."""
+    global _min_level, _events, _lam_log
+    level = level if level is not None else os.getenv("LAM_LOG_LEVEL", "info")
+    events = events if events is not None else os.getenv("LAM_LOG_EVENTS", "")
+    _min_level = _level_value(level)
+    names = frozenset(e.strip().lower() for e in events.split(",") if e.strip())
+    _events = names or None
+    _lam_log = _UNRESOLVED
+
+
+def enabled(level: str, event: str) -> bool:
+    if _min_level is None:
+        configure()
+    if _level_value(level) < _min_level:  # type: ignore[operator]
+        return False
+    if _events is None or not event:
+        return True
+    return event.lower() in _events
+
+
+class JsonlSink:
+    """
+    Buffered JSON-lines writer: put() appends a record to an in-memory buffer
+    (never blocks; drops and counts when `max_queue` is reached), a daemon thread
+    writes batches of up to `max_batch` lines every `flush_interval` seconds,
+    or sooner once a full batch is waiting.
+    """
+
+    def __init__(
+        self,
+        stream: Optional[TextIO] = None,
+        *,
+        max_batch: int = 256,
+        flush_interval: float = 0.2,
+        max_queue: int = 10_000,
+    ) -> None:
+        self.stream = stream if stream is not None else sys.stdout
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.dropped = 0
+        self._buf: deque[dict[str, Any]] = deque()  # append/popleft are atomic
+        self._wake = threading.Event()
+        self._write_lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="roaudter-log-sink", daemon=True)
+        self._thread.start()
+
+    def put(self, record: dict[str, Any]) -> bool:
+        buf = self._buf
+        if len(buf) >= self.max_queue:
+            self.dropped += 1
+            return False
+        buf.append(record)
+        if len(buf) >= self.max_batch:
+            self._wake.set()
+        return True
+
+    def flush(self) -> None:
+        """Write everything buffered so far (on the calling thread)."""
+        self._drain()
+
+    def close(self) -> None:
+        self._closed = True
+        self._wake.set()
+        self._thread.join(timeout=5)
+        self._drain()
+
+    def _drain(self) -> None:
+        with self._write_lock:
+            buf = self._buf
+            while buf:
+                batch = []
+                try:
+                    while len(batch) < self.max_batch:
+                        batch.append(buf.popleft())
+                except IndexError:
+                    pass
+                try:
+                    self.stream.write("".join(codec.dumps_str(r) + "\n" for r in batch))
+                    self.stream.flush()
+                except Exception:
+                    pass  # best-effort: logging must never take the router down
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self._drain()
+
+
+def default_sink() -> JsonlSink:
+    """Process-wide stdout sink, created on first use and flushed at exit."""
+    global _sink
+    if _sink is None:
+        with _sink_lock:
+            if _sink is None:
+                _sink = JsonlSink()
+                atexit.register(_sink.close)
+    return _sink
+
+
+def set_default_sink(sink: Optional[JsonlSink]) -> None:
+    global _sink
+    _sink = sink
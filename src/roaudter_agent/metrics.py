@@ -0,0 +1,238 @@
+"""
+In-process metrics for the router, exported as OpenMetrics text.
+
+    metrics = RouterMetrics()
+    router = RouterAgent(..., metrics=metrics)
+    print(metrics.registry.render())          # text dump
+    metrics.registry.serve(port=9464)         # optional GET /metrics endpoint
+
+Stdlib only; a Prometheus server scrapes /metrics and computes p99 / fallback
+rate from the histograms and counters below.
+"""
+
+from __future__ import annotations
+import bisect
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from roaudter_agent.cost import usage_cache_tokens, usage_tokens
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+DEPTH_BUCKETS = (0.0, 1.0, 2.0, 3.0, 4.0, 6.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt(v: float) -> str:
+    if v == math.inf:
+        return "+Inf"
+    f = float(v)
+    return str(int(f)) if f.is_integer() and abs(f) < 1e15 else repr(f)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str], lock: threading.Lock) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = lock
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def _labels(self, values: LabelValues, extra: str = "") -> str:
+        parts = [f'{n}="{_escape(v)}"' for n, v in zip(self.labelnames, values)]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args: Any) -> None:
+        super().__init__(*args)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> list[str]:
+        return [f"{self.name}_total{self._labels(k)} {_fmt(v)}" for k, v in sorted(self._values.items())]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, *args: Any, buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        super().__init__(*args)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> (per-bucket counts incl. +Inf, sum)
+        self._values: Dict[LabelValues, Tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key) or self._values.setdefault(
+                key, ([0] * (len(self.buckets) + 1), [0.0])
+            )
+            counts[i] += 1
+            total[0] += value
+
+    def count(self, **labels: Any) -> int:
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+            return sum(entry[0]) if entry else 0
+
+    def samples(self) -> list[str]:
+        out = []
+        for key, (counts, total) in sorted(self._values.items()):
+            acc = 0
+            for bound, n in zip(self.buckets + (math.inf,), counts):
+                acc += n
+                le = 'le="' + _fmt(bound) + '"'
+                out.append(f"{self.name}_bucket{self._labels(key, le)} {acc}")
+            out.append(f"{self.name}_count{self._labels(key)} {acc}")
+            out.append(f"{self.name}_sum{self._labels(key)} {_fmt(total[0])}")
+        return out
+
+
+class MetricsRegistry:
+    """Named counters/histograms; render() is the OpenMetrics exposition."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> Any:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                raise ValueError(f"metric {metric.name} already registered with another shape")
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames, self._lock))
+
+    def histogram(
+        self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, self._lock, buckets=buckets))
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            for m in self._metrics.values():
+                lines.append(f"# TYPE {m.name} {m.kind}")
+                lines.append(f"# HELP {m.name} {_escape(m.help)}")
+                lines.extend(m.samples())
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+        """Serve GET /metrics on a daemon thread; server.server_address has the bound port."""
+        registry = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args: Any) -> None:
+                return
+
+        server = ThreadingHTTPServer((host, port), _Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="roaudter-metrics", daemon=True).start()
+        return server
+
+
+class RouterMetrics:
+    """The router's metric set; RouterAgent.metrics calls the observe_* hooks."""
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None) -> None:
+        self.registry = r = registry or MetricsRegistry()
+        self.requests = r.counter(
+            "roaudter_provider_requests", "Provider call attempts by outcome.", ("provider", "outcome")
+        )
+        self.errors = r.counter(
+            "roaudter_provider_errors", "Provider errors by ProviderError.code.", ("provider", "code")
+        )
+        self.latency = r.histogram(
+            "roaudter_provider_latency_seconds", "Successful provider call latency.", ("provider",)
+        )
+        self.retries = r.counter("roaudter_provider_retries", "Same-provider retries scheduled.", ("provider",))
+        self.tokens = r.counter("roaudter_provider_tokens", "Tokens reported in provider usage.", ("provider", "kind"))
+        self.routes = r.counter("roaudter_routes", "Routed tasks by final status.", ("status",))
+        self.route_latency = r.histogram(
+            "roaudter_route_latency_seconds", "End-to-end route latency.", ("status",)
+        )
+        self.fallback_depth = r.histogram(
+            "roaudter_fallback_depth",
+            "Index of the answering provider in selected_chain (0 = first choice).",
+            buckets=DEPTH_BUCKETS,
+        )
+        self.cache_hits = r.counter("roaudter_cache_hits", "Routes answered from the response cache.")
+        self.coalesced = r.counter(
+            "roaudter_coalesced_routes",
+            "Single-flight routes by role (leader = made the call; waiter = shared it; timeout = gave up).",
+            ("role",),
+        )
+        self.cost = r.counter(
+            "roaudter_provider_cost_usd", "USD spent on answered calls (see roaudter_agent.cost).", ("provider",)
+        )
+
+    def observe_success(self, provider: str, latency_s: float, usage: Optional[dict]) -> None:
+        self.requests.inc(provider=provider, outcome="ok")
+        self.latency.observe(latency_s, provider=provider)
+        pt, ct = usage_tokens(usage)
+        if pt is not None:
+            self.tokens.inc(pt, provider=provider, kind="prompt")
+        if ct is not None:
+            self.tokens.inc(ct, provider=provider, kind="completion")
+        read, _write, _in_prompt = usage_cache_tokens(usage)
+        if read:
+            self.tokens.inc(read, provider=provider, kind="cache_read")
+
+    def observe_error(self, provider: str, code: str) -> None:
+        self.requests.inc(provider=provider, outcome="error")
+        self.errors.inc(provider=provider, code=code)
+
+    def observe_retry(self, provider: str) -> None:
+        self.retries.inc(provider=provider)
+
+    def observe_cost(self, provider: str, usd: Optional[float]) -> None:
+        if usd:
+            self.cost.inc(usd, provider=provider)
+
+    def observe_route(self, status: str, latency_s: float, depth: Optional[int]) -> None:
+        self.routes.inc(status=status)
+        self.route_latency.observe(latency_s, status=status)
+        if depth is not None:
+            self.fallback_depth.observe(depth)
@@ -1,10 +1,20 @@
 from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import os
-from typing import Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
 from roaudter_agent.contracts import TaskEnvelope
+from roaudter_agent.cost import SpendTracker, cost_cap, estimate_cost
 from roaudter_agent.providers.base import ProviderState
+from roaudter_agent.ratelimit import RateLimiter
+from roaudter_agent.stats import ProviderStats
+from roaudter_agent.tokens import (
+    DEFAULT_COMPLETION_TOKENS,
+    MESSAGE_OVERHEAD_TOKENS,
+    MIN_CONTEXT_WINDOW,
+    completion_reserve,
+    fits,
+)
 
 
 def _requested_model(task: TaskEnvelope) -> str | None:
@@ -15,14 +25,13 @@ def _requested_model(task: TaskEnvelope) -> str | None:
     )
 
 
-def _parse_hint(task: TaskEnvelope) -> tuple[Optional[str], bool]:
+def _parse_hint(task: TaskEnvelope, runtime_hint: Optional[str] = None) -> tuple[Optional[str], bool]:
     # allow hint to come either from TaskEnvelope or payload
     raw = (task.provider_hint or task.payload.get("provider_hint") or "").strip().lower()
     if raw:
         if raw.endswith("!"):
             return raw[:-1], True
         return raw, False
-    runtime_hint = _runtime_profile_hint()
     if runtime_hint:
         return runtime_hint, False
     return None, False
@@ -38,10 +47,25 @@ PROFILE_CHAINS: dict[str, list[str]] = {
     # best: prioritize higher quality (subjective, but practical default)
     "best": ["claude", "openai", "gemini", "grok", "deepseek", "ollama", "ollama_cloud"],
 
-    # fast: prioritize low-latency models (default assumptions)
+    # fast: prioritize low-latency models (default assumptions; reordered by observed
+    # latency/errors when RouterPolicy.stats is set, see ADAPTIVE_PROFILES)
     "fast": ["gemini", "openai", "ollama", "claude", "grok", "deepseek", "ollama_cloud"],
+
+    # budget: re-ranked per task by estimated call cost (roaudter_agent.cost); this
+    # order only breaks ties. Providers over max_cost / tenant budget go last.
+    "budget": ["ollama", "gemini", "deepseek", "openai", "claude", "grok", "ollama_cloud"],
 }
 
+# profiles whose static order is only a prior: with live stats they are re-ranked
+ADAPTIVE_PROFILES: Tuple[str, ...] = ("fast",)
+
+CODE_INTENTS = frozenset({"code", "coding", "patch"})
+
+# routing table entries kept per policy before it is reset (hints are free-form input)
+ROUTING_TABLE_MAX = 1024
+
+_UNSET: Any = object()
+
 RUNTIME_PROFILE_ALIASES: dict[str, str] = {
     "ci": "cheap",
     "smoke": "local_only",
@@ -57,6 +81,27 @@ def _runtime_profile_hint() -> Optional[str]:
     return mapped if mapped in PROFILE_CHAINS else None
 
 
+# longest single msg that fits every known window next to the default completion reserve
+_SURE_FIT_CHARS = MIN_CONTEXT_WINDOW - MESSAGE_OVERHEAD_TOKENS - DEFAULT_COMPLETION_TOKENS
+
+
+def _surely_fits(task: TaskEnvelope) -> bool:
+    """Cheap bound against the smallest known window (the estimator never exceeds one token per char)."""
+    payload = task.payload
+    if "messages" not in payload and "max_tokens" not in task.constraints:
+        # hot path: one short turn, default reserve
+        msg = payload.get("msg") or payload.get("text") or ""
+        if type(msg) is str and len(msg) <= _SURE_FIT_CHARS:
+            return True
+    messages = payload.get("messages")
+    if isinstance(messages, list) and messages:
+        bound = sum(len(str(m.get("content") or "")) if isinstance(m, dict) else 0 for m in messages)
+        bound += MESSAGE_OVERHEAD_TOKENS * len(messages)
+    else:
+        bound = len(str(payload.get("msg") or payload.get("text") or "")) + MESSAGE_OVERHEAD_TOKENS
+    return bound + completion_reserve(task) <= MIN_CONTEXT_WINDOW
+
+
 @dataclass(slots=True)
 class RouterPolicy:
     """
@@ -67,11 +112,43 @@ class RouterPolicy:
         - profile name: local_only/cheap/best/fast
     - model=:cloud => prefer ollama_cloud then ollama (but profiles can override via order)
     - health filtering happens outside (HealthMonitor)
+    - adaptive profiles (ADAPTIVE_PROFILES, e.g. "fast") are re-ranked by live
+      EWMA latency/error score when `stats` is set (shared with RouterAgent.stats)
+    - providers out of local rate-limit budget (`limiter`, shared with
+      RouterAgent.rate_limiter) are moved to the end of the chain
+    - "budget" orders providers by estimated cost of this task; ones over the
+      per-task max_cost / tenant remaining budget (`spend`, shared with
+      RouterAgent.spend) are moved to the end, where the router refuses them
+    - providers whose context window (roaudter_agent.tokens) can't hold the
+      estimated prompt + max_tokens are skipped (`context_check`)
+    - chains are compiled once per (hint, strict, cloud model, intent class,
+      available providers) and served from a routing table; the health filter
+      changes the available set, so health flips select a different entry.
+      ROAUDTER_RUNTIME_PROFILE is read once; call invalidate() after changing
+      it or default_chain. Returned lists are shared: don't mutate them.
     """
     default_chain: List[str]
+    stats: Optional[ProviderStats] = None
+    limiter: Optional[RateLimiter] = None
+    adaptive_profiles: Tuple[str, ...] = ADAPTIVE_PROFILES
+    spend: Optional[SpendTracker] = None
+    context_check: bool = True
+    # key -> (available providers, compiled chain); providers are kept so the id()s in the key stay unique
+    _table: Dict[tuple, Tuple[tuple, List[ProviderState]]] = field(default_factory=dict, init=False, repr=False)
+    _runtime_hint: Any = field(default=_UNSET, init=False, repr=False)
+
+    def invalidate(self) -> None:
+        """Drop compiled chains and re-read ROAUDTER_RUNTIME_PROFILE."""
+        self._table = {}
+        self._runtime_hint = _UNSET
+
+    def _runtime(self) -> Optional[str]:
+        if self._runtime_hint is _UNSET:
+            self._runtime_hint = _runtime_profile_hint()
+        return self._runtime_hint
 
     def inspect_hint(self, task: TaskEnvelope) -> tuple[Optional[str], bool, str]:
-        hint, strict = _parse_hint(task)
+        hint, strict = _parse_hint(task, self._runtime())
         if hint is None:
             return None, False, "none"
         explicit = (task.provider_hint or task.payload.get("provider_hint") or "").strip()
@@ -81,18 +158,70 @@ class RouterPolicy:
             return hint, strict, "runtime_profile"
         return hint, strict, "runtime_profile"
 
-    def select_chain(self, task: TaskEnvelope, providers: Iterable[ProviderState]) -> List[ProviderState]:
-        available = list(providers)
+    def select_chain(
+        self, task: TaskEnvelope, providers: Iterable[ProviderState], fit_context: bool = True
+    ) -> List[ProviderState]:
+        available = providers if isinstance(providers, tuple) else tuple(providers)
+        hint, strict = _parse_hint(task, self._runtime())
+        model = _requested_model(task)
+        cloud = bool(model) and str(model).endswith(":cloud")
+        code = (task.intent or "").lower() in CODE_INTENTS
+
+        # adaptive profiles re-rank on live stats every call, budget on the prompt: not cacheable
+        adaptive = self.stats is not None and hint in PROFILE_CHAINS and hint in self.adaptive_profiles
+        if hint == "budget":
+            selected = self._rank_by_cost(task, self._compile(hint, strict, cloud, code, available))
+        elif adaptive:
+            selected = self._compile(hint, strict, cloud, code, available)
+        else:
+            key = (hint, strict, cloud, code, tuple(map(id, available)))
+            entry = self._table.get(key)
+            if entry is None:
+                if len(self._table) >= ROUTING_TABLE_MAX:
+                    self._table = {}
+                entry = self._table[key] = (available, self._compile(hint, strict, cloud, code, available))
+            selected = entry[1]
+
+        if self.limiter is not None:
+            # deprioritize (not drop): a refill may happen before we get there
+            with_budget = [p for p in selected if self.limiter.has_budget(p.adapter)]
+            if len(with_budget) != len(selected):
+                selected = with_budget + [p for p in selected if p not in with_budget]
+        if fit_context and self.context_check and not _surely_fits(task):
+            fitting = [p for p in selected if fits(p.adapter, task)]
+            if len(fitting) != len(selected):
+                selected = fitting
+        return selected
+
+    def _rank_by_cost(self, task: TaskEnvelope, chain: List[ProviderState]) -> List[ProviderState]:
+        cap = cost_cap(task, self.spend)
+        fits, unknown, over = [], [], []
+        for p in chain:
+            est = estimate_cost(p.adapter, task)
+            if est is None:
+                unknown.append(p)
+            elif cap is not None and est > cap:
+                over.append(p)
+            else:
+                fits.append((est, p))
+        fits.sort(key=lambda item: item[0])  # stable: ties keep the profile order
+        return [p for _est, p in fits] + unknown + over
+
+    def _compile(
+        self, hint: Optional[str], strict: bool, cloud: bool, code: bool, available: Sequence[ProviderState]
+    ) -> List[ProviderState]:
         by_name = {p.adapter.name: p for p in available}
         available_names = [p.adapter.name for p in available]
 
         chain: List[str] = []
 
         # 1) hint/profile first
-        hint, strict, _source = self.inspect_hint(task)
         if hint:
             if hint in PROFILE_CHAINS:
-                chain += PROFILE_CHAINS[hint]
+                profile_chain = PROFILE_CHAINS[hint]
+                if self.stats is not None and hint in self.adaptive_profiles:
+                    profile_chain = self.stats.rank(profile_chain)
+                chain += profile_chain
             else:
                 # explicit provider name
                 if strict:
@@ -101,13 +230,11 @@ class RouterPolicy:
                 chain.append(hint)
 
         # 2) model-driven ordering (cloud request -> cloud then local)
-        model = _requested_model(task)
-        if model and str(model).endswith(":cloud"):
+        if cloud:
             chain += ["ollama_cloud", "ollama"]
 
         # 3) intent heuristic (light touch; profiles/hints come first anyway)
-        intent = (task.intent or "").lower()
-        if intent in {"code", "coding", "patch"}:
+        if code:
             chain += ["openai", "ollama"]
         else:
             chain += ["ollama", "openai"]
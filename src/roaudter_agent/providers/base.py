@@ -1,6 +1,11 @@
 from __future__ import annotations
+import asyncio
+import re
+import time
 from dataclasses import dataclass
-from typing import Any, Protocol, Optional
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Any, Iterator, Mapping, Protocol, Optional
 
 
 class ProviderError(RuntimeError):
@@ -33,11 +38,112 @@ class ProviderError(RuntimeError):
         }
 
 
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_MS = {"ms": 1.0, "s": 1000.0, "m": 60_000.0, "h": 3_600_000.0}
+
+# reset headers by vendor: OpenAI-style durations ("1s", "6m0s", "20ms"),
+# Anthropic RFC 3339 timestamps
+_RESET_HEADERS = (
+    "x-ratelimit-reset-requests",
+    "x-ratelimit-reset-tokens",
+    "anthropic-ratelimit-requests-reset",
+    "anthropic-ratelimit-tokens-reset",
+    "anthropic-ratelimit-input-tokens-reset",
+    "anthropic-ratelimit-output-tokens-reset",
+)
+
+
+def _parse_wait_ms(value: str, now: float) -> Optional[float]:
+    value = value.strip()
+    if not value:
+        return None
+    try:
+        return float(value) * 1000.0  # plain seconds
+    except ValueError:
+        pass
+    parts = _DURATION_RE.findall(value)
+    if parts and "".join(n + u for n, u in parts) == value:
+        return sum(float(n) * _DURATION_MS[u] for n, u in parts)
+    try:
+        at = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            at = parsedate_to_datetime(value)  # Retry-After: <HTTP-date>
+        except (TypeError, ValueError):
+            return None
+    if at.tzinfo is None:
+        return None
+    return (at.timestamp() - now) * 1000.0
+
+
+def retry_after_ms(headers: Optional[Mapping[str, str]], *, now: Optional[float] = None) -> Optional[int]:
+    """
+    Server-advertised wait before the next attempt, from
+    retry-after-ms / Retry-After (seconds or HTTP-date) / vendor rate-limit reset headers.
+    The longest reset wins: a 429 does not say which budget ran out.
+    """
+    if not headers:
+        return None
+    now = time.time() if now is None else now
+    get = headers.get
+    for name in ("retry-after-ms", "retry-after"):
+        raw = get(name)
+        if raw is not None:
+            if name == "retry-after-ms":
+                try:
+                    wait = float(raw)
+                except ValueError:
+                    wait = None
+            else:
+                wait = _parse_wait_ms(raw, now)
+            if wait is not None:
+                return max(0, int(wait))
+    waits = [w for w in (_parse_wait_ms(get(h) or "", now) for h in _RESET_HEADERS) if w is not None]
+    return max(0, int(max(waits))) if waits else None
+
+
+def retry_meta(headers: Optional[Mapping[str, str]]) -> dict[str, Any]:
+    """ProviderError.meta fragment: {"retry_after_ms": N} when the server advertised a wait."""
+    wait = retry_after_ms(headers)
+    return {} if wait is None else {"retry_after_ms": wait}
+
+
 class ProviderAdapter(Protocol):
     name: str
 
     def healthcheck(self) -> bool: ...
     def generate(self, task) -> Any: ...
+    async def agenerate(self, task) -> Any: ...
+    def stream(self, task) -> Iterator[dict[str, Any]]: ...
+
+
+async def call_agenerate(adapter: ProviderAdapter, task) -> Any:
+    """
+    Await adapter.agenerate(task); adapters that only implement the sync
+    generate() are run in the default executor so the event loop never blocks.
+    """
+    agenerate = getattr(adapter, "agenerate", None)
+    if agenerate is not None:
+        return await agenerate(task)
+    return await asyncio.to_thread(adapter.generate, task)
+
+
+def call_stream(adapter: ProviderAdapter, task) -> Iterator[dict[str, Any]]:
+    """
+    Iterate adapter.stream(task) chunks ({"delta": ...} / {"usage": ...}).
+    Adapters without stream() degrade to one delta carrying the full generate() text.
+    """
+    stream = getattr(adapter, "stream", None)
+    if stream is not None:
+        yield from stream(task)
+        return
+    out = adapter.generate(task)
+    if not isinstance(out, dict):
+        return
+    if out.get("text"):
+        yield {"delta": out["text"]}
+    if isinstance(out.get("usage"), dict):
+        yield {"usage": out["usage"], "model": out.get("model")}
 
 
 @dataclass(slots=True)
@@ -1,14 +1,18 @@
 from __future__ import annotations
-import json
+import asyncio
 import os
 import time
-import urllib.request
 import urllib.error
 from dataclasses import dataclass
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
 
+from roaudter_agent import codec
 from roaudter_agent.contracts import TaskEnvelope
-from roaudter_agent.providers.base import ProviderError
+from roaudter_agent.conversation import anthropic_messages
+from roaudter_agent.deadline import call_timeout
+from roaudter_agent.providers.base import ProviderError, retry_meta
+from roaudter_agent.providers.streaming import anthropic_chunks
+from roaudter_agent.transport import Transport, default_transport
 
 
 @dataclass(slots=True)
@@ -23,6 +27,13 @@ class ClaudeAdapter:
     base_url: str = "https://api.anthropic.com/v1"
     default_model: str = "claude-3-5-haiku-latest"
     anthropic_version: str = "2023-06-01"
+    # False: decode only the text (and usage), the full response is not kept in result["raw"]
+    keep_raw: bool = True
+
+    transport: Optional[Transport] = None  # None => shared pooled default_transport()
+
+    def _transport(self) -> Transport:
+        return self.transport or default_transport()
 
     def _api_key(self) -> Optional[str]:
         return os.environ.get(self.api_key_env)
@@ -31,7 +42,7 @@ class ClaudeAdapter:
         # Avoid network calls; key presence is enough to enable.
         return bool(self._api_key())
 
-    def generate(self, task: TaskEnvelope) -> Any:
+    def _prepare(self, task: TaskEnvelope) -> tuple[str, dict[str, str], dict[str, Any], str]:
         api_key = self._api_key()
         if not api_key:
             raise ProviderError(
@@ -41,9 +52,8 @@ class ClaudeAdapter:
                 meta={"env": self.api_key_env},
             )
 
-        msg = task.payload.get("msg") or task.payload.get("text") or ""
-        if not msg:
-            raise ProviderError("empty payload.msg/text", code="bad_request", retryable=False)
+        # cache_control breakpoints on the shared prefix (see roaudter_agent.conversation)
+        system, messages = anthropic_messages(task)
 
         model = (
             task.constraints.get("model")
@@ -55,59 +65,104 @@ class ClaudeAdapter:
         body = {
             "model": model,
             "max_tokens": int(task.constraints.get("max_tokens", 256)),
-            "messages": [{"role": "user", "content": msg}],
+            "messages": messages,
         }
+        if system:
+            body["system"] = system
 
-        req = urllib.request.Request(
-            url=f"{self.base_url}/messages",
-            data=json.dumps(body).encode("utf-8"),
-            headers={
-                "Content-Type": "application/json",
-                "x-api-key": api_key,
-                "anthropic-version": self.anthropic_version,
-            },
-            method="POST",
-        )
+        url = f"{self.base_url}/messages"
+        headers = {
+            "Content-Type": "application/json",
+            "x-api-key": api_key,
+            "anthropic-version": self.anthropic_version,
+        }
+        return url, headers, body, model
 
-        t0 = time.time()
-        try:
-            with urllib.request.urlopen(req, timeout=60) as r:
-                raw = r.read().decode("utf-8")
-                data = json.loads(raw)
-        except urllib.error.HTTPError as e:
+    def _call_failed(self, e: Exception, model: str) -> ProviderError:
+        if isinstance(e, urllib.error.HTTPError):
             retryable = e.code in (429, 500, 502, 503, 504)
             code = "rate_limited" if e.code == 429 else "http_error"
-            raise ProviderError(
+            return ProviderError(
                 f"claude call failed: HTTP {e.code} {e.reason}",
                 code=code,
                 http_status=e.code,
                 retryable=retryable,
-                meta={"model": model},
-            ) from e
-        except Exception as e:
-            raise ProviderError(
-                f"claude call failed: {e}",
-                code="network_error",
-                retryable=True,
-                meta={"model": model},
-            ) from e
-
-        # Extract text
-        text = None
-        try:
-            # Typically: {"content":[{"type":"text","text":"..."}], ...}
-            parts = data.get("content") or []
-            if parts and isinstance(parts, list):
-                text = parts[0].get("text")
-        except Exception:
-            pass
-
-        usage = data.get("usage")
-        return {
+                meta={"model": model, **retry_meta(e.headers)},
+            )
+        return ProviderError(
+            f"claude call failed: {e}",
+            code="network_error",
+            retryable=True,
+            meta={"model": model},
+        )
+
+    def _decode(self, resp: Any) -> tuple[Any, Any, Any]:
+        """(text, usage, raw); raw is None unless keep_raw."""
+        if not self.keep_raw:
+            fields = codec.decode_fields(resp.body, codec.ANTHROPIC_FIELDS)
+            return fields["text"], fields["usage"], None
+        data = codec.loads(resp.body)
+        return codec.pick(data, ("content", 0, "text")), codec.pick(data, ("usage",)), data
+
+    @staticmethod
+    def _result(model: str, t0: float, text: Any, usage: Any, raw: Any) -> dict[str, Any]:
+        out = {
             "provider": "claude",
             "model": model,
             "latency_ms": int((time.time() - t0) * 1000),
             "text": text,
             "usage": usage,
-            "raw": data,
         }
+        if raw is not None:
+            out["raw"] = raw
+        return out
+
+    def generate(self, task: TaskEnvelope) -> Any:
+        url, headers, body, model = self._prepare(task)
+
+        timeout = call_timeout(60.0)
+        t0 = time.time()
+        try:
+            resp = self._transport().request(
+                "POST", url, body=codec.dumps(body), headers=headers, timeout=timeout
+            )
+            text, usage, raw = self._decode(resp)
+        except Exception as e:
+            raise self._call_failed(e, model) from e
+        return self._result(model, t0, text, usage, raw)
+
+    async def agenerate(self, task: TaskEnvelope) -> Any:
+        transport = self._transport()
+        if not hasattr(transport, "arequest"):
+            # sync-only transport: run the blocking call off the event loop
+            return await asyncio.to_thread(self.generate, task)
+        url, headers, body, model = self._prepare(task)
+
+        timeout = call_timeout(60.0)
+        t0 = time.time()
+        try:
+            resp = await transport.arequest(  # type: ignore[attr-defined]
+                "POST", url, body=codec.dumps(body), headers=headers, timeout=timeout
+            )
+            text, usage, raw = self._decode(resp)
+        except Exception as e:
+            raise self._call_failed(e, model) from e
+        return self._result(model, t0, text, usage, raw)
+
+    def stream(self, task: TaskEnvelope) -> Iterator[dict[str, Any]]:
+        url, headers, body, model = self._prepare(task)
+        body["stream"] = True
+
+        timeout = call_timeout(60.0)
+        try:
+            resp = self._transport().open(
+                "POST", url, body=codec.dumps(body), headers=headers, timeout=timeout
+            )
+        except Exception as e:
+            raise self._call_failed(e, model) from e
+
+        with resp:
+            try:
+                yield from anthropic_chunks(resp.iter_lines())
+            except Exception as e:
+                raise self._call_failed(e, model) from e
@@ -1,15 +1,19 @@
 from __future__ import annotations
-import json
+import asyncio
 import os
 import time
 import urllib.parse
-import urllib.request
 import urllib.error
 from dataclasses import dataclass
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
 
+from roaudter_agent import codec
 from roaudter_agent.contracts import TaskEnvelope
-from roaudter_agent.providers.base import ProviderError
+from roaudter_agent.conversation import gemini_contents
+from roaudter_agent.deadline import call_timeout
+from roaudter_agent.providers.base import ProviderError, retry_meta
+from roaudter_agent.providers.streaming import gemini_chunks, gemini_usage
+from roaudter_agent.transport import Transport, default_transport
 
 
 @dataclass(slots=True)
@@ -23,6 +27,13 @@ class GeminiAdapter:
     api_key_env: str = "GEMINI_API_KEY"
     base_url: str = "https://generativelanguage.googleapis.com"
     default_model: str = "gemini-1.5-flash"
+    # False: decode only the text, the full response is not kept in result["raw"]
+    keep_raw: bool = True
+
+    transport: Optional[Transport] = None  # None => shared pooled default_transport()
+
+    def _transport(self) -> Transport:
+        return self.transport or default_transport()
 
     def _api_key(self) -> Optional[str]:
         return os.environ.get(self.api_key_env)
@@ -31,7 +42,7 @@ class GeminiAdapter:
         # Avoid network calls; key presence is enough to enable.
         return bool(self._api_key())
 
-    def generate(self, task: TaskEnvelope) -> Any:
+    def _prepare(self, task: TaskEnvelope, method: str = "generateContent") -> tuple[str, dict[str, str], dict[str, Any], str]:
         api_key = self._api_key()
         if not api_key:
             raise ProviderError(
@@ -41,9 +52,7 @@ class GeminiAdapter:
                 meta={"env": self.api_key_env},
             )
 
-        msg = task.payload.get("msg") or task.payload.get("text") or ""
-        if not msg:
-            raise ProviderError("empty payload.msg/text", code="bad_request", retryable=False)
+        system, contents = gemini_contents(task)
 
         model = (
             task.constraints.get("model")
@@ -53,54 +62,103 @@ class GeminiAdapter:
         )
 
         # Gemini generateContent format
-        body = {
-            "contents": [{"role": "user", "parts": [{"text": msg}]}],
-        }
+        body: dict[str, Any] = {"contents": contents}
+        if system:
+            body["systemInstruction"] = system
 
-        qs = urllib.parse.urlencode({"key": api_key})
-        url = f"{self.base_url}/v1beta/models/{model}:generateContent?{qs}"
+        params = {"key": api_key}
+        if method == "streamGenerateContent":
+            params["alt"] = "sse"
+        qs = urllib.parse.urlencode(params)
+        url = f"{self.base_url}/v1beta/models/{model}:{method}?{qs}"
+        headers = {"Content-Type": "application/json"}
+        return url, headers, body, model
 
-        req = urllib.request.Request(
-            url=url,
-            data=json.dumps(body).encode("utf-8"),
-            headers={"Content-Type": "application/json"},
-            method="POST",
-        )
-
-        t0 = time.time()
-        try:
-            with urllib.request.urlopen(req, timeout=60) as r:
-                raw = r.read().decode("utf-8")
-                data = json.loads(raw)
-        except urllib.error.HTTPError as e:
+    def _call_failed(self, e: Exception, model: str) -> ProviderError:
+        if isinstance(e, urllib.error.HTTPError):
             retryable = e.code in (429, 500, 502, 503, 504)
             code = "rate_limited" if e.code == 429 else "http_error"
-            raise ProviderError(
+            return ProviderError(
                 f"gemini call failed: HTTP {e.code} {e.reason}",
                 code=code,
                 http_status=e.code,
                 retryable=retryable,
-                meta={"model": model},
-            ) from e
-        except Exception as e:
-            raise ProviderError(
-                f"gemini call failed: {e}",
-                code="network_error",
-                retryable=True,
-                meta={"model": model},
-            ) from e
-
-        # Extract text
-        text = None
-        try:
-            text = data["candidates"][0]["content"]["parts"][0]["text"]
-        except Exception:
-            pass
+                meta={"model": model, **retry_meta(e.headers)},
+            )
+        return ProviderError(
+            f"gemini call failed: {e}",
+            code="network_error",
+            retryable=True,
+            meta={"model": model},
+        )
+
+    def _decode(self, resp: Any) -> tuple[Any, Any, Any]:
+        """(text, usage, raw); raw is None unless keep_raw."""
+        if not self.keep_raw:
+            fields = codec.decode_fields(resp.body, codec.GEMINI_FIELDS)
+            return fields["text"], gemini_usage(fields["usage"]), None
+        data = codec.loads(resp.body)
+        text = codec.pick(data, ("candidates", 0, "content", "parts", 0, "text"))
+        return text, gemini_usage(codec.pick(data, ("usageMetadata",))), data
 
-        return {
+    @staticmethod
+    def _result(model: str, t0: float, text: Any, usage: Any, raw: Any) -> dict[str, Any]:
+        out = {
             "provider": "gemini",
             "model": model,
             "latency_ms": int((time.time() - t0) * 1000),
             "text": text,
-            "raw": data,
+            "usage": usage,
         }
+        if raw is not None:
+            out["raw"] = raw
+        return out
+
+    def generate(self, task: TaskEnvelope) -> Any:
+        url, headers, body, model = self._prepare(task)
+
+        timeout = call_timeout(60.0)
+        t0 = time.time()
+        try:
+            resp = self._transport().request(
+                "POST", url, body=codec.dumps(body), headers=headers, timeout=timeout
+            )
+            text, usage, raw = self._decode(resp)
+        except Exception as e:
+            raise self._call_failed(e, model) from e
+        return self._result(model, t0, text, usage, raw)
+
+    async def agenerate(self, task: TaskEnvelope) -> Any:
+        transport = self._transport()
+        if not hasattr(transport, "arequest"):
+            # sync-only transport: run the blocking call off the event loop
+            return await asyncio.to_thread(self.generate, task)
+        url, headers, body, model = self._prepare(task)
+
+        timeout = call_timeout(60.0)
+        t0 = time.time()
+        try:
+            resp = await transport.arequest(  # type: ignore[attr-defined]
+                "POST", url, body=codec.dumps(body), headers=headers, timeout=timeout
+            )
+            text, usage, raw = self._decode(resp)
+        except Exception as e:
+            raise self._call_failed(e, model) from e
+        return self._result(model, t0, text, usage, raw)
+
+    def stream(self, task: TaskEnvelope) -> Iterator[dict[str, Any]]:
+        url, headers, body, model = self._prepare(task, method="streamGenerateContent")
+
+        timeout = call_timeout(60.0)
+        try:
+            resp = self._transport().open(
+                "POST", url, body=codec.dumps(body), headers=headers, timeout=timeout
+            )
+        except Exception as e:
+            raise self._call_failed(e, model) from e
+
+        with resp:
+            try:
+                yield from gemini_chunks(resp.iter_lines())
+            except Exception as e:
+                raise self._call_failed(e, model) from e
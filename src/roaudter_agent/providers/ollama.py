@@ -1,21 +1,25 @@
 from __future__ import annotations
-import json
 import os
-import time
-import urllib.request
-import urllib.error
-from dataclasses import dataclass
-from typing import Any
+from dataclasses import dataclass, field
+from typing import Any, Iterator, Optional
 
+from roaudter_agent import codec
 from roaudter_agent.contracts import TaskEnvelope
-from roaudter_agent.providers.base import ProviderError
+from roaudter_agent.conversation import is_multi_turn, task_messages
+from roaudter_agent.deadline import call_timeout
+from roaudter_agent.providers.openai_compat import PROFILES, OpenAICompatAdapter, VendorProfile
+from roaudter_agent.providers.streaming import ollama_chunks
 
 
 @dataclass(slots=True)
-class OllamaAdapter:
+class OllamaAdapter(OpenAICompatAdapter):
     name: str = "ollama"
     base_url: str = "http://172.31.80.1:11434"
     default_model: str = "llama3.2:1b"  # локальная по умолчанию
+    profile: VendorProfile = field(default_factory=lambda: PROFILES["ollama"])
+
+    # keep_alive sent with multi-turn requests (Ollama unloads idle models after 5m by default)
+    keep_alive: Optional[str] = "30m"
 
     @staticmethod
     def _offline_test_mode() -> bool:
@@ -24,17 +28,9 @@ class OllamaAdapter:
     def healthcheck(self) -> bool:
         if self._offline_test_mode():
             return True
-        try:
-            with urllib.request.urlopen(f"{self.base_url}/api/tags", timeout=2) as r:
-                return 200 <= r.status < 300
-        except Exception:
-            return False
-
-    def generate(self, task: TaskEnvelope) -> Any:
-        msg = task.payload.get("msg") or task.payload.get("text") or ""
-        if not msg:
-            raise ProviderError("empty payload.msg/text", code="bad_request", retryable=False)
+        return OpenAICompatAdapter.healthcheck(self)
 
+    def _select_model(self, task: TaskEnvelope) -> str:
         requested_model = (
             task.constraints.get("model")
             or task.payload.get("model")
@@ -50,96 +46,70 @@ class OllamaAdapter:
             model = self.default_model
         else:
             model = requested_model or self.default_model
-
-        body = {
-            "model": model,
-            "messages": [{"role": "user", "content": msg}],
-            "temperature": task.constraints.get("temperature", 0.2),
+        return model
+
+    def _keep_warm(self, body: dict[str, Any], messages: list[dict[str, str]]) -> None:
+        # multi-turn: keep the model (and its KV cache of the history) loaded until the next turn
+        if self.keep_alive and is_multi_turn(messages):
+            body["keep_alive"] = self.keep_alive
+
+    def _shape_body(self, body: dict[str, Any], task: TaskEnvelope, messages: list[dict[str, str]]) -> None:
+        OpenAICompatAdapter._shape_body(self, body, task, messages)
+        self._keep_warm(body, messages)
+
+    def _offline_result(self, task: TaskEnvelope) -> dict[str, Any]:
+        return {
+            "provider": "ollama",
+            "model": self._select_model(task),
+            "latency_ms": 1,
+            "text": "pong",
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+            "raw": {"mode": "offline_test"},
         }
 
+    def generate(self, task: TaskEnvelope) -> Any:
         if self._offline_test_mode():
-            return {
-                "provider": "ollama",
-                "model": model,
-                "latency_ms": 1,
-                "text": "pong",
-                "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
-                "raw": {"mode": "offline_test"},
-            }
-
-        req = urllib.request.Request(
-            url=f"{self.base_url}/v1/chat/completions",
-            data=json.dumps(body).encode("utf-8"),
-            headers={"Content-Type": "application/json"},
-            method="POST",
-        )
+            return self._offline_result(task)
+        return OpenAICompatAdapter.generate(self, task)
+
+    async def agenerate(self, task: TaskEnvelope) -> Any:
+        if self._offline_test_mode():
+            return self._offline_result(task)
+        return await OpenAICompatAdapter.agenerate(self, task)
 
-        # retry только для "временных" 429/сетевых (но не для cloud-квоты)
-        backoffs = [0.2, 0.6, 1.5]
-        last_exc: Exception | None = None
+    def stream(self, task: TaskEnvelope) -> Iterator[dict[str, Any]]:
+        """Native /api/chat NDJSON stream (no internal retries: nothing is replayed mid-stream)."""
+        messages = task_messages(task)
 
-        for i, delay in enumerate([0.0] + backoffs):
-            if delay:
-                time.sleep(delay)
+        model = self._select_model(task)
 
-            t0 = time.time()
-            try:
-                with urllib.request.urlopen(req, timeout=60) as r:
-                    raw = r.read().decode("utf-8")
-                    data = json.loads(raw)
-
-                content = None
-                try:
-                    content = data["choices"][0]["message"]["content"]
-                except Exception:
-                    pass
-
-                return {
-                    "provider": "ollama",
-                    "model": model,
-                    "latency_ms": int((time.time() - t0) * 1000),
-                    "text": content,
-                    "raw": data,
-                }
-
-            except urllib.error.HTTPError as e:
-                # Cloud лимит — НЕ ретраим, сразу отдаём структурированную ошибку
-                if e.code == 429 and str(model).endswith(":cloud"):
-                    raise ProviderError(
-                        "ollama cloud quota exhausted",
-                        code="quota_exhausted",
-                        http_status=429,
-                        retryable=False,
-                        meta={"model": model},
-                    ) from e
-
-                # обычный 429 может быть “server busy” → ретрай
-                if e.code == 429 and i < len(backoffs):
-                    last_exc = e
-                    continue
-
-                raise ProviderError(
-                    f"ollama v1 call failed: HTTP {e.code} {e.reason}",
-                    code="http_error",
-                    http_status=e.code,
-                    retryable=False,
-                    meta={"model": model},
-                ) from e
+        if self._offline_test_mode():
+            yield {"delta": "pong"}
+            yield {"usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}, "model": model}
+            return
+
+        body = {
+            "model": model,
+            "messages": messages,
+            "options": {"temperature": task.constraints.get("temperature", 0.2)},
+            "stream": True,
+        }
+        self._keep_warm(body, messages)
 
+        timeout = call_timeout(self.profile.timeout_s)
+        try:
+            resp = self._transport().open(
+                "POST",
+                f"{self._base_url()}/api/chat",
+                body=codec.dumps(body),
+                headers={"Content-Type": "application/json"},
+                timeout=timeout,
+            )
+        except Exception as e:
+            raise self._call_failed(e, model) from e
+
+        with resp:
+            try:
+                yield from ollama_chunks(resp.iter_lines())
             except Exception as e:
-                last_exc = e
-                if i < len(backoffs):
-                    continue
-                raise ProviderError(
-                    f"ollama v1 call failed: {e}",
-                    code="network_error",
-                    retryable=True,
-                    meta={"model": model},
-                ) from e
-
-        raise ProviderError(
-            f"ollama v1 call failed: {last_exc}",
-            code="unknown_error",
-            retryable=False,
-            meta={"model": model},
-        )
+                raise self._call_failed(e, model) from e
@@ -0,0 +1,258 @@
+"""
+One engine for every OpenAI-compatible chat endpoint (POST .../chat/completions).
+
+Vendors differ only in configuration, collected in a VendorProfile: endpoint
+path, auth header, health probe and error quirks. Request building, the pooled
+keep-alive transport, gzip, JSON (roaudter_agent.codec), streaming,
+deadline-aware timeouts and HTTP error mapping live here once.
+
+    # local vLLM / llama.cpp server: configuration only
+    vllm = OpenAICompatAdapter(name="vllm", base_url="http://gpu-1:8000/v1",
+                               default_model="qwen2.5-7b-instruct", profile=PROFILES["vllm"])
+"""
+
+from __future__ import annotations
+import asyncio
+import gzip
+import os
+import time
+import urllib.error
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Iterator, Optional
+
+from roaudter_agent import codec
+from roaudter_agent.contracts import TaskEnvelope
+from roaudter_agent.conversation import is_multi_turn, task_messages
+from roaudter_agent.deadline import call_timeout
+from roaudter_agent.providers.base import ProviderError, retry_meta
+from roaudter_agent.providers.streaming import openai_chunks
+from roaudter_agent.transport import Transport, default_transport
+
+
+@dataclass(slots=True, frozen=True)
+class VendorProfile:
+    """
+    Per-vendor quirks of an OpenAI-compatible API.
+    - label: name in results and error messages (None = adapter name)
+    - auth_header / auth_scheme: API key header; auth_header=None sends no key
+    - health_path: GET probe relative to base_url (None = healthy when the key is set)
+    - prompt_cache_key: send context trace_id as prompt_cache_key on multi-turn requests
+    - quota_model_suffix: a 429 for such models is a spent quota, not a busy server
+    """
+    label: Optional[str] = None
+    path: str = "/chat/completions"
+    auth_header: Optional[str] = "Authorization"
+    auth_scheme: str = "Bearer "
+    health_path: Optional[str] = None
+    prompt_cache_key: bool = False
+    stream_usage: bool = True
+    gzip: bool = True
+    timeout_s: float = 60.0
+    retryable_statuses: FrozenSet[int] = frozenset({429, 500, 502, 503, 504})
+    quota_model_suffix: Optional[str] = None
+
+
+PROFILES: Dict[str, VendorProfile] = {
+    "openai": VendorProfile(label="openai", prompt_cache_key=True),
+    "grok": VendorProfile(label="grok"),
+    "deepseek": VendorProfile(label="deepseek"),
+    # /v1 compatibility layer; base_url is the server root so /api/tags works too
+    "ollama": VendorProfile(
+        label="ollama", path="/v1/chat/completions", auth_header=None,
+        health_path="/api/tags", quota_model_suffix=":cloud",
+    ),
+    # self-hosted servers: no key by default, /models answers once weights are loaded
+    "vllm": VendorProfile(auth_header=None, health_path="/models"),
+    "llamacpp": VendorProfile(auth_header=None, health_path="/models", stream_usage=False),
+}
+
+
+@dataclass(slots=True)
+class OpenAICompatAdapter:
+    name: str = "openai_compat"
+    base_url: str = "http://127.0.0.1:8000/v1"
+    default_model: str = "default"
+    api_key_env: Optional[str] = None   # None => no key required
+    base_url_env: Optional[str] = None  # env var that overrides base_url
+    profile: VendorProfile = field(default_factory=VendorProfile)
+    # False: decode only text/usage, the full response is not kept in result["raw"]
+    keep_raw: bool = True
+
+    transport: Optional[Transport] = None  # None => shared pooled default_transport()
+
+    def _transport(self) -> Transport:
+        return self.transport or default_transport()
+
+    def _label(self) -> str:
+        return self.profile.label or self.name
+
+    def _api_key(self) -> Optional[str]:
+        return os.environ.get(self.api_key_env) if self.api_key_env else None
+
+    def _base_url(self) -> str:
+        url = os.environ.get(self.base_url_env, self.base_url) if self.base_url_env else self.base_url
+        return url.rstrip("/")
+
+    def healthcheck(self) -> bool:
+        if self.api_key_env and not self._api_key():
+            return False
+        if not self.profile.health_path:
+            # Не делаем сетевой healthcheck (дорого/лимиты). Достаточно наличия ключа.
+            return True
+        try:
+            r = self._transport().request("GET", self._base_url() + self.profile.health_path, timeout=2)
+            return 200 <= r.status < 300
+        except Exception:
+            return False
+
+
+    def _select_model(self, task: TaskEnvelope) -> str:
+        return (
+            task.constraints.get("model")
+            or task.payload.get("model")
+            or task.payload.get("llm_model")
+            or self.default_model
+        )
+
+    def _shape_body(self, body: dict[str, Any], task: TaskEnvelope, messages: list[dict[str, str]]) -> None:
+        """Vendor-specific request fields (subclasses extend)."""
+        trace_id = (task.context or {}).get("trace_id")
+        if self.profile.prompt_cache_key and trace_id and is_multi_turn(messages):
+            # routes turns of one conversation to the same prefix-cache shard
+            body["prompt_cache_key"] = str(trace_id)
+
+    def _prepare(self, task: TaskEnvelope) -> tuple[str, dict[str, str], dict[str, Any], str]:
+        headers = {"Content-Type": "application/json"}
+        if self.api_key_env:
+            api_key = self._api_key()
+            if not api_key:
+                raise ProviderError(
+                    f"missing env {self.api_key_env}",
+                    code="missing_api_key",
+                    retryable=False,
+                    meta={"env": self.api_key_env},
+                )
+            if self.profile.auth_header:
+                headers[self.profile.auth_header] = self.profile.auth_scheme + api_key
+
+        messages = task_messages(task)
+        model = self._select_model(task)
+        body = {
+            "model": model,
+            # full history, unchanged order: the provider's automatic prefix cache
+            # serves the shared prefix of consecutive turns
+            "messages": messages,
+            "temperature": task.constraints.get("temperature", 0.2),
+        }
+        self._shape_body(body, task, messages)
+        return self._base_url() + self.profile.path, headers, body, model
+
+    def _call_failed(self, e: Exception, model: str) -> ProviderError:
+        label = self._label()
+        meta = {"model": model, "base_url": self._base_url()}
+        if isinstance(e, urllib.error.HTTPError):
+            suffix = self.profile.quota_model_suffix
+            if e.code == 429 and suffix and str(model).endswith(suffix):
+                # лимит подписки — НЕ ретраим, сразу отдаём структурированную ошибку
+                return ProviderError(
+                    f"{label} quota exhausted",
+                    code="quota_exhausted",
+                    http_status=429,
+                    retryable=False,
+                    meta={**meta, **retry_meta(e.headers)},
+                )
+            # 401/403: ключ/доступ; 429: rate limit; 5xx: transient
+            return ProviderError(
+                f"{label} call failed: HTTP {e.code} {e.reason}",
+                code="rate_limited" if e.code == 429 else "http_error",
+                http_status=e.code,
+                retryable=e.code in self.profile.retryable_statuses,
+                meta={**meta, **retry_meta(e.headers)},
+            )
+        return ProviderError(
+            f"{label} call failed: {e}",
+            code="network_error",
+            retryable=True,
+            meta=meta,
+        )
+
+    def _decode(self, resp: Any) -> tuple[Any, Any, Any]:
+        """(text, usage, raw); raw is None unless keep_raw."""
+        data = resp.body
+        if (resp.headers.get("Content-Encoding") or "").lower() == "gzip":
+            data = gzip.decompress(data)
+        if not self.keep_raw:
+            fields = codec.decode_fields(data, codec.OPENAI_FIELDS)
+            return fields["text"], fields["usage"], None
+        raw = codec.loads(data)
+        return codec.pick(raw, ("choices", 0, "message", "content")), codec.pick(raw, ("usage",)), raw
+
+    def _result(self, model: str, t0: float, text: Any, usage: Any, raw: Any) -> dict[str, Any]:
+        out = {
+            "provider": self._label(),
+            "model": model,
+            "latency_ms": int((time.time() - t0) * 1000),
+            "text": text,
+            "usage": usage,
+        }
+        if raw is not None:
+            out["raw"] = raw
+        return out
+
+    def generate(self, task: TaskEnvelope) -> Any:
+        url, headers, body, model = self._prepare(task)
+        if self.profile.gzip:
+            headers["Accept-Encoding"] = "gzip"
+
+        # ретраев здесь нет: повторы/backoff/дедлайн решает RouterAgent.retry,
+        # адаптер только классифицирует ошибку (retryable + retry_after_ms)
+        timeout = call_timeout(self.profile.timeout_s)
+        t0 = time.time()
+        try:
+            resp = self._transport().request(
+                "POST", url, body=codec.dumps(body), headers=headers, timeout=timeout
+            )
+            text, usage, raw = self._decode(resp)
+        except Exception as e:
+            raise self._call_failed(e, model) from e
+        return self._result(model, t0, text, usage, raw)
+
+    async def agenerate(self, task: TaskEnvelope) -> Any:
+        transport = self._transport()
+        if not hasattr(transport, "arequest"):
+            # sync-only transport: run the blocking call off the event loop
+            return await asyncio.to_thread(self.generate, task)
+        url, headers, body, model = self._prepare(task)
+        if self.profile.gzip:
+            headers["Accept-Encoding"] = "gzip"
+
+        timeout = call_timeout(self.profile.timeout_s)
+        t0 = time.time()
+        try:
+            resp = await transport.arequest(  # type: ignore[attr-defined]
+                "POST", url, body=codec.dumps(body), headers=headers, timeout=timeout
+            )
+            text, usage, raw = self._decode(resp)
+        except Exception as e:
+            raise self._call_failed(e, model) from e
+        return self._result(model, t0, text, usage, raw)
+
+    def stream(self, task: TaskEnvelope) -> Iterator[dict[str, Any]]:
+        url, headers, body, model = self._prepare(task)
+        body["stream"] = True
+        if self.profile.stream_usage:
+            body["stream_options"] = {"include_usage": True}
+
+        timeout = call_timeout(self.profile.timeout_s)
+        try:
+            resp = self._transport().open(
+                "POST", url, body=codec.dumps(body), headers=headers, timeout=timeout
+            )
+        except Exception as e:
+            raise self._call_failed(e, model) from e
+
+        with resp:
+            try:
+                yield from openai_chunks(resp.iter_lines())
+            except Exception as e:
+                raise self._call_failed(e, model) from e
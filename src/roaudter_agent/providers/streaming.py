@@ -0,0 +1,136 @@
+"""
+Incremental response parsers for streaming adapters.
+
+Adapters' stream(task) yields chunk dicts:
+    {"delta": "<text>"}              -- next piece of completion text
+    {"usage": {...}, "model": "..."} -- provider usage, usually once at the end
+"""
+
+from __future__ import annotations
+from typing import Any, Iterable, Iterator, Optional, Tuple
+
+from roaudter_agent import codec
+
+
+def iter_sse(lines: Iterable[bytes]) -> Iterator[Tuple[Optional[str], str]]:
+    """Server-Sent Events -> (event, data); multi-line data is joined with '\\n'."""
+    event: Optional[str] = None
+    data: list[str] = []
+    for raw in lines:
+        line = raw.decode("utf-8") if isinstance(raw, bytes) else raw
+        if not line:
+            if data:
+                yield event, "\n".join(data)
+            event, data = None, []
+            continue
+        if line.startswith(":"):
+            continue
+        field, _, value = line.partition(":")
+        if value.startswith(" "):
+            value = value[1:]
+        if field == "event":
+            event = value
+        elif field == "data":
+            data.append(value)
+    if data:
+        yield event, "\n".join(data)
+
+
+def iter_ndjson(lines: Iterable[bytes]) -> Iterator[Any]:
+    for raw in lines:
+        if raw.strip():
+            yield codec.loads(raw)
+
+
+def openai_chunks(lines: Iterable[bytes]) -> Iterator[dict[str, Any]]:
+    """OpenAI-compatible chat.completion.chunk SSE (stream_options.include_usage)."""
+    for _event, data in iter_sse(lines):
+        if data == "[DONE]":
+            return
+        obj = codec.loads(data)
+        for choice in obj.get("choices") or []:
+            content = (choice.get("delta") or {}).get("content")
+            if content:
+                yield {"delta": content}
+        if obj.get("usage"):
+            yield {"usage": obj["usage"], "model": obj.get("model")}
+
+
+def anthropic_chunks(lines: Iterable[bytes]) -> Iterator[dict[str, Any]]:
+    """Anthropic Messages stream: message_start / content_block_delta / message_delta."""
+    usage: dict[str, Any] = {}
+    model = None
+    for event, data in iter_sse(lines):
+        obj = codec.loads(data)
+        kind = obj.get("type") or event
+        if kind == "message_start":
+            message = obj.get("message") or {}
+            model = message.get("model")
+            usage.update(message.get("usage") or {})
+        elif kind == "content_block_delta":
+            text = (obj.get("delta") or {}).get("text")
+            if text:
+                yield {"delta": text}
+        elif kind == "message_delta":
+            usage.update(obj.get("usage") or {})
+        elif kind == "message_stop":
+            break
+        elif kind == "error":
+            raise ValueError((obj.get("error") or {}).get("message") or "stream error")
+    if usage:
+        yield {"usage": usage, "model": model}
+
+
+def gemini_usage(meta: Any) -> Optional[dict[str, Any]]:
+    """Gemini usageMetadata in the prompt_tokens/completion_tokens shape the other adapters report."""
+    if not isinstance(meta, dict) or not meta:
+        return None
+    pt, ct = meta.get("promptTokenCount"), meta.get("candidatesTokenCount")
+    usage: dict[str, Any] = {}
+    if isinstance(pt, int):
+        usage["prompt_tokens"] = pt
+    if isinstance(ct, int):
+        usage["completion_tokens"] = ct
+    total = meta.get("totalTokenCount")
+    if isinstance(total, int):
+        usage["total_tokens"] = total
+    elif isinstance(pt, int) and isinstance(ct, int):
+        usage["total_tokens"] = pt + ct
+    cached = meta.get("cachedContentTokenCount")
+    if isinstance(cached, int):
+        usage["prompt_tokens_details"] = {"cached_tokens": cached}
+    return usage or None
+
+
+def gemini_chunks(lines: Iterable[bytes]) -> Iterator[dict[str, Any]]:
+    """Gemini streamGenerateContent?alt=sse: each event is a partial GenerateContentResponse."""
+    meta = None
+    for _event, data in iter_sse(lines):
+        obj = codec.loads(data)
+        for cand in obj.get("candidates") or []:
+            for part in (cand.get("content") or {}).get("parts") or []:
+                if part.get("text"):
+                    yield {"delta": part["text"]}
+        meta = obj.get("usageMetadata") or meta
+    usage = gemini_usage(meta)
+    if usage:
+        yield {"usage": usage}
+
+
+def ollama_chunks(lines: Iterable[bytes]) -> Iterator[dict[str, Any]]:
+    """Ollama native /api/chat NDJSON."""
+    for obj in iter_ndjson(lines):
+        if obj.get("error"):
+            raise ValueError(obj["error"])
+        content = (obj.get("message") or {}).get("content")
+        if content:
+            yield {"delta": content}
+        if obj.get("done"):
+            pt = obj.get("prompt_eval_count")
+            ct = obj.get("eval_count")
+            if isinstance(pt, int) and isinstance(ct, int):
+                yield {
+                    "usage": {"prompt_tokens": pt, "completion_tokens": ct, "total_tokens": pt + ct},
+                    "model": obj.get("model"),
+                }
+            return
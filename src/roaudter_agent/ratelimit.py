@@ -0,0 +1,105 @@
+from __future__ import annotations
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+@dataclass(slots=True)
+class RateLimit:
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+
+
+class TokenBucket:
+    """
+    Classic token bucket: `capacity` tokens, refilled at `rate` per second.
+    consume() may drive the level negative (usage is only known after the call);
+    the debt is paid back by refill before anything new is admitted.
+    """
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float]) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._level = capacity
+        self._ts = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        if now > self._ts:
+            self._level = min(self.capacity, self._level + (now - self._ts) * self.rate)
+        self._ts = now
+
+    def level(self) -> float:
+        self._refill()
+        return self._level
+
+    def try_take(self, n: float = 1.0) -> bool:
+        self._refill()
+        if self._level >= n:
+            self._level -= n
+            return True
+        return False
+
+    def consume(self, n: float) -> None:
+        self._refill()
+        self._level -= n
+
+
+def limiter_key(adapter: Any) -> Tuple[str, str]:
+    """Buckets are per (adapter name, API key env): two keys for one vendor get separate budgets."""
+    return adapter.name, getattr(adapter, "api_key_env", "") or ""
+
+
+class RateLimiter:
+    """
+    Client-side requests/min and tokens/min budgets per provider.
+    - limits: adapter name -> RateLimit (providers without an entry are unlimited)
+    - try_acquire() before a call takes one request token
+    - record_usage() after a call charges the usage tokens the router lifted
+    Thread-safe; never blocks, so it is safe to call from the event loop too.
+    """
+    def __init__(self, limits: Dict[str, RateLimit], clock: Callable[[], float] = time.monotonic) -> None:
+        self.limits = dict(limits)
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key -> (requests bucket, tokens bucket)
+        self._buckets: Dict[Tuple[str, str], Tuple[Optional[TokenBucket], Optional[TokenBucket]]] = {}
+
+    def _get(self, adapter: Any) -> Tuple[Optional[TokenBucket], Optional[TokenBucket]]:
+        key = limiter_key(adapter)
+        buckets = self._buckets.get(key)
+        if buckets is None:
+            limit = self.limits.get(adapter.name) or RateLimit()
+            rpm, tpm = limit.requests_per_minute, limit.tokens_per_minute
+            buckets = self._buckets[key] = (
+                TokenBucket(rpm / 60.0, rpm, self._clock) if rpm else None,
+                TokenBucket(tpm / 60.0, tpm, self._clock) if tpm else None,
+            )
+        return buckets
+
+    def has_budget(self, adapter: Any) -> bool:
+        with self._lock:
+            requests, tokens = self._get(adapter)
+            if requests is not None and requests.level() < 1.0:
+                return False
+            if tokens is not None and tokens.level() <= 0.0:
+                return False
+            return True
+
+    def try_acquire(self, adapter: Any) -> bool:
+        with self._lock:
+            requests, tokens = self._get(adapter)
+            if tokens is not None and tokens.level() <= 0.0:
+                return False
+            if requests is not None and not requests.try_take(1.0):
+                return False
+            return True
+
+    def record_usage(self, adapter: Any, tokens_used: Optional[int]) -> None:
+        if not tokens_used:
+            return
+        with self._lock:
+            _requests, tokens = self._get(adapter)
+            if tokens is not None:
+                tokens.consume(float(tokens_used))
@@ -1,7 +1,12 @@
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import List
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
 
+from roaudter_agent.cache import cache_from_env
+from roaudter_agent.conversation import ConversationStore
+from roaudter_agent.cost import spend_from_env
 from roaudter_agent.policy import RouterPolicy
 from roaudter_agent.router import RouterAgent
 from roaudter_agent.providers.base import ProviderState
@@ -11,6 +16,32 @@ from roaudter_agent.providers.gemini import GeminiAdapter
 from roaudter_agent.providers.claude import ClaudeAdapter
 from roaudter_agent.providers.grok import GrokAdapter
 from roaudter_agent.providers.deepseek import DeepSeekAdapter
+from roaudter_agent.providers.openai_compat import OpenAICompatAdapter
+from roaudter_agent.metrics import RouterMetrics
+from roaudter_agent.ratelimit import RateLimit, RateLimiter
+from roaudter_agent.retention import retention_from_env
+from roaudter_agent.stats import ProviderStats
+
+_metrics_lock = threading.Lock()
+_served_metrics: Optional[RouterMetrics] = None
+
+
+def _metrics_from_env() -> RouterMetrics:
+    """
+    ROAUDTER_METRICS_PORT=N: OpenMetrics text on http://ROAUDTER_METRICS_HOST:N/metrics.
+    The endpoint is started once per process; every default router built after
+    that reports into the same RouterMetrics instead of binding the port again.
+    """
+    global _served_metrics
+    port = os.getenv("ROAUDTER_METRICS_PORT", "").strip()
+    if not port:
+        return RouterMetrics()
+    with _metrics_lock:
+        if _served_metrics is None:
+            metrics = RouterMetrics()
+            metrics.registry.serve(host=os.getenv("ROAUDTER_METRICS_HOST", "127.0.0.1"), port=int(port))
+            _served_metrics = metrics
+        return _served_metrics
 
 
 @dataclass(slots=True)
@@ -25,19 +56,71 @@ class ProviderConfig:
     grok_model: str = "grok-2-latest"
     deepseek_model: str = "deepseek-chat"
 
+    # client-side budgets per provider name, e.g. {"openai": RateLimit(requests_per_minute=500)}
+    rate_limits: Dict[str, RateLimit] = field(default_factory=dict)
+
+    # USD per spend window by tenant ("*" = everyone else), e.g. {"acme": 20.0, "*": 2.0}
+    tenant_budgets: Dict[str, float] = field(default_factory=dict)
+    spend_window_seconds: float = 86400.0
+
+    # extra OpenAI-compatible endpoints (vLLM, llama.cpp, ...), appended to the default chain
+    compat_providers: List[OpenAICompatAdapter] = field(default_factory=list)
+
 
 def build_default_router(cfg: ProviderConfig | None = None) -> RouterAgent:
     cfg = cfg or ProviderConfig()
 
+    # ROAUDTER_RAW_RETENTION=full|summary|none|spill[:/dir]: what result["raw"] keeps
+    retention = retention_from_env()
+    # ROAUDTER_KEEP_RAW=0 (implied by retention "none"): adapters decode only text/usage
+    keep_raw = os.getenv("ROAUDTER_KEEP_RAW", "").strip() != "0" and (
+        retention is None or retention.mode != "none"
+    )
     providers: List[ProviderState] = [
-        ProviderState(DeepSeekAdapter(default_model=cfg.deepseek_model)),
-        ProviderState(GrokAdapter(default_model=cfg.grok_model)),
-        ProviderState(ClaudeAdapter(default_model=cfg.claude_model)),
-        ProviderState(GeminiAdapter(default_model=cfg.gemini_model)),
-        ProviderState(OpenAIAdapter(default_model=cfg.openai_model)),
-        ProviderState(OllamaAdapter(name="ollama", base_url=cfg.ollama_base_url, default_model=cfg.ollama_local_model)),
-        ProviderState(OllamaAdapter(name="ollama_cloud", base_url=cfg.ollama_base_url, default_model=cfg.ollama_cloud_model)),
+        ProviderState(DeepSeekAdapter(default_model=cfg.deepseek_model, keep_raw=keep_raw)),
+        ProviderState(GrokAdapter(default_model=cfg.grok_model, keep_raw=keep_raw)),
+        ProviderState(ClaudeAdapter(default_model=cfg.claude_model, keep_raw=keep_raw)),
+        ProviderState(GeminiAdapter(default_model=cfg.gemini_model, keep_raw=keep_raw)),
+        ProviderState(OpenAIAdapter(default_model=cfg.openai_model, keep_raw=keep_raw)),
+        ProviderState(OllamaAdapter(
+            name="ollama", base_url=cfg.ollama_base_url, default_model=cfg.ollama_local_model, keep_raw=keep_raw
+        )),
+        ProviderState(OllamaAdapter(
+            name="ollama_cloud", base_url=cfg.ollama_base_url, default_model=cfg.ollama_cloud_model, keep_raw=keep_raw
+        )),
     ]
+    providers.extend(ProviderState(a) for a in cfg.compat_providers)
+
+    # one stats instance: RouterAgent feeds it, RouterPolicy ranks adaptive profiles with it
+    stats = ProviderStats()
+    limiter = RateLimiter(cfg.rate_limits) if cfg.rate_limits else None
+    # ROAUDTER_SPEND_DB=/path/spend.db keeps tenant spend across restarts
+    spend = spend_from_env(cfg.tenant_budgets, cfg.spend_window_seconds)
+    policy = RouterPolicy(
+        default_chain=["deepseek", "grok", "claude", "gemini", "openai", "ollama", "ollama_cloud"]
+        + [a.name for a in cfg.compat_providers],
+        stats=stats,
+        limiter=limiter,
+        spend=spend,
+    )
+    router = RouterAgent(
+        policy=policy,
+        providers=providers,
+        stats=stats,
+        cache=cache_from_env(),
+        rate_limiter=limiter,
+        metrics=_metrics_from_env(),
+        spend=spend,
+        # ROAUDTER_COALESCE=1: identical concurrent tasks share one upstream call
+        coalesce=os.getenv("ROAUDTER_COALESCE", "").strip() == "1",
+        # ROAUDTER_CONVERSATIONS=1: keep chat history per context trace_id (send only the new turn)
+        conversations=ConversationStore() if os.getenv("ROAUDTER_CONVERSATIONS", "").strip() == "1" else None,
+        raw_retention=retention,
+    )
 
-    policy = RouterPolicy(default_chain=["deepseek", "grok", "claude", "gemini", "openai", "ollama", "ollama_cloud"])
-    return RouterAgent(policy=policy, providers=providers)
+    # ROAUDTER_HEALTH_PROBE_SECONDS=N: background healthchecks every ~N s instead of inline TTL checks;
+    # the thread belongs to this router, router.stop() ends it
+    probe_seconds = os.getenv("ROAUDTER_HEALTH_PROBE_SECONDS", "").strip()
+    if probe_seconds:
+        router.start_health_prober(interval_seconds=float(probe_seconds))
+    return router
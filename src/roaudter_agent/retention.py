@@ -0,0 +1,114 @@
+"""
+What a successful route keeps of the vendor's raw response (result["raw"]).
+
+    full     as returned by the adapter (default)
+    summary  a few identifying fields: {"id", "finish_reason", "keys"}
+    none     dropped
+    spill    written to <dir>/<ref>.json; result["raw"] = {"ref": ref, "bytes": n},
+             read back with RawRetention.load(ref)
+
+Applied before the response cache and the comm-agent reply, so neither carries
+multi-KB vendor JSON per task. text / usage / model are never touched.
+"""
+
+from __future__ import annotations
+import os
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from roaudter_agent import codec
+
+RETENTION_MODES = ("full", "summary", "none", "spill")
+
+# finish reason by vendor: OpenAI-compatible, Anthropic, Gemini
+_FINISH_PATHS = (("choices", 0, "finish_reason"), ("stop_reason",), ("candidates", 0, "finishReason"))
+
+
+def summarize_raw(raw: Any) -> dict[str, Any]:
+    if not isinstance(raw, dict):
+        return {"type": type(raw).__name__}
+    finish = None
+    for path in _FINISH_PATHS:
+        finish = codec.pick(raw, path)
+        if finish is not None:
+            break
+    return {"id": raw.get("id") or raw.get("responseId"), "finish_reason": finish, "keys": sorted(raw)}
+
+
+@dataclass(slots=True)
+class RawRetention:
+    mode: str = "full"
+    spill_dir: Optional[str] = None  # spill mode; None => <tmp>/roaudter-raw
+
+    def __post_init__(self) -> None:
+        if self.mode not in RETENTION_MODES:
+            raise ValueError(f"raw retention mode must be one of {RETENTION_MODES}, got {self.mode!r}")
+        if self.mode == "spill" and not self.spill_dir:
+            self.spill_dir = os.path.join(tempfile.gettempdir(), "roaudter-raw")
+
+    def apply(self, out: Any) -> Any:
+        """Adapter output with "raw" reduced per mode (a new dict; `out` is not modified)."""
+        if self.mode == "full" or not isinstance(out, dict) or "raw" not in out:
+            return out
+        out = dict(out)
+        raw = out.pop("raw")
+        if self.mode == "summary":
+            out["raw"] = summarize_raw(raw)
+        elif self.mode == "spill":
+            out["raw"] = self._spill(raw)
+        return out
+
+    def _spill(self, raw: Any) -> dict[str, Any]:
+        ref = uuid.uuid4().hex
+        data = codec.dumps(raw)
+        try:
+            os.makedirs(self.spill_dir, exist_ok=True)  # type: ignore[arg-type]
+            with open(self._path(ref), "wb") as f:
+                f.write(data)
+        except OSError:
+            # диск недоступен — ответ важнее сырого JSON
+            return {**summarize_raw(raw), "spill_error": True}
+        return {"ref": ref, "bytes": len(data)}
+
+    def _path(self, ref: str) -> str:
+        if not ref.isalnum():
+            raise ValueError(f"bad raw ref {ref!r}")
+        return os.path.join(self.spill_dir or "", f"{ref}.json")
+
+    def load(self, ref: str) -> Any:
+        """Spilled raw response by ref (FileNotFoundError once purged)."""
+        with open(self._path(ref), "rb") as f:
+            return codec.loads(f.read())
+
+    def purge(self, max_age_s: float) -> int:
+        """Delete spilled responses older than `max_age_s`; returns how many were removed."""
+        if not self.spill_dir or not os.path.isdir(self.spill_dir):
+            return 0
+        cutoff = time.time() - max_age_s
+        removed = 0
+        for entry in os.scandir(self.spill_dir):
+            if entry.name.endswith(".json") and entry.stat().st_mtime < cutoff:
+                try:
+                    os.remove(entry.path)
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
+
+
+def retention_from_env() -> Optional[RawRetention]:
+    """
+    ROAUDTER_RAW_RETENTION:
+      full | summary | none
+      spill              -> <tmp>/roaudter-raw
+      spill:/path/dir    -> that directory
+    unset/empty -> None (full)
+    """
+    raw = os.getenv("ROAUDTER_RAW_RETENTION", "").strip()
+    if not raw:
+        return None
+    mode, _, spill_dir = raw.partition(":")
+    return RawRetention(mode.lower(), spill_dir=spill_dir or None)
@@ -0,0 +1,48 @@
+from __future__ import annotations
+import random
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+@dataclass(slots=True)
+class RetryPolicy:
+    """
+    Same-provider retry schedule for RouterAgent.
+    - at most `max_attempts` attempts per provider
+    - all retries of one route share `budget_ms` (measured from route start)
+    - backoff: decorrelated jitter, sleep = min(cap, U(base, prev * 3))
+    - a server-advertised wait (ProviderError.meta["retry_after_ms"]) is honored
+      as a floor; if it does not fit the remaining budget, switch provider now
+    """
+    max_attempts: int = 3
+    budget_ms: int = 800
+    base_ms: int = 10
+    cap_ms: int = 80
+    rng: random.Random = field(default_factory=random.Random, repr=False)
+
+    def jitter_ms(self, prev_ms: Optional[float]) -> float:
+        prev = self.base_ms if prev_ms is None else max(prev_ms, self.base_ms)
+        return min(self.cap_ms, self.rng.uniform(self.base_ms, prev * 3))
+
+    def next_delay_ms(
+        self,
+        attempt: int,
+        elapsed_ms: int,
+        prev_ms: Optional[float] = None,
+        retry_after_ms: Optional[int] = None,
+    ) -> Optional[int]:
+        """
+        Backoff before attempt `attempt + 1`, or None to move on to the next provider.
+        `attempt` is the number of failed attempts on this provider so far.
+        """
+        if attempt >= self.max_attempts:
+            return None
+        remaining_ms = self.budget_ms - elapsed_ms
+        if remaining_ms <= 0:
+            return None
+        delay_ms = self.jitter_ms(prev_ms)
+        if retry_after_ms is not None:
+            if retry_after_ms > remaining_ms:
+                return None  # waiting would burn the whole budget: fall back instead
+            delay_ms = max(delay_ms, retry_after_ms)
+        return int(min(delay_ms, remaining_ms))
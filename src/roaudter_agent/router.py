@@ -1,31 +1,296 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import threading
 import time
-from dataclasses import dataclass, field
-from typing import Optional
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from dataclasses import dataclass, field, replace
+from typing import Any, AsyncIterator, Callable, Generator, Iterable, Iterator, Optional
 
+from roaudter_agent.cache import ResponseCache, cache_key, is_cacheable
 from roaudter_agent.contracts import TaskEnvelope, ResultEnvelope
-from roaudter_agent.health import HealthMonitor
+from roaudter_agent.conversation import ConversationStore
+from roaudter_agent.cost import SpendTracker, call_cost, cost_cap, estimate_cost, task_tenant
+from roaudter_agent.deadline import deadline_scope, task_deadline
+from roaudter_agent import logsink
+from roaudter_agent.health import HealthMonitor, HealthProber
+from roaudter_agent.metrics import RouterMetrics
 from roaudter_agent.policy import RouterPolicy
-from roaudter_agent.providers.base import ProviderError, ProviderState
+from roaudter_agent.providers.base import ProviderError, ProviderState, call_agenerate, call_stream
+from roaudter_agent.ratelimit import RateLimiter
+from roaudter_agent.retention import RawRetention
+from roaudter_agent.retry import RetryPolicy
+from roaudter_agent.singleflight import AsyncSingleFlight, SingleFlight
+from roaudter_agent.stats import ProviderStats
+from roaudter_agent.tokens import prompt_budget, task_tokens, tokenizer_for, truncate_oldest
+
+
+def _log_on(level: str, event: str) -> bool:
+    """Cheap pre-check: lam_logging present and the event passes LAM_LOG_LEVEL/LAM_LOG_EVENTS."""
+    return logsink.lam_log() is not None and logsink.enabled(level, event)
 
 
 def _emit(level: str, event: str, msg: str, **fields) -> None:
     """Best-effort structured logging.
     Uses LAM's lam_logging if available; otherwise no-ops (keeps noise minimal).
+    Callers guard with _log_on() so filtered events don't build their fields.
     """
+    log = logsink.lam_log()
+    if log is None:
+        return
     try:
-        from lam_logging import log  # type: ignore
         log(level, event, msg, **fields)
     except Exception:
         return
 
 
+def _task_ctx(task: TaskEnvelope) -> dict:
+    ctx = task.context or (task.payload.get("context") if isinstance(task.payload, dict) else None)
+    return ctx if isinstance(ctx, dict) else {}
+
+
+def _lift_usage(out: Any) -> tuple[Optional[dict], Optional[int]]:
+    """unified usage/tokens: lift provider-native usage to envelope level"""
+    usage = out.get("usage") if isinstance(out, dict) else None
+    if not isinstance(usage, dict):
+        return None, None
+
+    tokens = (
+        usage.get("total_tokens")
+        or usage.get("total")
+        or usage.get("tokens")
+    )
+    if tokens is None:
+        pt = usage.get("prompt_tokens")
+        ct = usage.get("completion_tokens")
+        if isinstance(pt, int) and isinstance(ct, int):
+            tokens = pt + ct
+    return usage, tokens
+
+
+def _is_transient(e: ProviderError) -> bool:
+    status = e.http_status
+    return (status is None) or (status == 429) or (isinstance(status, int) and status >= 500)
+
+
+def _is_outage(e: ProviderError) -> Optional[bool]:
+    """Circuit-breaker verdict: True = provider looks down, None = says nothing (4xx, missing key...)."""
+    status = e.http_status
+    if (status is None and e.retryable) or (isinstance(status, int) and status >= 500):
+        return True
+    return None
+
+
+class _ProviderLimits:
+    """Per-provider concurrency caps shared by all tasks of one route_many() batch."""
+    def __init__(self, limits: Optional[dict[str, int]]) -> None:
+        self.limits = dict(limits or {})
+        self._sync: dict[str, threading.BoundedSemaphore] = {}
+        self._async: dict[str, asyncio.Semaphore] = {}
+        self._lock = threading.Lock()
+
+    def hold(self, name: str) -> Any:
+        limit = self.limits.get(name)
+        if not limit:
+            return contextlib.nullcontext()
+        with self._lock:
+            sem = self._sync.get(name)
+            if sem is None:
+                sem = self._sync[name] = threading.BoundedSemaphore(limit)
+        return sem
+
+    def ahold(self, name: str) -> Any:
+        limit = self.limits.get(name)
+        if not limit:
+            return contextlib.nullcontext()
+        sem = self._async.get(name)
+        if sem is None:
+            sem = self._async[name] = asyncio.Semaphore(limit)
+        return sem
+
+
+_NO_LIMITS = _ProviderLimits(None)
+
+
+@dataclass(slots=True)
+class _RouteRun:
+    """Per-route bookkeeping shared by the sync and async paths."""
+    task: TaskEnvelope
+    ctx: dict
+    start: float
+    policy_hint: Optional[str]
+    policy_hint_source: str
+    chain: list[ProviderState] = field(default_factory=list)
+    selected_chain: list[str] = field(default_factory=list)
+    cache_key: Optional[str] = None
+    limits: _ProviderLimits = _NO_LIMITS
+    attempts: int = 0
+    errors: list[dict] = field(default_factory=list)
+    last_err: Optional[dict] = None
+    # extra envelope metrics contributed by optional features (hedging, ...)
+    extra_metrics: dict[str, Any] = field(default_factory=dict)
+    # set once a winner is chosen; in-flight hedged calls stop retrying
+    finished: bool = False
+    # absolute end-to-end deadline from constraints["deadline_ms"] (time.time() scale)
+    deadline: Optional[float] = None
+    timed_out: bool = False
+    metrics: Optional[RouterMetrics] = None
+    # most one call may cost (USD): min(max_cost, tenant budget left); None = unlimited
+    cost_cap: Optional[float] = None
+    cost_usd: Optional[float] = None
+    # conversation (trace_id) this route continues and the user turn to record with the answer
+    conversation: Optional[str] = None
+    turn: Optional[dict] = None
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def elapsed_ms(self) -> int:
+        return int((time.time() - self.start) * 1000)
+
+    def remaining_s(self) -> Optional[float]:
+        return None if self.deadline is None else self.deadline - time.time()
+
+    def remaining_ms(self) -> Optional[int]:
+        return None if self.deadline is None else int((self.deadline - time.time()) * 1000)
+
+    def expired(self) -> bool:
+        return self.deadline is not None and time.time() >= self.deadline
+
+    def check_deadline(self) -> bool:
+        """True once the deadline has passed; records deadline_exceeded once per route."""
+        if not self.expired():
+            return False
+        with self._lock:
+            if not self.timed_out and not self.finished:
+                self.timed_out = True
+                self.last_err = ProviderError(
+                    "deadline exceeded", code="deadline_exceeded", retryable=False
+                ).to_dict(provider=None)
+                self.errors.append(self.last_err)
+        return True
+
+    def begin_attempt(self) -> None:
+        with self._lock:
+            if not self.finished:
+                self.attempts += 1
+
+    def record_error(self, p: ProviderState, e: ProviderError) -> None:
+        with self._lock:
+            # a hedge loser still running after the winner: the envelope is already out
+            if self.finished:
+                return
+            self.last_err = e.to_dict(provider=p.adapter.name)
+            self.errors.append(self.last_err)
+
+    def _close(self) -> list[dict]:
+        """Stop recording and snapshot errors for the envelope."""
+        with self._lock:
+            self.finished = True
+            return list(self.errors)
+
+    def ok(self, provider: str, out: Any) -> ResultEnvelope:
+        errors = self._close()
+        usage, tokens = _lift_usage(out)
+        latency_ms = self.elapsed_ms()
+        if self.metrics is not None:
+            depth = self.selected_chain.index(provider) if provider in self.selected_chain else None
+            self.metrics.observe_route("ok", latency_ms / 1000.0, depth)
+        task = self.task
+        if _log_on("info", "roaudter.result"):
+            _emit(
+                "info",
+                "roaudter.result",
+                "ok",
+                status="ok",
+                provider_used=provider,
+                latency_ms=latency_ms,
+                attempts=self.attempts,
+                task_id=task.task_id,
+                trace_id=self.ctx.get("trace_id"),
+            )
+        return ResultEnvelope(
+            task_id=task.task_id,
+            context=(task.context or task.payload.get("context")),
+            metrics={
+                "provider_used": provider,
+                "latency_ms": latency_ms,
+                "attempts": self.attempts,
+                "selected_chain": self.selected_chain,
+                "policy_hint": self.policy_hint,
+                "policy_hint_source": self.policy_hint_source,
+                "tokens": tokens,
+                "usage": usage,
+                "cost_usd": self.cost_usd,
+                **self.extra_metrics,
+            },
+            status="ok",
+            provider_used=provider,
+            latency_ms=latency_ms,
+            attempts=self.attempts,
+            selected_chain=self.selected_chain,
+            errors=errors,
+            tokens=tokens,
+            usage=usage,
+            result=out,
+        )
+
+    def fail(self) -> ResultEnvelope:
+        errors = self._close()
+        latency_ms = self.elapsed_ms()
+        if self.metrics is not None:
+            self.metrics.observe_route("error", latency_ms / 1000.0, None)
+        task = self.task
+        if _log_on("info", "roaudter.result"):
+            _emit(
+                "info",
+                "roaudter.result",
+                "error",
+                status="error",
+                provider_used=None,
+                latency_ms=latency_ms,
+                attempts=self.attempts,
+                task_id=task.task_id,
+                trace_id=self.ctx.get("trace_id"),
+            )
+        return ResultEnvelope(
+            task_id=task.task_id,
+            context=(task.context or task.payload.get("context")),
+            metrics={
+                "provider_used": None,
+                "latency_ms": latency_ms,
+                "attempts": self.attempts,
+                "selected_chain": self.selected_chain,
+                "policy_hint": self.policy_hint,
+                "policy_hint_source": self.policy_hint_source,
+                "tokens": None,
+                "usage": None,
+                "cost_usd": None,
+                **self.extra_metrics,
+            },
+            status="error",
+            provider_used=None,
+            latency_ms=latency_ms,
+            attempts=self.attempts,
+            selected_chain=self.selected_chain,
+            errors=errors,
+            error=self.last_err or {
+                "provider": None,
+                "code": "no_healthy_providers",
+                "http_status": None,
+                "retryable": False,
+                "message": "no healthy providers",
+                "meta": {},
+            },
+        )
+
+
 @dataclass(slots=True)
 class RouterAgent:
     policy: RouterPolicy
     providers: list[ProviderState]
     health: HealthMonitor = field(default_factory=HealthMonitor)
+    # optional background refresher for `health` (see start_health_prober)
+    health_prober: Optional[HealthProber] = None
 
     # retry/backoff budget (v1)
 # - retries only when ProviderError.retryable==True AND http_status in {None, 429, >=500}
@@ -36,171 +301,702 @@ class RouterAgent:
     retry_budget_ms: int = 800
     retry_base_backoff_ms: int = 10
     retry_max_backoff_ms: int = 80
+    # v2 schedule (Retry-After aware, decorrelated jitter); built from the retry_* fields if unset
+    retry: Optional[RetryPolicy] = None
 
-    def route(self, task: TaskEnvelope) -> ResultEnvelope:
+    # hedged requests (opt-in): if chain[0] hasn't answered after the hedge delay,
+    # fire chain[1] in parallel and keep the first success.
+    # delay = observed hedge_percentile latency of chain[0] (hedge_delay_ms until enough samples)
+    hedge: bool = False
+    hedge_percentile: float = 95.0
+    hedge_delay_ms: int = 1000
+    hedge_min_delay_ms: int = 20
+
+    # live per-provider latency/error estimates (hedge delay; adaptive profiles when
+    # shared with RouterPolicy.stats)
+    stats: ProviderStats = field(default_factory=ProviderStats)
+
+    # response cache in front of the chain (see roaudter_agent.cache); only
+    # deterministic tasks (temperature <= 0) unless cache_force / constraints["cache"]="force"
+    cache: Optional[ResponseCache] = None
+    cache_force: bool = False
+
+    # client-side rpm/tpm budgets (share with RouterPolicy.limiter to deprioritize exhausted providers)
+    rate_limiter: Optional[RateLimiter] = None
+
+    # OpenMetrics counters/histograms (see roaudter_agent.metrics); None = off
+    metrics: Optional[RouterMetrics] = None
+
+    # per-tenant rolling spend (share with RouterPolicy.spend for the "budget" profile);
+    # calls whose estimated cost exceeds max_cost / the tenant's budget are refused
+    spend: Optional[SpendTracker] = None
+
+    # single-flight (opt-in): concurrent route()/aroute() calls for the same task
+    # (cache_key + tenant) share one upstream call; each waiter keeps its own deadline.
+    # constraints["coalesce"] = False opts a task out. Streaming is never coalesced.
+    coalesce: bool = False
+    _flights: SingleFlight = field(default_factory=SingleFlight, init=False, repr=False)
+    _aflights: AsyncSingleFlight = field(default_factory=AsyncSingleFlight, init=False, repr=False)
+
+    # multi-turn history per context trace_id: a task carrying only payload["msg"]
+    # is expanded to payload["messages"] = history + msg, and the answer is recorded.
+    # Tasks that bring their own payload["messages"] are left alone.
+    conversations: Optional[ConversationStore] = None
+
+    # when the prompt fits no available context window: shrink it for the policy's first
+    # choice before dispatch, truncate(task, prompt_budget_tokens, tokenizer) -> task
+    # (e.g. tokens.truncate_oldest, or a summariser). constraints["truncate"] = "oldest"
+    # enables truncate_oldest per task, False disables. Otherwise: context_length_exceeded.
+    truncate: Optional[Callable[[TaskEnvelope, int, str], TaskEnvelope]] = None
+
+    # how much of the vendor's raw response result["raw"] keeps (full / summary / none /
+    # spill-to-disk with a ref id, see roaudter_agent.retention); None = full
+    raw_retention: Optional[RawRetention] = None
+
+    def __post_init__(self) -> None:
+        if self.retry is None:
+            self.retry = RetryPolicy(
+                max_attempts=self.retry_max_attempts,
+                budget_ms=self.retry_budget_ms,
+                base_ms=self.retry_base_backoff_ms,
+                cap_ms=self.retry_max_backoff_ms,
+            )
+
+    def _begin(self, task: TaskEnvelope) -> _RouteRun:
         start = time.time()
 
         # Observability: routing start (filtered by LAM_LOG_LEVEL/LAM_LOG_EVENTS)
-        ctx = task.context or (task.payload.get("context") if isinstance(task.payload, dict) else None)
-        if not isinstance(ctx, dict):
-            ctx = {}
-        _emit(
-            "info",
-            "roaudter.route",
-            "route",
-            intent=task.intent,
-            task_id=task.task_id,
-            trace_id=ctx.get("trace_id"),
-            parent_task_id=ctx.get("parent_task_id"),
-            span_id=ctx.get("span_id"),
+        ctx = _task_ctx(task)
+        if _log_on("info", "roaudter.route"):
+            _emit(
+                "info",
+                "roaudter.route",
+                "route",
+                intent=task.intent,
+                task_id=task.task_id,
+                trace_id=ctx.get("trace_id"),
+                parent_task_id=ctx.get("parent_task_id"),
+                span_id=ctx.get("span_id"),
+            )
+
+        conversation, turn = None, None
+        if self.conversations is not None and ctx.get("trace_id") and not task.payload.get("messages"):
+            msg = task.payload.get("msg") or task.payload.get("text")
+            if msg:
+                conversation, turn = str(ctx["trace_id"]), {"role": "user", "content": msg}
+                history = self.conversations.get(conversation)
+                if history:
+                    task = replace(task, payload={**task.payload, "messages": history + [turn]})
+
+        policy_hint, _policy_strict, policy_hint_source = self.policy.inspect_hint(task)
+        return _RouteRun(
+            task=task,
+            conversation=conversation,
+            turn=turn,
+            ctx=ctx,
+            start=start,
+            policy_hint=policy_hint,
+            policy_hint_source=policy_hint_source,
+            deadline=task_deadline(task, start),
+            metrics=self.metrics,
+            cost_cap=cost_cap(task, self.spend),
         )
 
+    def start_health_prober(self, interval_seconds: float = 10.0, jitter: float = 0.2) -> HealthProber:
+        """Move healthchecks off the request path: route() then only reads the prober's snapshot."""
+        if self.health_prober is None:
+            self.health_prober = HealthProber(self.health, self.providers, interval_seconds, jitter)
+        return self.health_prober.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop background work owned by this router (the health prober thread)."""
+        if self.health_prober is not None:
+            self.health_prober.stop(timeout)
+
+    def _select(self, run: _RouteRun) -> None:
         # health filter with TTL/cooldown
-        healthy_providers = [p for p in self.providers if p.healthy and self.health.is_healthy(p)]
-        policy_hint, _policy_strict, policy_hint_source = self.policy.inspect_hint(task)
-        chain = self.policy.select_chain(task, healthy_providers)
-
-        selected_chain = [ps.adapter.name for ps in chain]
-        attempts = 0
-        errors: list[dict] = []
-
-        last_err: Optional[dict] = None
-
-        for p in chain:
-            attempt = 0
-
-            while True:
-                try:
-                    attempts += 1
-                    out = p.adapter.generate(task)
-
-                    # unified usage/tokens: lift provider-native usage to envelope level
-                    usage = out.get("usage") if isinstance(out, dict) else None
-                    if not isinstance(usage, dict):
-                        usage = None
-
-                    tokens = None
-                    if usage:
-                        tokens = (
-                            usage.get("total_tokens")
-                            or usage.get("total")
-                            or usage.get("tokens")
-                        )
-                        if tokens is None:
-                            pt = usage.get("prompt_tokens")
-                            ct = usage.get("completion_tokens")
-                            if isinstance(pt, int) and isinstance(ct, int):
-                                tokens = pt + ct
-
-                    latency_ms = int((time.time() - start) * 1000)
-                    _emit(
-                        "info",
-                        "roaudter.result",
-                        "ok",
-                        status="ok",
-                        provider_used=p.adapter.name,
-                        latency_ms=latency_ms,
-                        attempts=attempts,
-                        task_id=task.task_id,
-                        trace_id=ctx.get("trace_id"),
-                    )
-                    return ResultEnvelope(
-                        task_id=task.task_id,
-                        context=(task.context or task.payload.get("context")),
-                        metrics={
-                            "provider_used": p.adapter.name,
-                            "latency_ms": latency_ms,
-                            "attempts": attempts,
-                            "selected_chain": selected_chain,
-                            "policy_hint": policy_hint,
-                            "policy_hint_source": policy_hint_source,
-                            "tokens": tokens,
-                            "usage": usage,
-                        },
-                        status="ok",
-                        provider_used=p.adapter.name,
-                        latency_ms=latency_ms,
-                        attempts=attempts,
-                        selected_chain=selected_chain,
-                        errors=errors,
-                        tokens=tokens,
-                        usage=usage,
-                        result=out,
-                    )
-
-                except ProviderError as e:
-                    last_err = e.to_dict(provider=p.adapter.name)
-                    errors.append(last_err)
-
-                    # retry only if explicitly retryable AND status is transient
-                    status = e.http_status
-                    transient = (status is None) or (status == 429) or (isinstance(status, int) and status >= 500)
-                    if (not e.retryable) or (not transient):
-                        break
+        healthy_providers = tuple(p for p in self.providers if p.healthy and self.health.is_healthy(p))
+        run.chain = self.policy.select_chain(run.task, healthy_providers)
+        if not run.chain and healthy_providers:
+            self._fit_context(run, healthy_providers)
+        run.selected_chain = [ps.adapter.name for ps in run.chain]
 
-                    attempt += 1
-                    if attempt >= self.retry_max_attempts:
-                        break
+    def _fit_context(self, run: _RouteRun, healthy: tuple[ProviderState, ...]) -> None:
+        """Nothing was selected: if that's the prompt size, truncate (opt-in) or record why."""
+        preferred = self.policy.select_chain(run.task, healthy, fit_context=False)
+        if not preferred:
+            return  # strict hint / no candidates: not a context problem
+        target = preferred[0].adapter
+        flag = run.task.constraints.get("truncate")
+        truncate = None if flag is False else (truncate_oldest if flag == "oldest" else self.truncate)
+        budget = prompt_budget(target, run.task)
+        if truncate is not None and budget is not None and budget > 0:
+            run.task = truncate(run.task, budget, tokenizer_for(target.name))
+            run.extra_metrics["truncated"] = True
+            run.chain = self.policy.select_chain(run.task, healthy)
+            if run.chain:
+                return
+        tokens = task_tokens(run.task, target.name)
+        err = ProviderError(
+            f"prompt (~{tokens} tokens) does not fit the context window of any available provider",
+            code="context_length_exceeded",
+            retryable=False,
+            meta={"prompt_tokens": tokens, "max_prompt_tokens": budget},
+        )
+        run.record_error(preferred[0], err)
 
-                    elapsed_ms = int((time.time() - start) * 1000)
-                    if elapsed_ms >= self.retry_budget_ms:
-                        break
+    def _remember(self, run: _RouteRun, res: ResultEnvelope) -> ResultEnvelope:
+        """Append the user turn and the answer to the conversation (successful routes only)."""
+        if run.conversation is None or res.status != "ok":
+            return res
+        text = res.result.get("text") if isinstance(res.result, dict) else None
+        if isinstance(text, str) and text:
+            self.conversations.append(run.conversation, run.turn, {"role": "assistant", "content": text})
+        return res
 
-                    # small exponential backoff (tiny for fast tests)
-                    backoff_ms = min(
-                        self.retry_base_backoff_ms * (2 ** (attempt - 1)),
-                        self.retry_max_backoff_ms,
-                    )
-                    remaining_ms = self.retry_budget_ms - elapsed_ms
-                    if remaining_ms <= 0:
-                        break
+    def _cache_lookup(self, run: _RouteRun) -> Optional[ResultEnvelope]:
+        """Serve from the response cache (before health checks / chain selection)."""
+        if self.cache is None:
+            return None
+        run.extra_metrics["cache_hit"] = False
+        if not is_cacheable(run.task, force=self.cache_force):
+            return None
+        run.cache_key = cache_key(run.task)
+        hit = self.cache.get(run.cache_key)
+        if hit is None:
+            return None
+        run.extra_metrics["cache_hit"] = True
+        run.cost_usd = 0.0
+        if self.metrics is not None:
+            self.metrics.cache_hits.inc()
+        return run.ok(hit["provider"], hit["result"])
 
-                    time.sleep(min(backoff_ms, remaining_ms) / 1000.0)
-                    continue
+    def _ok(self, run: _RouteRun, p: ProviderState, out: Any) -> ResultEnvelope:
+        if self.raw_retention is not None:
+            out = self.raw_retention.apply(out)
+        if self.cache is not None and run.cache_key is not None:
+            self.cache.set(run.cache_key, {"provider": p.adapter.name, "result": out})
+        run.cost_usd = call_cost(p.adapter, run.task, out)
+        if run.cost_usd is not None:
+            if self.spend is not None:
+                self.spend.record(task_tenant(run.task), run.cost_usd)
+            if self.metrics is not None:
+                self.metrics.observe_cost(p.adapter.name, run.cost_usd)
+        return run.ok(p.adapter.name, out)
 
-            # exhausted this provider -> try next provider in chain
-            continue
-
-        latency_ms = int((time.time() - start) * 1000)
-        ctx = task.context or (task.payload.get("context") if isinstance(task.payload, dict) else None)
-        if not isinstance(ctx, dict):
-            ctx = {}
-        _emit(
-            "info",
-            "roaudter.result",
-            "error",
-            status="error",
-            provider_used=None,
-            latency_ms=latency_ms,
-            attempts=attempts,
-            task_id=task.task_id,
-            trace_id=ctx.get("trace_id"),
+    def _backoff_ms(
+        self, run: _RouteRun, p: ProviderState, e: ProviderError, attempt: int, prev_ms: Optional[int] = None
+    ) -> Optional[int]:
+        """
+        Decide whether to retry the same provider after `e`.
+        Returns the backoff to sleep (ms), or None to move on to the next provider.
+        `attempt` is the number of failed attempts on this provider so far,
+        `prev_ms` the previous backoff on it (decorrelated jitter).
+        """
+        # retry only if explicitly retryable AND status is transient
+        if (not e.retryable) or (not _is_transient(e)):
+            return None
+        retry_after = e.meta.get("retry_after_ms")
+        delay_ms = self.retry.next_delay_ms(
+            attempt,
+            run.elapsed_ms(),
+            prev_ms,
+            retry_after if isinstance(retry_after, int) else None,
         )
-        return ResultEnvelope(
+        left_ms = run.remaining_ms()
+        if delay_ms is not None and left_ms is not None and delay_ms >= left_ms:
+            return None  # the sleep alone would blow the task deadline
+        if delay_ms is not None and self.metrics is not None:
+            self.metrics.observe_retry(p.adapter.name)
+        return delay_ms
+
+    def _admit(self, run: _RouteRun, p: ProviderState) -> bool:
+        """
+        Deadline, cost cap, circuit breaker and local rate limit gate before each
+        attempt; a refused call is recorded as an error and the chain moves on (no retry).
+        """
+        if run.check_deadline():
+            return False
+        name = p.adapter.name
+        est = estimate_cost(p.adapter, run.task) if run.cost_cap is not None else None
+        if est is not None and est > run.cost_cap:
+            refused = ProviderError(
+                f"{name} estimated cost ${est:.6f} over budget ${run.cost_cap:.6f}",
+                code="budget_exceeded",
+                retryable=False,
+                meta={"estimated_cost_usd": est, "cost_cap_usd": run.cost_cap},
+            )
+        elif not self.health.breaker.allow(name):
+            refused = ProviderError(
+                f"{name} circuit {self.health.breaker.state(name)}",
+                code="circuit_open",
+                retryable=False,
+            )
+        elif self.rate_limiter is not None and not self.rate_limiter.try_acquire(p.adapter):
+            self.health.breaker.record(name, None)  # release a half-open probe slot
+            refused = ProviderError(
+                f"{name} local rate limit exhausted",
+                code="rate_limited_local",
+                retryable=False,
+            )
+        else:
+            return True
+        run.record_error(p, refused)
+        if self.metrics is not None:
+            self.metrics.errors.inc(provider=name, code=refused.code)
+        return False
+
+    def _on_success(self, p: ProviderState, t0: float, out: Any) -> None:
+        latency_ms = (time.time() - t0) * 1000
+        self.stats.observe(p.adapter.name, latency_ms)
+        self.health.breaker.record(p.adapter.name, False)
+        if self.rate_limiter is not None or self.metrics is not None:
+            usage, tokens = _lift_usage(out)
+            if self.rate_limiter is not None:
+                self.rate_limiter.record_usage(p.adapter, tokens)
+            if self.metrics is not None:
+                self.metrics.observe_success(p.adapter.name, latency_ms / 1000.0, usage)
+
+    def _on_failure(self, run: _RouteRun, p: ProviderState, e: ProviderError) -> None:
+        run.record_error(p, e)
+        if self.metrics is not None:
+            self.metrics.observe_error(p.adapter.name, e.code)
+        if run.expired():
+            # our own shortened timeout, not the provider's fault
+            self.health.breaker.record(p.adapter.name, None)
+            return
+        if e.retryable and _is_transient(e):
+            self.stats.observe_error(p.adapter.name)
+        self.health.breaker.record(p.adapter.name, _is_outage(e))
+
+    def _on_abort(self, p: ProviderState) -> None:
+        """An admitted call ended without an outcome: free its half-open probe slot."""
+        self.health.breaker.record(p.adapter.name, None)
+
+    def _hedge_delay_s(self, p: ProviderState) -> float:
+        observed = self.stats.percentile(p.adapter.name, self.hedge_percentile)
+        delay_ms = self.hedge_delay_ms if observed is None else observed
+        return max(delay_ms, self.hedge_min_delay_ms) / 1000.0
+
+    def _call_provider(self, run: _RouteRun, p: ProviderState) -> tuple[bool, Any]:
+        """Attempt one provider with retries; returns (ok, output)."""
+        attempt, backoff_ms = 0, None
+        while not run.finished:
+            if not self._admit(run, p):
+                return False, None
+            t0 = time.time()
+            try:
+                run.begin_attempt()
+                with deadline_scope(run.deadline), run.limits.hold(p.adapter.name):
+                    out = p.adapter.generate(run.task)
+            except ProviderError as e:
+                self._on_failure(run, p, e)
+                attempt += 1
+                backoff_ms = self._backoff_ms(run, p, e, attempt, backoff_ms)
+                if backoff_ms is None:
+                    return False, None
+                time.sleep(backoff_ms / 1000.0)
+                continue
+            except BaseException:
+                self._on_abort(p)
+                raise
+            self._on_success(p, t0, out)
+            return True, out
+        return False, None
+
+    async def _acall_provider(self, run: _RouteRun, p: ProviderState) -> tuple[bool, Any]:
+        attempt, backoff_ms = 0, None
+        while not run.finished:
+            if not self._admit(run, p):
+                return False, None
+            t0 = time.time()
+            try:
+                run.begin_attempt()
+                with deadline_scope(run.deadline):
+                    async with run.limits.ahold(p.adapter.name):
+                        out = await call_agenerate(p.adapter, run.task)
+            except ProviderError as e:
+                self._on_failure(run, p, e)
+                attempt += 1
+                backoff_ms = self._backoff_ms(run, p, e, attempt, backoff_ms)
+                if backoff_ms is None:
+                    return False, None
+                await asyncio.sleep(backoff_ms / 1000.0)
+                continue
+            except BaseException:
+                # hedge loser (CancelledError) or a bug in the adapter
+                self._on_abort(p)
+                raise
+            self._on_success(p, t0, out)
+            return True, out
+        return False, None
+
+    def _route_hedged(self, run: _RouteRun) -> tuple[Optional[ProviderState], Any, int]:
+        """
+        Race chain[0] against chain[1] once chain[0] exceeds the hedge delay.
+        Returns (winner, output, providers_consumed).
+        """
+        primary, secondary = run.chain[0], run.chain[1]
+        pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="roaudter-hedge")
+        try:
+            futures = {pool.submit(self._call_provider, run, primary): primary}
+            done, _ = wait(futures, timeout=self._hedge_delay_s(primary))
+            if not done:
+                run.extra_metrics["hedged"] = True
+                futures[pool.submit(self._call_provider, run, secondary)] = secondary
+
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for f in done:
+                    ok, out = f.result()
+                    if ok:
+                        # loser: drop it if not started; a running call can't be
+                        # interrupted, but run.finished stops any further retries
+                        with run._lock:
+                            run.finished = True
+                        for other in pending:
+                            other.cancel()
+                        return futures[f], out, len(futures)
+            return None, None, len(futures)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _aroute_hedged(self, run: _RouteRun) -> tuple[Optional[ProviderState], Any, int]:
+        primary, secondary = run.chain[0], run.chain[1]
+        tasks = {asyncio.ensure_future(self._acall_provider(run, primary)): primary}
+        done, _ = await asyncio.wait(tasks, timeout=self._hedge_delay_s(primary))
+        if not done:
+            run.extra_metrics["hedged"] = True
+            tasks[asyncio.ensure_future(self._acall_provider(run, secondary))] = secondary
+
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for t in done:
+                    ok, out = t.result()
+                    if ok:
+                        return tasks[t], out, len(tasks)
+            return None, None, len(tasks)
+        finally:
+            for t in pending:
+                t.cancel()
+
+    def _flight_key(self, run: _RouteRun) -> Optional[str]:
+        if not self.coalesce or (run.task.constraints or {}).get("coalesce") is False:
+            return None
+        # cache_key covers everything select_chain reads from the task (hint, intent,
+        # max_cost); the tenant prefix covers its remaining budget
+        return task_tenant(run.task) + ":" + (run.cache_key or cache_key(run.task))
+
+    def _flight_result(self, run: _RouteRun, res: ResultEnvelope, shared: bool, callers: int) -> ResultEnvelope:
+        """
+        The leader's envelope (annotated) or, for a waiter, a copy re-addressed to its
+        own task: no attempts or cost of its own; result/errors are the leader's,
+        copied (result and usage one level deep) so a caller editing its reply
+        does not change the others'.
+        """
+        if self.metrics is not None:
+            self.metrics.coalesced.inc(role="waiter" if shared else "leader")
+        if not shared:
+            res.metrics = {**res.metrics, "coalesced": False, "coalesce_callers": callers}
+            return res
+        task = run.task
+        latency_ms = run.elapsed_ms()
+        if self.metrics is not None:
+            self.metrics.observe_route(res.status, latency_ms / 1000.0, None)
+        result = res.result
+        if isinstance(result, dict):
+            result = dict(result)
+            if isinstance(result.get("usage"), dict):
+                result["usage"] = dict(result["usage"])
+        return replace(
+            res,
             task_id=task.task_id,
             context=(task.context or task.payload.get("context")),
             metrics={
-                "provider_used": None,
+                **res.metrics,
                 "latency_ms": latency_ms,
-                "attempts": attempts,
-                "selected_chain": selected_chain,
-                "policy_hint": policy_hint,
-                "policy_hint_source": policy_hint_source,
-                "tokens": None,
-                "usage": None,
+                "attempts": 0,
+                "cost_usd": 0.0 if res.status == "ok" else None,
+                "coalesced": True,
+                "coalesce_callers": callers,
             },
-            status="error",
-            provider_used=None,
             latency_ms=latency_ms,
-            attempts=attempts,
-            selected_chain=selected_chain,
-            errors=errors,
-            error=last_err or {
-                "provider": None,
-                "code": "no_healthy_providers",
-                "http_status": None,
-                "retryable": False,
-                "message": "no healthy providers",
-                "meta": {},
-            },
+            attempts=0,
+            errors=list(res.errors),
+            result=result,
+            usage=dict(res.usage) if res.usage is not None else None,
         )
+
+    def _flight_timeout(self, run: _RouteRun) -> ResultEnvelope:
+        """A waiter's own deadline passed before the shared call finished."""
+        run.check_deadline()
+        run.extra_metrics["coalesced"] = True
+        if self.metrics is not None:
+            self.metrics.coalesced.inc(role="timeout")
+        return run.fail()
+
+    def _hedging(self, run: _RouteRun) -> bool:
+        if not self.hedge:
+            return False
+        run.extra_metrics["hedged"] = False
+        run.extra_metrics["hedge_winner"] = None
+        return len(run.chain) >= 2
+
+    def route(self, task: TaskEnvelope) -> ResultEnvelope:
+        return self._route(task, _NO_LIMITS)
+
+    def _route(self, task: TaskEnvelope, limits: _ProviderLimits) -> ResultEnvelope:
+        run = self._begin(task)
+        run.limits = limits
+        return self._remember(run, self._route_run(run))
+
+    def _route_run(self, run: _RouteRun) -> ResultEnvelope:
+        cached = self._cache_lookup(run)
+        if cached is not None:
+            return cached
+        key = self._flight_key(run)
+        if key is None:
+            return self._route_chain(run)
+        try:
+            res, shared, callers = self._flights.do(key, lambda: self._route_chain(run), run.remaining_s())
+        except TimeoutError:
+            return self._flight_timeout(run)
+        return self._flight_result(run, res, shared, callers)
+
+    def _route_chain(self, run: _RouteRun) -> ResultEnvelope:
+        self._select(run)
+        rest = run.chain
+
+        if self._hedging(run):
+            winner, out, consumed = self._route_hedged(run)
+            if winner is not None:
+                run.extra_metrics["hedge_winner"] = winner.adapter.name
+                return self._ok(run, winner, out)
+            rest = run.chain[consumed:]
+
+        for p in rest:
+            ok, out = self._call_provider(run, p)
+            if ok:
+                return self._ok(run, p, out)
+            # exhausted this provider -> try next provider in chain
+
+        return run.fail()
+
+    async def aroute(self, task: TaskEnvelope) -> ResultEnvelope:
+        """
+        asyncio variant of route(): same policy/fallback/retry semantics,
+        but provider calls go through adapter.agenerate() and backoff sleeps
+        yield to the event loop. A hedging loser is cancelled outright.
+        """
+        return await self._aroute(task, _NO_LIMITS)
+
+    async def _aroute(self, task: TaskEnvelope, limits: _ProviderLimits) -> ResultEnvelope:
+        run = self._begin(task)
+        run.limits = limits
+        return self._remember(run, await self._aroute_run(run))
+
+    async def _aroute_run(self, run: _RouteRun) -> ResultEnvelope:
+        cached = self._cache_lookup(run)
+        if cached is not None:
+            return cached
+        key = self._flight_key(run)
+        if key is None:
+            return await self._aroute_chain(run)
+        try:
+            res, shared, callers = await self._aflights.do(key, lambda: self._aroute_chain(run), run.remaining_s())
+        except TimeoutError:
+            return self._flight_timeout(run)
+        return self._flight_result(run, res, shared, callers)
+
+    async def _aroute_chain(self, run: _RouteRun) -> ResultEnvelope:
+        self._select(run)
+        rest = run.chain
+
+        if self._hedging(run):
+            winner, out, consumed = await self._aroute_hedged(run)
+            if winner is not None:
+                run.extra_metrics["hedge_winner"] = winner.adapter.name
+                return self._ok(run, winner, out)
+            rest = run.chain[consumed:]
+
+        for p in rest:
+            ok, out = await self._acall_provider(run, p)
+            if ok:
+                return self._ok(run, p, out)
+
+        return run.fail()
+
+    # --- streaming -------------------------------------------------------------
+
+    def _stream_provider(
+        self, run: _RouteRun, p: ProviderState
+    ) -> Generator[dict[str, Any], None, tuple[bool, Any]]:
+        """
+        Stream one provider with retries; yields delta events, returns (ok, output).
+        Retries only happen before the first delta: delivered tokens can't be replayed.
+        """
+        name = p.adapter.name
+        attempt, backoff_ms = 0, None
+        while True:
+            if not self._admit(run, p):
+                return False, None
+            parts: list[str] = []
+            usage = None
+            model = None
+            t0 = time.time()
+            chunks = call_stream(p.adapter, run.task)
+            try:
+                run.begin_attempt()
+                while True:
+                    # deadline scope and concurrency slot cover each pull from the adapter,
+                    # never a yield: between chunks the consumer runs its own code
+                    with deadline_scope(run.deadline), run.limits.hold(name):
+                        chunk = next(chunks, None)
+                    if chunk is None:
+                        break
+                    delta = chunk.get("delta")
+                    if delta:
+                        if not parts and "ttft_ms" not in run.extra_metrics:
+                            run.extra_metrics["ttft_ms"] = run.elapsed_ms()
+                        parts.append(delta)
+                        yield {"event": "delta", "provider": name, "text": delta}
+                    if isinstance(chunk.get("usage"), dict):
+                        usage = chunk["usage"]
+                        model = chunk.get("model") or model
+            except ProviderError as e:
+                self._on_failure(run, p, e)
+                if parts:
+                    run.extra_metrics["stream_interrupted"] = True
+                    run.finished = True
+                    return False, None
+                attempt += 1
+                backoff_ms = self._backoff_ms(run, p, e, attempt, backoff_ms)
+                if backoff_ms is None:
+                    return False, None
+                time.sleep(backoff_ms / 1000.0)
+                continue
+            except BaseException:
+                # consumer closed the stream (GeneratorExit) or a bug in the adapter
+                self._on_abort(p)
+                raise
+            finally:
+                chunks.close()  # abandoned mid-stream: release the adapter's connection now
+
+            out = {
+                "provider": name,
+                "model": model,
+                "latency_ms": int((time.time() - t0) * 1000),
+                "text": "".join(parts),
+                "usage": usage,
+                "streamed": True,
+            }
+            self._on_success(p, t0, out)
+            return True, out
+
+    def route_stream(self, task: TaskEnvelope) -> Iterator[dict[str, Any]]:
+        """
+        Streaming route. Yields {"event": "delta", "provider": ..., "text": ...} as
+        tokens arrive, then exactly one {"event": "result", "result": ResultEnvelope}.
+        Fallback/retries apply until the first token; metrics carry ttft_ms.
+        """
+        run = self._begin(task)
+        run.extra_metrics["streamed"] = True
+        cached = self._cache_lookup(run)
+        if cached is not None:
+            text = cached.result.get("text") if isinstance(cached.result, dict) else None
+            if text:
+                yield {"event": "delta", "provider": cached.provider_used, "text": text}
+            yield {"event": "result", "result": self._remember(run, cached)}
+            return
+        self._select(run)
+
+        for p in run.chain:
+            ok, out = yield from self._stream_provider(run, p)
+            if ok:
+                yield {"event": "result", "result": self._remember(run, self._ok(run, p, out))}
+                return
+            if run.finished:
+                break
+
+        yield {"event": "result", "result": run.fail()}
+
+    # --- batch API -----------------------------------------------------------
+
+    def iter_route_many(
+        self,
+        tasks: Iterable[TaskEnvelope],
+        *,
+        max_concurrency: int = 8,
+        per_provider_limits: Optional[dict[str, int]] = None,
+    ) -> Iterator[tuple[int, ResultEnvelope]]:
+        """
+        Route independent tasks on a thread pool; yields (input_index, result)
+        as each task completes. per_provider_limits caps concurrent calls per
+        adapter name across the whole batch, e.g. {"ollama": 2}.
+        """
+        tasks = list(tasks)
+        if not tasks:
+            return
+        limits = _ProviderLimits(per_provider_limits)
+        workers = max(1, min(max_concurrency, len(tasks)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="roaudter-batch") as pool:
+            futures = {pool.submit(self._route, t, limits): i for i, t in enumerate(tasks)}
+            for f in as_completed(futures):
+                yield futures[f], f.result()
+
+    def route_many(
+        self,
+        tasks: Iterable[TaskEnvelope],
+        *,
+        max_concurrency: int = 8,
+        per_provider_limits: Optional[dict[str, int]] = None,
+    ) -> list[ResultEnvelope]:
+        """Like iter_route_many(), but returns results in input order."""
+        tasks = list(tasks)
+        results: list[Any] = [None] * len(tasks)
+        for i, res in self.iter_route_many(
+            tasks, max_concurrency=max_concurrency, per_provider_limits=per_provider_limits
+        ):
+            results[i] = res
+        return results
+
+    async def aiter_route_many(
+        self,
+        tasks: Iterable[TaskEnvelope],
+        *,
+        max_concurrency: int = 64,
+        per_provider_limits: Optional[dict[str, int]] = None,
+    ) -> AsyncIterator[tuple[int, ResultEnvelope]]:
+        """asyncio variant of iter_route_many(): all tasks share the running event loop."""
+        limits = _ProviderLimits(per_provider_limits)
+        gate = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def one(i: int, t: TaskEnvelope) -> tuple[int, ResultEnvelope]:
+            async with gate:
+                return i, await self._aroute(t, limits)
+
+        pending = [asyncio.ensure_future(one(i, t)) for i, t in enumerate(tasks)]
+        try:
+            for fut in asyncio.as_completed(pending):
+                yield await fut
+        finally:
+            for fut in pending:
+                fut.cancel()
+
+    async def aroute_many(
+        self,
+        tasks: Iterable[TaskEnvelope],
+        *,
+        max_concurrency: int = 64,
+        per_provider_limits: Optional[dict[str, int]] = None,
+    ) -> list[ResultEnvelope]:
+        tasks = list(tasks)
+        results: list[Any] = [None] * len(tasks)
+        async for i, res in self.aiter_route_many(
+            tasks, max_concurrency=max_concurrency, per_provider_limits=per_provider_limits
+        ):
+            results[i] = res
+        return results
@@ -0,0 +1,108 @@
+"""
+Single-flight: concurrent callers with the same key share one execution.
+
+The first caller for a key (the leader) runs the work. Callers that arrive while
+it is in flight wait for its outcome, each with its own timeout, and get the
+same value (or exception). Once the flight finishes, the key is free again: this
+is deduplication of in-flight work, not a cache.
+"""
+
+from __future__ import annotations
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _Call:
+    __slots__ = ("done", "value", "error", "callers")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+        self.callers = 1
+
+
+class SingleFlight:
+    """Thread variant: do() blocks the calling thread."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any], timeout: Optional[float] = None) -> Tuple[Any, bool, int]:
+        """
+        Returns (value, shared, callers): shared=False for the leader, `callers`
+        counts everyone served by this flight. A waiter raises TimeoutError after
+        `timeout` seconds (the flight itself keeps running for the others).
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.callers += 1
+
+        if leader:
+            try:
+                call.value = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+        elif not call.done.wait(None if timeout is None else max(0.0, timeout)):
+            with self._lock:
+                call.callers -= 1
+            raise TimeoutError("single-flight wait timed out")
+
+        if call.error is not None:
+            raise call.error
+        return call.value, not leader, call.callers
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """
+    asyncio variant. The work runs as a task of its own, so a cancelled leader
+    doesn't cancel it for the waiters. Flights are per event loop.
+    """
+
+    def __init__(self) -> None:
+        # (loop, key) -> (task, [callers])
+        self._calls: Dict[Tuple[Any, Hashable], Tuple["asyncio.Future[Any]", list]] = {}
+
+    async def do(
+        self, key: Hashable, fn: Callable[[], Awaitable[Any]], timeout: Optional[float] = None
+    ) -> Tuple[Any, bool, int]:
+        """Same contract as SingleFlight.do()."""
+        slot = (asyncio.get_running_loop(), key)
+        entry = self._calls.get(slot)
+        leader = entry is None
+        if leader:
+            fut = asyncio.ensure_future(fn())
+            entry = self._calls[slot] = (fut, [1])
+            fut.add_done_callback(lambda _f: self._calls.pop(slot, None))
+        else:
+            entry[1][0] += 1
+        fut, callers = entry
+
+        if leader:
+            value = await asyncio.shield(fut)
+        else:
+            try:
+                value = await asyncio.wait_for(
+                    asyncio.shield(fut), None if timeout is None else max(0.0, timeout)
+                )
+            except asyncio.TimeoutError:
+                callers[0] -= 1
+                raise TimeoutError("single-flight wait timed out") from None
+        return value, not leader, callers[0]
+
+    def in_flight(self) -> int:
+        return len(self._calls)
@@ -0,0 +1,87 @@
+from __future__ import annotations
+import threading
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional
+
+
+class ProviderStats:
+    """
+    Live per-provider latency/error estimates fed by RouterAgent.
+    - sliding window of recent successful call latencies (ms) -> percentiles (hedging)
+    - EWMA latency and EWMA error rate (decaying) -> adaptive chain ordering
+    """
+    def __init__(
+        self,
+        window: int = 128,
+        min_samples: int = 8,
+        alpha: float = 0.2,
+        error_penalty: float = 4.0,
+        unknown_latency_ms: float = 1000.0,
+    ) -> None:
+        self.window = window
+        self.min_samples = min_samples
+        self.alpha = alpha                      # вес нового наблюдения в EWMA
+        self.error_penalty = error_penalty      # score = ewma_ms * (1 + penalty * error_rate)
+        self.unknown_latency_ms = unknown_latency_ms  # prior для провайдеров без наблюдений
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[float]] = {}
+        self._ewma_ms: Dict[str, float] = {}
+        self._error_rate: Dict[str, float] = {}
+
+    def _decay_error(self, name: str, failed: bool) -> None:
+        prev = self._error_rate.get(name, 0.0)
+        self._error_rate[name] = prev + self.alpha * ((1.0 if failed else 0.0) - prev)
+
+    def observe(self, name: str, latency_ms: float) -> None:
+        """Record a successful call."""
+        latency_ms = float(latency_ms)
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.window)
+            samples.append(latency_ms)
+
+            prev = self._ewma_ms.get(name)
+            self._ewma_ms[name] = latency_ms if prev is None else prev + self.alpha * (latency_ms - prev)
+            self._decay_error(name, failed=False)
+
+    def observe_error(self, name: str) -> None:
+        """Record a failed call (transient provider error)."""
+        with self._lock:
+            self._decay_error(name, failed=True)
+
+    def count(self, name: str) -> int:
+        with self._lock:
+            return len(self._samples.get(name, ()))
+
+    def percentile(self, name: str, q: float) -> Optional[float]:
+        """q in [0, 100]; None until min_samples observations exist."""
+        with self._lock:
+            samples = list(self._samples.get(name, ()))
+        if len(samples) < self.min_samples:
+            return None
+        samples.sort()
+        # nearest-rank
+        idx = min(len(samples) - 1, max(0, int(round(q / 100.0 * len(samples))) - 1))
+        return samples[idx]
+
+    def ewma_ms(self, name: str) -> Optional[float]:
+        with self._lock:
+            return self._ewma_ms.get(name)
+
+    def error_rate(self, name: str) -> float:
+        with self._lock:
+            return self._error_rate.get(name, 0.0)
+
+    def score(self, name: str) -> float:
+        """Lower is better."""
+        with self._lock:
+            latency = self._ewma_ms.get(name, self.unknown_latency_ms)
+            err = self._error_rate.get(name, 0.0)
+        return latency * (1.0 + self.error_penalty * err)
+
+    def rank(self, names: Iterable[str]) -> List[str]:
+        """Stable sort by score: ties keep the given (static) order."""
+        names = list(names)
+        scores = {n: self.score(n) for n in names}
+        return sorted(names, key=scores.__getitem__)
@@ -0,0 +1,261 @@
+from __future__ import annotations
+import json
+import random
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+
+
+@dataclass(slots=True)
+class StubFaults:
+    """
+    Fault injection for POST (completion) requests:
+    - latency_ms (+ uniform 0..jitter_ms) before answering
+    - rate_429 / rate_5xx: probability of a 429 / 503 instead of a completion
+    - retry_after_s: Retry-After header sent with injected 429/503 responses
+    """
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    rate_429: float = 0.0
+    rate_5xx: float = 0.0
+    retry_after_s: Optional[float] = None
+    seed: Optional[int] = None
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 => keep-alive by default, so connection reuse is observable
+    protocol_version = "HTTP/1.1"
+    server: "_StubHTTPServer"
+
+    def setup(self) -> None:
+        super().setup()
+        # headers and body go out in separate writes: without NODELAY, Nagle +
+        # delayed ACK adds ~40ms per keep-alive response
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.server.stub._on_connection()
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        return
+
+    def _send_json(self, status: int, obj: Any, headers: Optional[dict[str, str]] = None) -> None:
+        data = json.dumps(obj).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_chunked(self, content_type: str, pieces: list[bytes]) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for piece in pieces:
+            self.wfile.write(f"{len(piece):x}\r\n".encode("ascii") + piece + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _stream_openai(self, body: dict) -> None:
+        pieces = []
+        for word in self.server.stub.reply_words():
+            chunk = {"model": body.get("model"), "choices": [{"index": 0, "delta": {"content": word}}]}
+            pieces.append(b"data: " + json.dumps(chunk).encode("utf-8") + b"\n\n")
+        usage = {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+        pieces.append(b"data: " + json.dumps({"model": body.get("model"), "choices": [], "usage": usage}).encode("utf-8") + b"\n\n")
+        pieces.append(b"data: [DONE]\n\n")
+        self._send_chunked("text/event-stream", pieces)
+
+    def _stream_anthropic(self, body: dict) -> None:
+        def event(kind: str, obj: dict) -> bytes:
+            return f"event: {kind}\ndata: ".encode("ascii") + json.dumps({"type": kind, **obj}).encode("utf-8") + b"\n\n"
+
+        pieces = [event("message_start", {"message": {"model": body.get("model"), "usage": {"input_tokens": 1}}})]
+        for word in self.server.stub.reply_words():
+            pieces.append(event("content_block_delta", {"index": 0, "delta": {"type": "text_delta", "text": word}}))
+        pieces.append(event("message_delta", {"usage": {"output_tokens": 1}}))
+        pieces.append(event("message_stop", {}))
+        self._send_chunked("text/event-stream", pieces)
+
+    def _stream_gemini(self) -> None:
+        pieces = []
+        for word in self.server.stub.reply_words():
+            chunk = {"candidates": [{"content": {"parts": [{"text": word}]}}]}
+            pieces.append(b"data: " + json.dumps(chunk).encode("utf-8") + b"\r\n\r\n")
+        usage = {"promptTokenCount": 1, "candidatesTokenCount": 1, "totalTokenCount": 2}
+        pieces.append(b"data: " + json.dumps({"candidates": [], "usageMetadata": usage}).encode("utf-8") + b"\r\n\r\n")
+        self._send_chunked("text/event-stream", pieces)
+
+    def _stream_ollama(self, body: dict) -> None:
+        pieces = []
+        for word in self.server.stub.reply_words():
+            pieces.append(json.dumps({"model": body.get("model"), "message": {"content": word}, "done": False}).encode("utf-8") + b"\n")
+        final = {"model": body.get("model"), "message": {"content": ""}, "done": True, "prompt_eval_count": 1, "eval_count": 1}
+        pieces.append(json.dumps(final).encode("utf-8") + b"\n")
+        self._send_chunked("application/x-ndjson", pieces)
+
+    def do_GET(self) -> None:  # noqa: N802
+        self.server.stub._on_request("GET", self.path, None)
+        if self.path.startswith("/api/tags"):
+            self._send_json(200, {"models": [{"name": "stub"}]})
+            return
+        if self.path in ("/models", "/v1/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "stub", "object": "model"}]})
+            return
+        self._send_json(404, {"error": "not found"})
+
+    def do_POST(self) -> None:  # noqa: N802
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        try:
+            body = json.loads(raw or b"{}")
+        except ValueError:
+            body = {}
+        self.server.stub._on_request("POST", self.path, body)
+
+        stub = self.server.stub
+        fault = stub._fault()
+        if fault is not None:
+            status, headers = fault
+            self._send_json(status, {"error": {"message": "injected", "code": status}}, headers)
+            return
+
+        path = self.path.split("?", 1)[0]
+        if path == "/api/chat":
+            self._stream_ollama(body)
+            return
+        if path in ("/messages", "/v1/messages"):
+            if body.get("stream"):
+                self._stream_anthropic(body)
+                return
+            self._send_json(
+                200,
+                {
+                    "model": body.get("model"),
+                    "content": [{"type": "text", "text": stub.reply}],
+                    "usage": {"input_tokens": 1, "output_tokens": 1},
+                },
+            )
+            return
+        if path.startswith("/v1beta/models/"):
+            if path.endswith(":streamGenerateContent"):
+                self._stream_gemini()
+                return
+            if path.endswith(":generateContent"):
+                self._send_json(
+                    200,
+                    {
+                        "candidates": [{"content": {"parts": [{"text": stub.reply}]}}],
+                        "usageMetadata": {"promptTokenCount": 1, "candidatesTokenCount": 1, "totalTokenCount": 2},
+                    },
+                )
+                return
+        if path in ("/chat/completions", "/v1/chat/completions"):
+            if body.get("stream"):
+                self._stream_openai(body)
+                return
+            self._send_json(
+                200,
+                {
+                    "model": body.get("model"),
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": self.server.stub.reply}}],
+                    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+                },
+            )
+            return
+        self._send_json(404, {"error": "not found"})
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # load runs open hundreds of connections at once; the default backlog of 5 drops SYNs
+    request_queue_size = 512
+    stub: "StubLLMServer"
+
+
+class StubLLMServer:
+    """
+    Local LLM API stand-in for tests and load runs:
+    - OpenAI-compatible chat/completions (plain and `stream: true` SSE)
+    - Anthropic /v1/messages (plain and SSE)
+    - Gemini /v1beta/models/{m}:generateContent and :streamGenerateContent (SSE)
+    - Ollama /api/tags and NDJSON /api/chat
+    Counts TCP connections and requests so transport-level reuse can be asserted
+    offline; `faults` injects latency, 429s and 5xx (counted in `injected`).
+
+        with StubLLMServer() as srv:
+            OpenAIAdapter(base_url=srv.base_url + "/v1")
+    """
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        reply: str = "pong",
+        faults: Optional[StubFaults] = None,
+        record_bodies: bool = True,
+    ) -> None:
+        self.reply = reply
+        self.faults = faults or StubFaults()
+        self.record_bodies = record_bodies
+        self.connections = 0
+        self.requests: list[dict[str, Any]] = []
+        self.injected = {"429": 0, "5xx": 0}
+        self._rng = random.Random(self.faults.seed)
+        self._lock = threading.Lock()
+        self._httpd = _StubHTTPServer((host, port), _StubHandler)
+        self._httpd.stub = self
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reply_words(self) -> list[str]:
+        words = self.reply.split(" ")
+        return [w + " " for w in words[:-1]] + words[-1:]
+
+    def _on_connection(self) -> None:
+        with self._lock:
+            self.connections += 1
+
+    def _on_request(self, method: str, path: str, body: Any) -> None:
+        with self._lock:
+            self.requests.append({"method": method, "path": path, "body": body if self.record_bodies else None})
+
+    def _fault(self) -> Optional[tuple[int, dict[str, str]]]:
+        """Apply injected latency; returns (status, headers) for an injected error, else None."""
+        f = self.faults
+        with self._lock:
+            delay_ms = f.latency_ms + (self._rng.uniform(0, f.jitter_ms) if f.jitter_ms else 0.0)
+            roll = self._rng.random()
+            status = 429 if roll < f.rate_429 else 503 if roll < f.rate_429 + f.rate_5xx else None
+            if status is not None:
+                self.injected["429" if status == 429 else "5xx"] += 1
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000.0)
+        if status is None:
+            return None
+        headers = {} if f.retry_after_s is None else {"Retry-After": f"{f.retry_after_s:g}"}
+        return status, headers
+
+    def start(self) -> "StubLLMServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "StubLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
@@ -0,0 +1,172 @@
+"""
+Local token estimates and model context windows (no tokenizer downloads, no network).
+
+Each provider family gets a characters-per-token ratio, one for ASCII text and
+one for everything else. Non-Latin scripts cost far more tokens per character.
+Counting ASCII is a single C-level encode, so estimating a long prompt costs
+microseconds. The ratios are calibrated to land slightly above the real BPE
+counts for English and Cyrillic prose (conservative for fit checks).
+
+    fits(adapter, task)                  -> prompt + reserved completion <= window?
+    truncate_oldest(task, budget, fam)   -> task with the oldest turns dropped
+"""
+
+from __future__ import annotations
+import math
+from dataclasses import replace
+from typing import Any, Dict, List, Optional, Tuple, TypeVar
+
+from roaudter_agent.contracts import TaskEnvelope
+from roaudter_agent.conversation import task_messages
+
+T = TypeVar("T")
+
+# family -> (ASCII chars per token, non-ASCII chars per token)
+TOKENIZERS: Dict[str, Tuple[float, float]] = {
+    "openai": (4.0, 2.0),     # o200k / cl100k
+    "claude": (3.5, 1.6),
+    "gemini": (4.0, 2.2),     # SentencePiece, large vocab
+    "llama": (3.8, 1.7),      # llama3 tiktoken-style 128k vocab
+    "deepseek": (3.8, 1.8),
+    "default": (3.5, 1.5),
+}
+
+PROVIDER_TOKENIZER: Dict[str, str] = {
+    "openai": "openai",
+    "grok": "openai",
+    "deepseek": "deepseek",
+    "claude": "claude",
+    "gemini": "gemini",
+    "ollama": "llama",
+    "ollama_cloud": "llama",
+}
+
+# chat formatting per message (role markers, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# completion reserved when constraints["max_tokens"] is unset
+DEFAULT_COMPLETION_TOKENS = 256
+
+# provider -> model (or model prefix) -> context window in tokens; "*" = other models
+CONTEXT_WINDOWS: Dict[str, Dict[str, int]] = {
+    "openai": {"gpt-4o": 128_000, "gpt-4.1": 1_047_576, "*": 128_000},
+    "claude": {"*": 200_000},
+    "gemini": {"gemini-1.5-pro": 2_097_152, "*": 1_048_576},
+    "grok": {"*": 131_072},
+    "deepseek": {"*": 65_536},
+    # Ollama's default num_ctx: longer prompts are cut silently, not rejected
+    "ollama": {"*": 4_096},
+    "ollama_cloud": {"*": 131_072},
+}
+
+# smallest window above: prompts that can't exceed it skip per-provider checks
+MIN_CONTEXT_WINDOW = min(w for table in CONTEXT_WINDOWS.values() for w in table.values())
+
+
+def model_lookup(table: Dict[str, Dict[str, T]], provider: str, model: Optional[str]) -> Optional[T]:
+    """Exact model, then the longest matching prefix, then the provider's "*"; None if unknown."""
+    entries = table.get(provider)
+    if not entries:
+        return None
+    if model:
+        model = str(model)
+        if model in entries:
+            return entries[model]
+        best = None
+        for key in entries:
+            if key != "*" and model.startswith(key) and (best is None or len(key) > len(best)):
+                best = key
+        if best is not None:
+            return entries[best]
+    return entries.get("*")
+
+
+def tokenizer_for(provider: Optional[str]) -> str:
+    return PROVIDER_TOKENIZER.get(provider or "", "default")
+
+
+def estimate_tokens(text: str, family: str = "default") -> int:
+    if not text:
+        return 0
+    ascii_cpt, other_cpt = TOKENIZERS.get(family) or TOKENIZERS["default"]
+    n_ascii = len(text.encode("ascii", "ignore"))
+    return math.ceil(n_ascii / ascii_cpt + (len(text) - n_ascii) / other_cpt)
+
+
+def estimate_messages_tokens(messages: List[Dict[str, str]], family: str = "default") -> int:
+    return sum(estimate_tokens(m["content"], family) + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+
+def task_tokens(task: TaskEnvelope, provider: Optional[str] = None) -> int:
+    """Prompt tokens `provider` would see for this task (0 for an empty payload)."""
+    try:
+        messages = task_messages(task)
+    except Exception:
+        return 0
+    return estimate_messages_tokens(messages, tokenizer_for(provider))
+
+
+def completion_reserve(task: TaskEnvelope) -> int:
+    max_tokens = task.constraints.get("max_tokens")
+    return max_tokens if isinstance(max_tokens, int) and max_tokens > 0 else DEFAULT_COMPLETION_TOKENS
+
+
+def context_window(provider: str, model: Optional[str]) -> Optional[int]:
+    return model_lookup(CONTEXT_WINDOWS, provider, model)
+
+
+def model_for(adapter: Any, task: TaskEnvelope) -> Optional[str]:
+    """The model `adapter` would call for `task`."""
+    select = getattr(adapter, "_select_model", None)
+    if callable(select):
+        return select(task)
+    return (
+        task.constraints.get("model")
+        or task.payload.get("model")
+        or task.payload.get("llm_model")
+        or getattr(adapter, "default_model", None)
+    )
+
+
+def prompt_budget(adapter: Any, task: TaskEnvelope) -> Optional[int]:
+    """Prompt tokens that fit next to the reserved completion (None = unknown window)."""
+    window = context_window(adapter.name, model_for(adapter, task))
+    return None if window is None else window - completion_reserve(task)
+
+
+def fits(adapter: Any, task: TaskEnvelope) -> bool:
+    """False only when the estimate clearly exceeds a known context window."""
+    budget = prompt_budget(adapter, task)
+    return budget is None or task_tokens(task, adapter.name) <= budget
+
+
+def truncate_oldest(task: TaskEnvelope, budget_tokens: int, family: str = "default") -> TaskEnvelope:
+    """
+    Drop the oldest non-system turns until the history fits `budget_tokens`; the
+    newest turn is always kept, clipped from the front if it alone is too long.
+    System messages are never cut: with no turns to drop the task comes back
+    unchanged (the router then reports context_length_exceeded).
+    """
+    messages = task_messages(task)
+    if estimate_messages_tokens(messages, family) <= budget_tokens:
+        return task
+    system = [m for m in messages if m["role"] == "system"]
+    turns = [m for m in messages if m["role"] != "system"]
+    used = estimate_messages_tokens(system, family)
+    kept: List[Dict[str, str]] = []
+    for m in reversed(turns):
+        cost = estimate_tokens(m["content"], family) + MESSAGE_OVERHEAD_TOKENS
+        if kept and used + cost > budget_tokens:
+            break
+        kept.append(m)
+        used += cost
+    if not kept:
+        return task
+    kept.reverse()
+    if used > budget_tokens:
+        last = kept[-1]
+        ascii_cpt, other_cpt = TOKENIZERS.get(family) or TOKENIZERS["default"]
+        room = max(0, budget_tokens - (used - estimate_tokens(last["content"], family)))
+        keep_chars = max(1, int(room * min(ascii_cpt, other_cpt)))  # conservative: densest script
+        kept[-1] = {"role": last["role"], "content": last["content"][-keep_chars:]}
+    return replace(task, payload={**task.payload, "messages": system + kept})
@@ -0,0 +1,503 @@
+from __future__ import annotations
+import asyncio
+import http.client
+import io
+import socket
+import ssl
+import threading
+import time
+import urllib.error
+import urllib.parse
+import weakref
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Iterator, Optional, Protocol, Tuple
+
+
+@dataclass(slots=True)
+class HttpResponse:
+    status: int
+    reason: str
+    headers: http.client.HTTPMessage
+    body: bytes
+
+
+class Transport(Protocol):
+    """
+    Minimal HTTP transport used by provider adapters.
+    Non-2xx responses raise urllib.error.HTTPError (same contract as urlopen),
+    so adapters keep their HTTP error mapping.
+    """
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        body: Optional[bytes] = None,
+        headers: Optional[dict[str, str]] = None,
+        timeout: float = 60.0,
+    ) -> HttpResponse: ...
+
+    def open(
+        self,
+        method: str,
+        url: str,
+        *,
+        body: Optional[bytes] = None,
+        headers: Optional[dict[str, str]] = None,
+        timeout: float = 60.0,
+    ) -> "StreamResponse": ...
+
+
+class AsyncTransport(Protocol):
+    """
+    Optional asyncio side of a Transport (same error contract as request()).
+    Adapters use it from agenerate() when the transport has it, and fall back to
+    running generate() in a thread when it does not.
+    """
+    async def arequest(
+        self,
+        method: str,
+        url: str,
+        *,
+        body: Optional[bytes] = None,
+        headers: Optional[dict[str, str]] = None,
+        timeout: float = 60.0,
+    ) -> HttpResponse: ...
+
+
+class StreamResponse:
+    """
+    Incrementally-read 2xx response (SSE / NDJSON). Use as a context manager;
+    a fully consumed body hands the connection back to the pool.
+    """
+    def __init__(self, resp: http.client.HTTPResponse, on_close: Any = None) -> None:
+        self.status = resp.status
+        self.headers = resp.headers
+        self._resp = resp
+        self._on_close = on_close
+
+    def iter_lines(self) -> Iterator[bytes]:
+        while True:
+            line = self._resp.readline()
+            if not line:
+                return
+            yield line.rstrip(b"\r\n")
+
+    def close(self) -> None:
+        on_close, self._on_close = self._on_close, None
+        if on_close is not None:
+            on_close(self._resp)
+
+    def __enter__(self) -> "StreamResponse":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+# errors that mean "the server dropped an idle keep-alive connection";
+# safe to replay once on a fresh connection because nothing was processed
+_STALE_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+_PoolKey = Tuple[str, str, int]
+_AsyncConn = Tuple[asyncio.StreamReader, asyncio.StreamWriter]
+_AsyncPools = Dict[_PoolKey, Deque[Tuple[_AsyncConn, float]]]
+
+_MAX_HEADERS = 100
+
+
+def _target(url: str) -> Tuple[_PoolKey, str]:
+    """(pool key, request path) for an absolute URL."""
+    parts = urllib.parse.urlsplit(url)
+    scheme = parts.scheme or "http"
+    port = parts.port or (443 if scheme == "https" else 80)
+    path = parts.path or "/"
+    if parts.query:
+        path = f"{path}?{parts.query}"
+    return (scheme, parts.hostname or "", port), path
+
+
+def _request_head(
+    method: str, path: str, key: _PoolKey, body: Optional[bytes], headers: Optional[dict[str, str]]
+) -> bytes:
+    """HTTP/1.1 request line + headers, with the defaults http.client would add."""
+    scheme, host, port = key
+    host_header = f"[{host}]" if ":" in host else host
+    if port != (443 if scheme == "https" else 80):
+        host_header = f"{host_header}:{port}"
+    fields = {"host": ("Host", host_header), "accept-encoding": ("Accept-Encoding", "identity")}
+    if body is not None or method in ("POST", "PUT", "PATCH"):
+        fields["content-length"] = ("Content-Length", str(len(body or b"")))
+    for name, value in (headers or {}).items():
+        fields[name.lower()] = (name, value)
+    lines = [f"{method} {path} HTTP/1.1"] + [f"{name}: {value}" for name, value in fields.values()]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("iso-8859-1")
+
+
+async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+    parts: list[bytes] = []
+    while True:
+        line = await reader.readline()
+        if not line:
+            raise http.client.IncompleteRead(b"".join(parts))
+        size = int(line.split(b";", 1)[0].strip(), 16)
+        if size == 0:
+            break
+        parts.append(await reader.readexactly(size))
+        await reader.readexactly(2)  # CRLF after each chunk
+    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+        pass  # trailers
+    return b"".join(parts)
+
+
+async def _read_response(
+    reader: asyncio.StreamReader, method: str
+) -> Tuple[int, str, http.client.HTTPMessage, bytes, bool]:
+    """(status, reason, headers, body, will_close) of one HTTP/1.x response."""
+    while True:
+        line = await reader.readline()
+        if not line:
+            raise http.client.RemoteDisconnected("Remote end closed connection without response")
+        version, _, rest = line.decode("iso-8859-1").rstrip("\r\n").partition(" ")
+        code, _, reason = rest.partition(" ")
+        if not version.startswith("HTTP/") or len(code) != 3 or not code.isdigit():
+            raise http.client.BadStatusLine(line.decode("iso-8859-1"))
+        block = []
+        while True:
+            header_line = await reader.readline()
+            block.append(header_line)
+            if header_line in (b"\r\n", b"\n", b""):
+                break
+            if len(block) > _MAX_HEADERS:
+                raise http.client.HTTPException(f"got more than {_MAX_HEADERS} headers")
+        status = int(code)
+        if not (100 <= status < 200):
+            break  # skip interim 1xx responses
+
+    headers = http.client.parse_headers(io.BytesIO(b"".join(block)))
+    connection = (headers.get("Connection") or "").lower()
+    will_close = "close" in connection or (version == "HTTP/1.0" and "keep-alive" not in connection)
+    if method == "HEAD" or status in (204, 304):
+        return status, reason, headers, b"", will_close
+    if "chunked" in (headers.get("Transfer-Encoding") or "").lower():
+        data = await _read_chunked(reader)
+    elif headers.get("Content-Length") is not None:
+        data = await reader.readexactly(int(headers["Content-Length"]))
+    else:
+        data = await reader.read()  # body ends with the connection
+        will_close = True
+    return status, reason, headers, data, will_close
+
+
+@dataclass(slots=True)
+class PoolConfig:
+    max_idle_per_host: int = 8     # сколько keep-alive соединений держим на хост
+    idle_timeout_seconds: float = 60.0  # старше — закрываем, не переиспользуем
+
+
+class PooledTransport:
+    """
+    Keep-alive HTTP/1.1 transport with per-host connection pools.
+    - idle connections are reused (LIFO) instead of a new TCP+TLS handshake per call
+    - at most cfg.max_idle_per_host idle connections are kept per host; extra ones are closed
+    - connections idle longer than cfg.idle_timeout_seconds are evicted
+    Thread-safe; a connection is owned by exactly one request at a time.
+
+    arequest() is the asyncio variant: non-blocking sockets on the running loop
+    (asyncio.open_connection + ssl), so an in-flight call holds no thread. Its
+    idle connections are pooled per event loop under the same PoolConfig and are
+    dropped on reuse once past idle_timeout_seconds (evict_idle() is sync-only);
+    await aclose() before the loop ends to close the ones it still holds.
+    Nothing here caps concurrent requests: bound them at the caller, e.g.
+    RouterAgent.aroute_many(max_concurrency=...).
+    """
+    def __init__(self, cfg: PoolConfig | None = None) -> None:
+        self.cfg = cfg or PoolConfig()
+        self._lock = threading.Lock()
+        # (scheme, host, port) -> idle (conn, released_at)
+        self._idle: Dict[_PoolKey, Deque[Tuple[http.client.HTTPConnection, float]]] = {}
+        # event loop -> (scheme, host, port) -> idle (reader/writer, released_at)
+        self._aidle: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _AsyncPools]" = weakref.WeakKeyDictionary()
+        self._ssl_context: Optional[ssl.SSLContext] = None
+        self.connections_opened = 0
+
+    def _ssl(self) -> ssl.SSLContext:
+        if self._ssl_context is None:
+            self._ssl_context = ssl.create_default_context()
+        return self._ssl_context
+
+    def _new_conn(self, key: _PoolKey, timeout: float) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        if scheme == "https":
+            conn: http.client.HTTPConnection = http.client.HTTPSConnection(
+                host, port, timeout=timeout, context=self._ssl()
+            )
+        else:
+            conn = http.client.HTTPConnection(host, port, timeout=timeout)
+        with self._lock:
+            self.connections_opened += 1
+        return conn
+
+    def _acquire(self, key: _PoolKey) -> Optional[http.client.HTTPConnection]:
+        now = time.monotonic()
+        stale: list[http.client.HTTPConnection] = []
+        conn = None
+        with self._lock:
+            pool = self._idle.get(key)
+            while pool:
+                c, released_at = pool.pop()
+                if now - released_at > self.cfg.idle_timeout_seconds:
+                    stale.append(c)
+                    continue
+                conn = c
+                break
+        for c in stale:
+            c.close()
+        return conn
+
+    def _release(self, key: _PoolKey, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            pool = self._idle.setdefault(key, deque())
+            if len(pool) < self.cfg.max_idle_per_host:
+                pool.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    def evict_idle(self) -> int:
+        """Close idle connections past their idle timeout; returns how many were closed."""
+        now = time.monotonic()
+        closed: list[http.client.HTTPConnection] = []
+        with self._lock:
+            for pool in self._idle.values():
+                keep = [(c, ts) for c, ts in pool if now - ts <= self.cfg.idle_timeout_seconds]
+                closed += [c for c, ts in pool if now - ts > self.cfg.idle_timeout_seconds]
+                pool.clear()
+                pool.extend(keep)
+        for c in closed:
+            c.close()
+        return len(closed)
+
+    def idle_count(self) -> int:
+        with self._lock:
+            idle = sum(len(p) for p in self._idle.values())
+            return idle + sum(len(p) for pools in self._aidle.values() for p in pools.values())
+
+    def close(self) -> None:
+        with self._lock:
+            pools, self._idle = self._idle, {}
+            apools, self._aidle = dict(self._aidle), weakref.WeakKeyDictionary()
+        for pool in pools.values():
+            for c, _ts in pool:
+                c.close()
+        for loop, by_key in apools.items():
+            if loop.is_closed():
+                continue
+            for apool in by_key.values():
+                for (_reader, writer), _ts in apool:
+                    loop.call_soon_threadsafe(writer.close)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        body: Optional[bytes] = None,
+        headers: Optional[dict[str, str]] = None,
+        timeout: float = 60.0,
+    ) -> HttpResponse:
+        key, conn, resp = self._send(method, url, body, headers, timeout)
+        try:
+            data = resp.read()
+        except BaseException:
+            conn.close()
+            raise
+
+        if resp.will_close:
+            conn.close()
+        else:
+            self._release(key, conn)
+
+        if not (200 <= resp.status < 300):
+            raise urllib.error.HTTPError(url, resp.status, resp.reason, resp.headers, io.BytesIO(data))
+
+        return HttpResponse(status=resp.status, reason=resp.reason, headers=resp.headers, body=data)
+
+    def open(
+        self,
+        method: str,
+        url: str,
+        *,
+        body: Optional[bytes] = None,
+        headers: Optional[dict[str, str]] = None,
+        timeout: float = 60.0,
+    ) -> StreamResponse:
+        """Like request(), but the 2xx body is left unread for incremental parsing."""
+        key, conn, resp = self._send(method, url, body, headers, timeout)
+        if not (200 <= resp.status < 300):
+            try:
+                data = resp.read()
+            finally:
+                conn.close()
+            raise urllib.error.HTTPError(url, resp.status, resp.reason, resp.headers, io.BytesIO(data))
+
+        def _done(r: http.client.HTTPResponse) -> None:
+            # only a fully drained keep-alive response leaves the connection reusable
+            if r.isclosed() and not r.will_close:
+                self._release(key, conn)
+            else:
+                conn.close()
+
+        return StreamResponse(resp, on_close=_done)
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        body: Optional[bytes],
+        headers: Optional[dict[str, str]],
+        timeout: float,
+    ) -> Tuple[_PoolKey, http.client.HTTPConnection, http.client.HTTPResponse]:
+        key, path = _target(url)
+        while True:
+            conn = self._acquire(key)
+            reused = conn is not None
+            if conn is None:
+                conn = self._new_conn(key, timeout)
+            else:
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+
+            try:
+                conn.request(method, path, body=body, headers=headers or {})
+                return key, conn, conn.getresponse()
+            except _STALE_ERRORS:
+                conn.close()
+                if reused:
+                    continue
+                raise
+            except BaseException:
+                conn.close()
+                raise
+
+    async def aclose(self) -> None:
+        """Close the running loop's idle async connections."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            by_key = self._aidle.pop(loop, {})
+        writers = [writer for pool in by_key.values() for (_reader, writer), _ts in pool]
+        for writer in writers:
+            writer.close()
+        for writer in writers:
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def arequest(
+        self,
+        method: str,
+        url: str,
+        *,
+        body: Optional[bytes] = None,
+        headers: Optional[dict[str, str]] = None,
+        timeout: float = 60.0,
+    ) -> HttpResponse:
+        """request() for asyncio callers; `timeout` bounds the whole exchange."""
+        key, path = _target(url)
+        head = _request_head(method, path, key, body, headers)
+        try:
+            return await asyncio.wait_for(self._aexchange(key, url, method, head, body), timeout)
+        except asyncio.TimeoutError:
+            raise socket.timeout("timed out") from None
+
+    def _apool(self, key: _PoolKey) -> Deque[Tuple[_AsyncConn, float]]:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            by_key = self._aidle.get(loop)
+            if by_key is None:
+                by_key = self._aidle[loop] = {}
+            return by_key.setdefault(key, deque())
+
+    def _aacquire(self, key: _PoolKey) -> Optional[_AsyncConn]:
+        pool = self._apool(key)
+        now = time.monotonic()
+        while pool:
+            (reader, writer), released_at = pool.pop()
+            if now - released_at > self.cfg.idle_timeout_seconds or writer.is_closing() or reader.at_eof():
+                writer.close()
+                continue
+            return reader, writer
+        return None
+
+    def _arelease(self, key: _PoolKey, conn: _AsyncConn) -> None:
+        pool = self._apool(key)
+        if len(pool) < self.cfg.max_idle_per_host:
+            pool.append((conn, time.monotonic()))
+            return
+        conn[1].close()
+
+    async def _aconnect(self, key: _PoolKey) -> _AsyncConn:
+        scheme, host, port = key
+        if scheme == "https":
+            conn = await asyncio.open_connection(host, port, ssl=self._ssl(), server_hostname=host)
+        else:
+            conn = await asyncio.open_connection(host, port)
+        with self._lock:
+            self.connections_opened += 1
+        return conn
+
+    async def _aexchange(
+        self, key: _PoolKey, url: str, method: str, head: bytes, body: Optional[bytes]
+    ) -> HttpResponse:
+        while True:
+            conn = self._aacquire(key)
+            reused = conn is not None
+            if conn is None:
+                conn = await self._aconnect(key)
+            reader, writer = conn
+
+            try:
+                writer.write(head + body if body else head)
+                await writer.drain()
+                status, reason, headers, data, will_close = await _read_response(reader, method)
+            except _STALE_ERRORS:
+                writer.close()
+                if reused:
+                    continue
+                raise
+            except BaseException:
+                writer.close()
+                raise
+
+            if will_close:
+                writer.close()
+            else:
+                self._arelease(key, conn)
+
+            if not (200 <= status < 300):
+                raise urllib.error.HTTPError(url, status, reason, headers, io.BytesIO(data))
+
+            return HttpResponse(status=status, reason=reason, headers=headers, body=data)
+
+
+_default_transport: Optional[Transport] = None
+_default_lock = threading.Lock()
+
+
+def default_transport() -> Transport:
+    """Process-wide transport shared by all adapters that don't carry their own."""
+    global _default_transport
+    if _default_transport is None:
+        with _default_lock:
+            if _default_transport is None:
+                _default_transport = PooledTransport()
+    return _default_transport
+
+
+def set_default_transport(transport: Optional[Transport]) -> None:
+    """Swap the shared transport (None resets to a fresh PooledTransport on next use)."""
+    global _default_transport
+    with _default_lock:
+        _default_transport = transport
@@ -0,0 +1,73 @@
+from dataclasses import dataclass
+
+from roaudter_agent.contracts import TaskEnvelope
+from roaudter_agent.policy import RouterPolicy
+from roaudter_agent.router import RouterAgent
+from roaudter_agent.providers.base import ProviderError, ProviderState
+from roaudter_agent.stats import ProviderStats
+
+
+@dataclass
+class NamedProvider:
+    name: str
+    fail: bool = False
+
+    def healthcheck(self) -> bool: return True
+
+    def generate(self, task: TaskEnvelope):
+        if self.fail:
+            raise ProviderError("upstream 503", code="http_error", http_status=503, retryable=True)
+        return {"text": self.name}
+
+
+def _fast_task() -> TaskEnvelope:
+    return TaskEnvelope(task_id="t1", agent="comm", intent="chat", payload={"msg": "ping", "provider_hint": "fast"})
+
+
+def _states(*names: str) -> list[ProviderState]:
+    return [ProviderState(NamedProvider(name=n)) for n in names]
+
+
+def test_fast_profile_is_static_without_stats():
+    policy = RouterPolicy(default_chain=[])
+    chain = policy.select_chain(_fast_task(), _states("openai", "gemini", "ollama"))
+    assert [p.adapter.name for p in chain] == ["gemini", "openai", "ollama"]
+
+
+def test_fast_profile_follows_observed_latency():
+    stats = ProviderStats()
+    for _ in range(5):
+        stats.observe("gemini", 900.0)
+        stats.observe("openai", 400.0)
+        stats.observe("ollama", 50.0)
+
+    policy = RouterPolicy(default_chain=[], stats=stats)
+    chain = policy.select_chain(_fast_task(), _states("openai", "gemini", "ollama"))
+    assert [p.adapter.name for p in chain] == ["ollama", "openai", "gemini"]
+
+
+def test_errors_push_provider_down():
+    stats = ProviderStats()
+    stats.observe("ollama", 50.0)
+    stats.observe("openai", 100.0)
+    for _ in range(5):
+        stats.observe_error("ollama")
+
+    assert stats.rank(["ollama", "openai"]) == ["openai", "ollama"]
+
+
+def test_router_feeds_shared_stats():
+    stats = ProviderStats()
+    router = RouterAgent(
+        policy=RouterPolicy(default_chain=[], stats=stats),
+        providers=[ProviderState(NamedProvider(name="gemini", fail=True)), ProviderState(NamedProvider(name="openai"))],
+        stats=stats,
+        retry_max_attempts=1,
+    )
+    res = router.route(_fast_task())
+
+    assert res.provider_used == "openai"
+    assert stats.error_rate("gemini") > 0
+    assert stats.ewma_ms("openai") is not None
+    # next "fast" route prefers the provider that just worked
+    assert router.route(_fast_task()).selected_chain[0] == "openai"
@@ -0,0 +1,109 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from roaudter_agent.contracts import TaskEnvelope
+from roaudter_agent.policy import RouterPolicy
+from roaudter_agent.router import RouterAgent
+from roaudter_agent.providers.base import ProviderError, ProviderState
+from roaudter_agent.providers.claude import ClaudeAdapter
+from roaudter_agent.providers.gemini import GeminiAdapter
+from roaudter_agent.providers.openai import OpenAIAdapter
+from roaudter_agent.stub_server import StubFaults, StubLLMServer
+from roaudter_agent.transport import PooledTransport
+
+
+@dataclass
+class SlowAsyncProvider:
+    name: str = "ollama"
+    delay_s: float = 0.05
+
+    def healthcheck(self) -> bool: return True
+
+    def generate(self, task: TaskEnvelope):
+        raise AssertionError("sync path must not be used by aroute")
+
+    async def agenerate(self, task: TaskEnvelope):
+        await asyncio.sleep(self.delay_s)
+        return {"text": "pong-" + task.task_id}
+
+
+@dataclass
+class FlakySyncProvider:
+    name: str = "ollama"
+    calls: int = 0
+
+    def healthcheck(self) -> bool: return True
+
+    def generate(self, task: TaskEnvelope):
+        self.calls += 1
+        if self.calls == 1:
+            raise ProviderError("busy", code="rate_limited", http_status=429, retryable=True)
+        return {"text": "pong"}
+
+
+def _task(task_id: str) -> TaskEnvelope:
+    return TaskEnvelope(task_id=task_id, agent="comm", intent="chat", payload={"msg": "ping"})
+
+
+def test_aroute_runs_many_calls_concurrently():
+    router = RouterAgent(policy=RouterPolicy(default_chain=[]), providers=[ProviderState(SlowAsyncProvider())])
+
+    async def main():
+        return await asyncio.gather(*(router.aroute(_task(f"t{i}")) for i in range(50)))
+
+    t0 = time.perf_counter()
+    results = asyncio.run(main())
+    elapsed = time.perf_counter() - t0
+
+    assert [r.status for r in results] == ["ok"] * 50
+    assert results[7].result == {"text": "pong-t7"}
+    # 50 sequential calls would take >= 2.5s
+    assert elapsed < 1.0
+
+
+def test_aroute_retries_sync_only_adapter_in_executor():
+    p = FlakySyncProvider()
+    router = RouterAgent(policy=RouterPolicy(default_chain=[]), providers=[ProviderState(p)])
+
+    res = asyncio.run(router.aroute(_task("t1")))
+
+    assert res.status == "ok"
+    assert res.attempts == 2
+    assert p.calls == 2
+    assert res.errors[0]["code"] == "rate_limited"
+
+
+def test_http_adapters_overlap_without_a_thread_per_call(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+    monkeypatch.setenv("GEMINI_API_KEY", "test")
+    transport = PooledTransport()
+    n = 60
+
+    with StubLLMServer(faults=StubFaults(latency_ms=200)) as srv:
+        adapters = [
+            OpenAIAdapter(base_url=srv.base_url + "/v1", transport=transport),
+            ClaudeAdapter(base_url=srv.base_url + "/v1", transport=transport),
+            GeminiAdapter(base_url=srv.base_url, transport=transport),
+        ]
+        routers = [RouterAgent(policy=RouterPolicy(default_chain=[]), providers=[ProviderState(a)]) for a in adapters]
+
+        async def main():
+            # one worker: anything still going through to_thread would run one call at a time
+            asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=1))
+            t0 = time.perf_counter()
+            results = await asyncio.gather(*(routers[i % 3].aroute(_task(f"t{i}")) for i in range(n)))
+            elapsed = time.perf_counter() - t0
+            await transport.aclose()
+            return results, elapsed
+
+        results, elapsed = asyncio.run(main())
+
+    assert [r.status for r in results] == ["ok"] * n
+    assert {r.result["text"] for r in results} == {"pong"}
+    # 60 x 200ms one at a time = 12s; overlapped it is a few hundred ms
+    assert elapsed < 3.0
+    assert len(srv.requests) == n
+    assert transport.idle_count() == 0
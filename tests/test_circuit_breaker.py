@@ -0,0 +1,88 @@
+from dataclasses import dataclass
+
+from roaudter_agent.contracts import TaskEnvelope
+from roaudter_agent.health import BreakerConfig, CircuitBreaker, HealthMonitor
+from roaudter_agent.policy import RouterPolicy
+from roaudter_agent.router import RouterAgent
+from roaudter_agent.providers.base import ProviderError, ProviderState
+
+
+@dataclass
+class StormProvider:
+    name: str = "openai"
+    calls: int = 0
+    down: bool = True
+
+    def healthcheck(self) -> bool: return True  # key present: healthcheck can't see the outage
+
+    def generate(self, task: TaskEnvelope):
+        self.calls += 1
+        if self.down:
+            raise ProviderError("HTTP 503", code="http_error", http_status=503, retryable=True)
+        return {"text": "pong-remote"}
+
+
+@dataclass
+class LocalProvider:
+    name: str = "ollama"
+    def healthcheck(self) -> bool: return True
+    def generate(self, task: TaskEnvelope): return {"text": "pong-local"}
+
+
+def _task() -> TaskEnvelope:
+    return TaskEnvelope(task_id="t1", agent="comm", intent="code", payload={"msg": "ping"})
+
+
+def test_breaker_opens_on_5xx_storm_and_probes_when_half_open():
+    now = [0.0]
+    breaker = CircuitBreaker(BreakerConfig(consecutive_failures=3, open_seconds=10.0), clock=lambda: now[0])
+    storm = StormProvider()
+    router = RouterAgent(
+        policy=RouterPolicy(default_chain=[]),
+        providers=[ProviderState(storm), ProviderState(LocalProvider())],
+        health=HealthMonitor(breaker=breaker),
+        retry_max_attempts=3,
+        retry_base_backoff_ms=0,
+    )
+
+    res = router.route(_task())  # intent=code -> openai first
+    assert res.provider_used == "ollama"
+    assert storm.calls == 3
+    assert breaker.state("openai") == "open"
+
+    # open: provider is filtered out, no call spent on it
+    res = router.route(_task())
+    assert storm.calls == 3
+    assert res.selected_chain == ["ollama"]
+
+    # half-open: one probe goes through and closes the circuit on success
+    now[0] = 11.0
+    storm.down = False
+    assert breaker.state("openai") == "half_open"
+    res = router.route(_task())
+    assert res.provider_used == "openai"
+    assert breaker.state("openai") == "closed"
+
+
+def test_half_open_limits_probes_and_failed_probe_reopens():
+    now = [0.0]
+    b = CircuitBreaker(BreakerConfig(consecutive_failures=1, open_seconds=5.0), clock=lambda: now[0])
+    b.record("x", True)
+    assert b.allow("x") is False
+
+    now[0] = 6.0
+    assert b.allow("x") is True
+    assert b.allow("x") is False  # only one probe in flight
+    b.record("x", True)
+    assert b.state("x") == "open"
+
+
+def test_error_rate_threshold_and_neutral_outcomes():
+    b = CircuitBreaker(BreakerConfig(consecutive_failures=100, error_rate=0.5, window=4, min_calls=4))
+    for failed in (True, False, True, None, None):
+        b.record("x", failed)
+    assert b.state("x") == "closed"  # 4xx-style outcomes don't count
+    b.record("x", False)
+    b.record("x", True)
+    assert b.state("x") == "open"
+    assert b.snapshot()["x"]["state"] == "open"
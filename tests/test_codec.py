@@ -0,0 +1,64 @@
+import importlib.util
+
+import pytest
+
+from roaudter_agent import codec
+from roaudter_agent.contracts import TaskEnvelope
+from roaudter_agent.providers.claude import ClaudeAdapter
+from roaudter_agent.providers.openai import OpenAIAdapter
+from roaudter_agent.stub_server import StubLLMServer
+from roaudter_agent.transport import PooledTransport
+
+AVAILABLE = [b for b in codec.BACKENDS if b == "stdlib" or importlib.util.find_spec(b)]
+
+BODY = (
+    '{"id":"c1","choices":[{"index":0,"message":{"role":"assistant","content":"привет"},'
+    '"logprobs":{"content":[{"token":"x","logprob":-0.1}]}}],"usage":{"prompt_tokens":3,"completion_tokens":1}}'
+).encode("utf-8")
+
+
+@pytest.fixture(params=AVAILABLE)
+def backend(request):
+    yield codec.configure(request.param)
+    codec.configure()
+
+
+def test_roundtrip_from_bytes(backend):
+    assert backend == codec.backend()
+    obj = codec.loads(BODY)
+    assert obj["choices"][0]["message"]["content"] == "привет"
+    assert codec.loads(codec.dumps(obj)) == obj
+    assert codec.loads(codec.dumps({"when": object})) == {"when": str(object)}
+
+
+def test_decode_fields_keeps_only_named_paths(backend):
+    assert codec.decode_fields(BODY, codec.OPENAI_FIELDS) == {
+        "text": "привет",
+        "usage": {"prompt_tokens": 3, "completion_tokens": 1},
+    }
+    # error bodies / unexpected shapes yield None instead of raising
+    assert codec.decode_fields(b'{"error":{"message":"x"},"choices":null}', codec.OPENAI_FIELDS) == {
+        "text": None,
+        "usage": None,
+    }
+
+
+def test_unknown_backend_falls_back():
+    assert codec.configure("nope") in AVAILABLE
+    codec.configure()
+
+
+def test_adapters_can_skip_raw(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+    task = TaskEnvelope(task_id="t1", agent="comm", intent="chat", payload={"msg": "ping"})
+    with StubLLMServer(reply="lean") as srv:
+        openai = OpenAIAdapter(base_url=srv.base_url + "/v1", keep_raw=False, transport=PooledTransport())
+        claude = ClaudeAdapter(base_url=srv.base_url + "/v1", keep_raw=False, transport=PooledTransport())
+        full = OpenAIAdapter(base_url=srv.base_url + "/v1", transport=PooledTransport())
+        outs = [openai.generate(task), claude.generate(task), full.generate(task)]
+
+    assert [o["text"] for o in outs] == ["lean"] * 3
+    assert "raw" not in outs[0] and "raw" not in outs[1]
+    assert outs[0]["usage"] == outs[2]["usage"]
+    assert outs[2]["raw"]["choices"][0]["message"]["content"] == "lean"
@@ -0,0 +1,94 @@
+from dataclasses import dataclass, field
+
+from roaudter_agent.contracts import TaskEnvelope
+from roaudter_agent.policy import RouterPolicy
+from roaudter_agent.providers.base import ProviderState
+from roaudter_agent.router import RouterAgent
+from roaudter_agent.tokens import context_window, estimate_tokens, fits, truncate_oldest
+
+
+@dataclass
+class P:
+    name: str
+    default_model: str = "m"
+    seen: list = field(default_factory=list)
+    def healthcheck(self) -> bool: return True
+    def generate(self, task: TaskEnvelope):
+        self.seen.append(task)
+        return {"text": "ok"}
+
+
+def _task(msg: str = "", messages=None, **constraints) -> TaskEnvelope:
+    payload = {"msg": msg} if messages is None else {"messages": messages}
+    return TaskEnvelope(task_id="t", agent="comm", intent="chat", payload=payload, constraints=constraints)
+
+
+def test_estimator_and_window_table():
+    english = "The quick brown fox jumps over the lazy dog. " * 20
+    assert 0.8 * len(english) / 4 <= estimate_tokens(english, "openai") <= 1.2 * len(english) / 4
+    # non-Latin scripts cost more tokens per character
+    assert estimate_tokens("привет " * 20, "openai") > estimate_tokens("privet " * 20, "openai")
+    assert context_window("gemini", "gemini-1.5-pro-002") == 2_097_152
+    assert context_window("ollama", "llama3.2:1b") == 4_096
+    assert context_window("nobody", "x") is None
+    assert fits(P("unknown"), _task("x" * 10_000_000))
+
+
+def test_policy_skips_models_that_cannot_fit():
+    ollama, claude = P("ollama"), P("claude")
+    router = RouterAgent(policy=RouterPolicy(default_chain=[]), providers=[ProviderState(ollama), ProviderState(claude)])
+
+    short = router.route(_task("ping"))
+    assert short.selected_chain == ["ollama", "claude"]
+
+    long = router.route(_task("word " * 8000))
+    assert long.selected_chain == ["claude"]
+    assert long.provider_used == "claude"
+    # a short prompt still needs room for a large max_tokens reserve
+    assert router.route(_task("ping", max_tokens=8000)).selected_chain == ["claude"]
+
+
+def test_nothing_fits_fails_before_dispatch():
+    ollama = P("ollama")
+    router = RouterAgent(policy=RouterPolicy(default_chain=[]), providers=[ProviderState(ollama)])
+    res = router.route(_task("word " * 8000))
+
+    assert res.status == "error"
+    assert res.error["code"] == "context_length_exceeded"
+    assert res.error["retryable"] is False
+    assert res.attempts == 0 and ollama.seen == []
+
+
+def test_truncate_oldest_keeps_system_and_newest_turns():
+    history = [{"role": "system", "content": "be brief"}]
+    for i in range(40):
+        history.append({"role": "user", "content": f"question {i} " + "blah " * 100})
+        history.append({"role": "assistant", "content": f"answer {i} " + "blah " * 100})
+    history.append({"role": "user", "content": "final question"})
+
+    ollama = P("ollama")
+    router = RouterAgent(policy=RouterPolicy(default_chain=[]), providers=[ProviderState(ollama)])
+    res = router.route(_task(messages=history, truncate="oldest"))
+
+    assert res.status == "ok"
+    assert res.metrics["truncated"] is True
+    sent = ollama.seen[0].payload["messages"]
+    assert sent[0] == history[0] and sent[-1] == history[-1]
+    assert 2 < len(sent) < len(history)
+    assert fits(ollama, ollama.seen[0])
+
+    clipped = truncate_oldest(_task("x" * 50_000), 1000, "llama")
+    assert fits(ollama, clipped)
+    assert clipped.payload["messages"][0]["content"].endswith("x")
+
+
+def test_truncate_with_only_a_huge_system_prompt_fails_cleanly():
+    ollama = P("ollama")
+    router = RouterAgent(policy=RouterPolicy(default_chain=[]), providers=[ProviderState(ollama)])
+    huge = [{"role": "system", "content": "rule " * 8000}]
+    res = router.route(_task(messages=huge, truncate="oldest"))
+
+    assert res.status == "error"
+    assert res.error["code"] == "context_length_exceeded"
+    assert ollama.seen == []
+    assert truncate_oldest(_task(messages=huge), 1000, "llama").payload["messages"] == huge
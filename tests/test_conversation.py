@@ -0,0 +1,98 @@
+from dataclasses import dataclass, field
+
+from roaudter_agent.contracts import TaskEnvelope
+from roaudter_agent.conversation import ConversationStore
+from roaudter_agent.cost import call_cost
+from roaudter_agent.policy import RouterPolicy
+from roaudter_agent.providers.base import ProviderState
+from roaudter_agent.providers.claude import ClaudeAdapter
+from roaudter_agent.providers.gemini import GeminiAdapter
+from roaudter_agent.providers.ollama import OllamaAdapter
+from roaudter_agent.router import RouterAgent
+from roaudter_agent.stub_server import StubLLMServer
+from roaudter_agent.transport import PooledTransport
+
+HISTORY = [
+    {"role": "system", "content": "be brief"},
+    {"role": "user", "content": "hi"},
+    {"role": "assistant", "content": "hello"},
+    {"role": "user", "content": "how are you?"},
+]
+
+
+@dataclass
+class EchoProvider:
+    name: str = "ollama"
+    seen: list = field(default_factory=list)
+    def healthcheck(self) -> bool: return True
+    def generate(self, task: TaskEnvelope):
+        self.seen.append(task.payload.get("messages"))
+        return {"text": "answer %d" % len(self.seen)}
+
+
+def _turn(msg: str, trace_id: str = "conv-1") -> TaskEnvelope:
+    return TaskEnvelope(
+        task_id="t", agent="comm", intent="chat", payload={"msg": msg}, context={"trace_id": trace_id}
+    )
+
+
+def test_store_appends_turns_per_trace_id():
+    p = EchoProvider()
+    store = ConversationStore()
+    router = RouterAgent(policy=RouterPolicy(default_chain=[]), providers=[ProviderState(p)], conversations=store)
+
+    router.route(_turn("first"))
+    router.route(_turn("second"))
+    router.route(_turn("other", trace_id="conv-2"))
+
+    assert p.seen[0] is None  # first turn goes out as plain msg
+    assert p.seen[1] == [
+        {"role": "user", "content": "first"},
+        {"role": "assistant", "content": "answer 1"},
+        {"role": "user", "content": "second"},
+    ]
+    assert p.seen[2] is None
+    assert len(store.get("conv-1")) == 4
+
+
+def test_store_keeps_system_and_newest_turns():
+    store = ConversationStore(max_conversations=1, max_messages=2)
+    store.append("a", {"role": "system", "content": "s"}, {"role": "user", "content": "1"})
+    store.append("a", {"role": "assistant", "content": "2"}, {"role": "user", "content": "3"})
+    assert [m["content"] for m in store.get("a")] == ["s", "2", "3"]
+    store.append("b", {"role": "user", "content": "x"})
+    assert store.get("a") == [] and len(store) == 1
+
+
+def test_adapters_send_history_with_cache_hints(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+    monkeypatch.setenv("GEMINI_API_KEY", "test")
+    monkeypatch.delenv("ROAUDTER_OFFLINE_TEST_MODE", raising=False)
+    task = TaskEnvelope(task_id="t", agent="comm", intent="chat", payload={"messages": HISTORY})
+    with StubLLMServer(reply="fine") as srv:
+        ClaudeAdapter(base_url=srv.base_url + "/v1", transport=PooledTransport()).generate(task)
+        GeminiAdapter(base_url=srv.base_url, transport=PooledTransport()).generate(task)
+        OllamaAdapter(base_url=srv.base_url, transport=PooledTransport()).generate(task)
+    claude, gemini, ollama = (r["body"] for r in srv.requests if r["method"] == "POST")
+
+    assert claude["system"] == [{"type": "text", "text": "be brief", "cache_control": {"type": "ephemeral"}}]
+    assert [m["role"] for m in claude["messages"]] == ["user", "assistant", "user"]
+    assert claude["messages"][1]["content"][0]["cache_control"] == {"type": "ephemeral"}
+    assert claude["messages"][2]["content"] == "how are you?"
+
+    assert gemini["systemInstruction"] == {"parts": [{"text": "be brief"}]}
+    assert [c["role"] for c in gemini["contents"]] == ["user", "model", "user"]
+
+    assert ollama["messages"] == HISTORY
+    assert ollama["keep_alive"] == "30m"
+
+
+def test_cache_reads_are_billed_at_the_cached_rate():
+    adapter = ClaudeAdapter(default_model="claude-3-5-haiku-latest")
+    task = TaskEnvelope(task_id="t", agent="comm", intent="chat", payload={"messages": HISTORY})
+    cold = call_cost(adapter, task, {"usage": {"input_tokens": 2000, "output_tokens": 100}})
+    warm = call_cost(
+        adapter, task,
+        {"usage": {"input_tokens": 100, "cache_read_input_tokens": 1900, "output_tokens": 100}},
+    )
+    assert warm < cold / 3
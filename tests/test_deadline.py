@@ -0,0 +1,111 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+
+from roaudter_agent.contracts import TaskEnvelope
+from roaudter_agent.deadline import remaining_s
+from roaudter_agent.policy import RouterPolicy
+from roaudter_agent.router import RouterAgent
+from roaudter_agent.providers.base import ProviderError, ProviderState
+from roaudter_agent.providers.ollama import OllamaAdapter
+from roaudter_agent.providers.openai import OpenAIAdapter
+from roaudter_agent.transport import HttpResponse
+
+
+def _task(deadline_ms=None, intent="chat") -> TaskEnvelope:
+    constraints = {} if deadline_ms is None else {"deadline_ms": deadline_ms}
+    return TaskEnvelope(task_id="t1", agent="comm", intent=intent, payload={"msg": "ping"}, constraints=constraints)
+
+
+@dataclass
+class RecordingTransport:
+    timeouts: list = field(default_factory=list)
+    fail: bool = False
+
+    def request(self, method, url, *, body=None, headers=None, timeout=60.0):
+        if method == "GET":  # healthcheck
+            return HttpResponse(200, "OK", {}, b"{}")
+        self.timeouts.append(timeout)
+        if self.fail:
+            raise ConnectionResetError("boom")
+        return HttpResponse(200, "OK", {}, b'{"choices":[{"message":{"content":"pong"}}]}')
+
+
+def test_adapter_socket_timeout_is_remaining_budget(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    transport = RecordingTransport()
+    router = RouterAgent(
+        policy=RouterPolicy(default_chain=[]),
+        providers=[ProviderState(OpenAIAdapter(transport=transport))],
+    )
+
+    assert router.route(_task(deadline_ms=500)).status == "ok"
+    assert 0 < transport.timeouts[0] <= 0.5
+    assert router.route(_task()).status == "ok"
+    assert transport.timeouts[1] == 60.0
+
+
+def test_ollama_retries_live_in_router_and_stop_at_deadline(monkeypatch):
+    monkeypatch.setenv("ROAUDTER_OFFLINE_TEST_MODE", "0")
+    transport = RecordingTransport(fail=True)
+    adapter = OllamaAdapter(transport=transport)
+
+    try:
+        adapter.generate(_task())
+    except ProviderError as e:
+        assert e.code == "network_error" and e.retryable
+    assert len(transport.timeouts) == 1  # one HTTP attempt per generate()
+
+    router = RouterAgent(
+        policy=RouterPolicy(default_chain=[]),
+        providers=[ProviderState(adapter)],
+        retry_max_attempts=100,
+        retry_budget_ms=10_000,
+        retry_base_backoff_ms=50,
+        retry_max_backoff_ms=50,
+    )
+    t0 = time.time()
+    res = router.route(_task(deadline_ms=300))
+    assert time.time() - t0 < 0.45  # vs ~2.3s of legacy internal backoffs per attempt
+    assert res.status == "error"
+    assert len(transport.timeouts) - 1 == res.attempts
+
+
+@dataclass
+class FlakyProvider:
+    name: str = "openai"
+    calls: int = 0
+    def healthcheck(self) -> bool: return True
+    def generate(self, task):
+        self.calls += 1
+        time.sleep(0.03)
+        raise ProviderError("HTTP 503", code="http_error", http_status=503, retryable=True)
+
+
+def test_route_never_outlives_deadline():
+    p = FlakyProvider()
+    router = RouterAgent(
+        policy=RouterPolicy(default_chain=[]),
+        providers=[ProviderState(p)],
+        retry_max_attempts=100,
+        retry_budget_ms=10_000,
+    )
+    t0 = time.time()
+    res = router.route(_task(deadline_ms=100))
+    assert time.time() - t0 < 0.2
+    assert res.status == "error"
+    assert 1 <= p.calls <= 4  # retries stopped by the deadline, not by the attempt cap
+
+
+@dataclass
+class DeadlineEcho:
+    name: str = "ollama"
+    def healthcheck(self) -> bool: return True
+    def generate(self, task): return {"text": "pong", "left": remaining_s()}
+
+
+def test_async_route_propagates_deadline_into_thread():
+    router = RouterAgent(policy=RouterPolicy(default_chain=[]), providers=[ProviderState(DeadlineEcho())])
+    res = asyncio.run(router.aroute(_task(deadline_ms=1000)))
+    assert 0 < res.result["left"] <= 1.0
+    assert remaining_s() is None
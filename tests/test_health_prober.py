@@ -0,0 +1,81 @@
+import time
+from dataclasses import dataclass
+
+from roaudter_agent.contracts import TaskEnvelope
+from roaudter_agent.health import HealthMonitor, HealthProber
+from roaudter_agent.policy import RouterPolicy
+from roaudter_agent.router import RouterAgent
+from roaudter_agent.providers.base import ProviderState
+
+
+@dataclass
+class SlowCheckProvider:
+    name: str = "ollama"
+    ok: bool = True
+    checks: int = 0
+
+    def healthcheck(self) -> bool:
+        self.checks += 1
+        time.sleep(0.05)
+        return self.ok
+
+    def generate(self, task: TaskEnvelope):
+        return {"text": "pong"}
+
+
+def _task() -> TaskEnvelope:
+    return TaskEnvelope(task_id="t1", agent="comm", intent="chat", payload={"msg": "ping"})
+
+
+def test_route_reads_snapshot_without_running_healthcheck():
+    p = SlowCheckProvider()
+    monitor = HealthMonitor()
+    prober = HealthProber(monitor, [ProviderState(p)])
+    router = RouterAgent(policy=RouterPolicy(default_chain=[]), providers=[ProviderState(p)], health=monitor)
+
+    res = router.route(_task())
+    assert res.status == "ok"
+    assert p.checks == 0  # optimistic until the prober runs
+
+    p.ok = False
+    prober.probe_once()
+    assert p.checks == 1
+    assert router.route(_task()).status == "error"
+    assert p.checks == 1
+
+
+def test_background_thread_refreshes_with_jitter():
+    p = SlowCheckProvider()
+    router = RouterAgent(policy=RouterPolicy(default_chain=[]), providers=[ProviderState(p)])
+    prober = router.start_health_prober(interval_seconds=0.01, jitter=0.5)
+    try:
+        deadline = time.time() + 2.0
+        while p.checks < 3 and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        prober.stop()
+
+    assert p.checks >= 3
+    assert router.health.background is True
+    assert all(0.005 <= prober.next_delay() <= 0.015 for _ in range(20))
+
+
+def test_router_stop_ends_the_prober_thread():
+    router = RouterAgent(policy=RouterPolicy(default_chain=[]), providers=[ProviderState(SlowCheckProvider())])
+    thread = router.start_health_prober(interval_seconds=0.01)._thread
+    assert thread is not None and thread.is_alive()
+
+    router.stop()
+    assert not thread.is_alive()
+    router.stop()  # idempotent
+
+
+def test_com_agent_close_stops_its_prober(monkeypatch):
+    from roaudter_agent.lam_entrypoint import RoaudterComAgent
+
+    monkeypatch.setenv("ROAUDTER_HEALTH_PROBE_SECONDS", "0.01")
+    agent = RoaudterComAgent()
+    thread = agent.router.health_prober._thread
+    assert thread.is_alive()
+    agent.close()
+    assert not thread.is_alive()
@@ -0,0 +1,137 @@
+import asyncio
+import time
+from dataclasses import dataclass
+
+from roaudter_agent.contracts import TaskEnvelope
+from roaudter_agent.health import BreakerConfig, CircuitBreaker
+from roaudter_agent.policy import RouterPolicy
+from roaudter_agent.router import RouterAgent
+from roaudter_agent.providers.base import ProviderError, ProviderState
+
+
+@dataclass
+class SleepyProvider:
+    name: str
+    delay_s: float
+    cancelled: bool = False
+
+    def healthcheck(self) -> bool: return True
+
+    def generate(self, task: TaskEnvelope):
+        time.sleep(self.delay_s)
+        return {"text": self.name}
+
+    async def agenerate(self, task: TaskEnvelope):
+        try:
+            await asyncio.sleep(self.delay_s)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return {"text": self.name}
+
+
+def _router(primary_delay: float, secondary_delay: float) -> tuple[RouterAgent, SleepyProvider]:
+    slow = SleepyProvider(name="ollama", delay_s=primary_delay)
+    fast = SleepyProvider(name="openai", delay_s=secondary_delay)
+    router = RouterAgent(
+        policy=RouterPolicy(default_chain=[]),
+        providers=[ProviderState(slow), ProviderState(fast)],
+        hedge=True,
+        hedge_delay_ms=30,
+    )
+    return router, slow
+
+
+def _task() -> TaskEnvelope:
+    return TaskEnvelope(task_id="t1", agent="comm", intent="chat", payload={"msg": "ping"})
+
+
+def test_slow_primary_is_hedged_and_secondary_wins():
+    router, _slow = _router(primary_delay=0.5, secondary_delay=0.0)
+
+    t0 = time.perf_counter()
+    res = router.route(_task())
+
+    assert time.perf_counter() - t0 < 0.4
+    assert res.status == "ok"
+    assert res.provider_used == "openai"
+    assert res.metrics["hedged"] is True
+    assert res.metrics["hedge_winner"] == "openai"
+
+
+def test_fast_primary_is_not_hedged():
+    router, _slow = _router(primary_delay=0.0, secondary_delay=0.0)
+    res = router.route(_task())
+
+    assert res.provider_used == "ollama"
+    assert res.metrics["hedged"] is False
+    assert res.metrics["hedge_winner"] == "ollama"
+
+
+def test_async_hedge_cancels_loser():
+    router, slow = _router(primary_delay=0.5, secondary_delay=0.0)
+    res = asyncio.run(router.aroute(_task()))
+
+    assert res.provider_used == "openai"
+    assert res.metrics["hedged"] is True
+    assert slow.cancelled is True
+
+
+def test_hedging_off_by_default():
+    router = RouterAgent(
+        policy=RouterPolicy(default_chain=[]),
+        providers=[ProviderState(SleepyProvider(name="ollama", delay_s=0.0))],
+    )
+    res = router.route(_task())
+    assert "hedged" not in res.metrics
+
+
+def test_hedge_delay_follows_observed_percentile():
+    router, _slow = _router(primary_delay=0.0, secondary_delay=0.0)
+    primary = router.providers[0]
+    assert router._hedge_delay_s(primary) == 0.030  # no samples yet -> hedge_delay_ms
+
+    for ms in range(1, 101):
+        router.stats.observe("ollama", float(ms))
+    assert router._hedge_delay_s(primary) == 0.095
+
+
+def test_cancelled_hedge_loser_releases_half_open_probe():
+    router, slow = _router(primary_delay=0.5, secondary_delay=0.0)
+    router.health.breaker = CircuitBreaker(BreakerConfig(consecutive_failures=1, open_seconds=0.0))
+    router.health.breaker.record("ollama", True)  # open -> half_open right away
+
+    async def main():
+        res = await router.aroute(_task())
+        await asyncio.sleep(0.01)  # let the loser observe its cancellation
+        return res
+
+    res = asyncio.run(main())
+    assert res.provider_used == "openai" and slow.cancelled is True
+    assert router.health.breaker.state("ollama") == "half_open"
+    assert router.health.breaker.allow("ollama") is True
+
+
+@dataclass
+class SlowFailure:
+    name: str = "ollama"
+    def healthcheck(self) -> bool: return True
+    def generate(self, task: TaskEnvelope):
+        time.sleep(0.1)
+        raise ProviderError("HTTP 503", code="http_error", http_status=503, retryable=True)
+
+
+def test_hedge_loser_does_not_touch_returned_envelope():
+    router = RouterAgent(
+        policy=RouterPolicy(default_chain=[]),
+        providers=[ProviderState(SlowFailure()), ProviderState(SleepyProvider(name="openai", delay_s=0.0))],
+        hedge=True,
+        hedge_delay_ms=20,
+    )
+    res = router.route(_task())
+    assert res.provider_used == "openai"
+    errors, attempts = list(res.errors), res.attempts
+
+    time.sleep(0.2)  # the loser fails after route() has returned
+    assert res.errors == errors == []
+    assert res.attempts == attempts
@@ -0,0 +1,74 @@
+import io
+import json
+import sys
+import types
+from dataclasses import dataclass
+
+from roaudter_agent import logsink
+from roaudter_agent.contracts import TaskEnvelope
+from roaudter_agent.policy import RouterPolicy
+from roaudter_agent.router import RouterAgent
+from roaudter_agent.providers.base import ProviderState
+
+
+@dataclass
+class OkProvider:
+    name: str = "ollama"
+    def healthcheck(self) -> bool: return True
+    def generate(self, task): return {"text": "pong"}
+
+
+def _task() -> TaskEnvelope:
+    return TaskEnvelope(task_id="t1", agent="comm", intent="chat", payload={"msg": "ping"})
+
+
+def test_level_and_event_filters(monkeypatch):
+    monkeypatch.setenv("LAM_LOG_LEVEL", "warning")
+    monkeypatch.setenv("LAM_LOG_EVENTS", "roaudter.result, Roaudter.Trace")
+    logsink.configure()
+    try:
+        assert not logsink.enabled("info", "roaudter.result")
+        assert logsink.enabled("error", "roaudter.result")
+        assert logsink.enabled("ERROR", "roaudter.TRACE")  # case-insensitive, like lam_logging
+        assert not logsink.enabled("error", "roaudter.route")
+        assert logsink.enabled("bogus", "roaudter.result")  # unknown level counts as warning
+        # env is read once: changes after configure() are ignored
+        monkeypatch.setenv("LAM_LOG_LEVEL", "error")
+        assert logsink.enabled("warning", "roaudter.result")
+        logsink.configure(level="trace", events="")
+        assert logsink.enabled("trace", "anything")
+        logsink.configure(level="nonsense")
+        assert not logsink.enabled("info", "roaudter.result")
+    finally:
+        monkeypatch.delenv("LAM_LOG_LEVEL")
+        monkeypatch.delenv("LAM_LOG_EVENTS")
+        logsink.configure()
+
+
+def test_lam_logger_resolved_once_and_filtered_before_call(monkeypatch):
+    calls = []
+    fake = types.ModuleType("lam_logging")
+    fake.log = lambda level, event, msg, **fields: calls.append(event)
+    monkeypatch.setitem(sys.modules, "lam_logging", fake)
+    monkeypatch.setenv("LAM_LOG_EVENTS", "roaudter.result")
+    logsink.configure()
+    try:
+        router = RouterAgent(policy=RouterPolicy(default_chain=[]), providers=[ProviderState(OkProvider())])
+        router.route(_task())
+        monkeypatch.delitem(sys.modules, "lam_logging")  # already resolved: no re-import
+        router.route(_task())
+    finally:
+        monkeypatch.delenv("LAM_LOG_EVENTS")
+        logsink.configure()
+    assert calls == ["roaudter.result", "roaudter.result"]
+
+
+def test_jsonl_sink_batches_off_thread():
+    out = io.StringIO()
+    sink = logsink.JsonlSink(out, max_batch=2, flush_interval=0.01)
+    for i in range(5):
+        assert sink.put({"event": "e", "i": i})
+    sink.flush()
+    sink.close()
+    lines = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r["i"] for r in lines] == [0, 1, 2, 3, 4]
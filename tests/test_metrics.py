@@ -0,0 +1,91 @@
+import socket
+import urllib.request
+from dataclasses import dataclass
+
+from roaudter_agent.contracts import TaskEnvelope
+from roaudter_agent.metrics import CONTENT_TYPE, MetricsRegistry, RouterMetrics
+from roaudter_agent.policy import RouterPolicy
+from roaudter_agent.router import RouterAgent
+from roaudter_agent.providers.base import ProviderError, ProviderState
+
+
+@dataclass
+class FailingProvider:
+    name: str = "openai"
+    def healthcheck(self) -> bool: return True
+    def generate(self, task):
+        raise ProviderError("HTTP 503", code="http_error", http_status=503, retryable=True)
+
+
+@dataclass
+class OkProvider:
+    name: str = "ollama"
+    def healthcheck(self) -> bool: return True
+    def generate(self, task):
+        return {"text": "pong", "usage": {"prompt_tokens": 3, "completion_tokens": 2, "total_tokens": 5}}
+
+
+def _task() -> TaskEnvelope:
+    return TaskEnvelope(task_id="t1", agent="comm", intent="code", payload={"msg": "ping"})
+
+
+def test_router_records_requests_errors_retries_depth_and_tokens():
+    m = RouterMetrics()
+    router = RouterAgent(
+        policy=RouterPolicy(default_chain=[]),
+        providers=[ProviderState(FailingProvider()), ProviderState(OkProvider())],
+        retry_max_attempts=2,
+        retry_base_backoff_ms=0,
+        retry_max_backoff_ms=0,
+        metrics=m,
+    )
+    assert router.route(_task()).provider_used == "ollama"
+
+    assert m.requests.value(provider="openai", outcome="error") == 2
+    assert m.errors.value(provider="openai", code="http_error") == 2
+    assert m.retries.value(provider="openai") == 1
+    assert m.requests.value(provider="ollama", outcome="ok") == 1
+    assert m.latency.count(provider="ollama") == 1
+    assert m.tokens.value(provider="ollama", kind="prompt") == 3
+    assert m.tokens.value(provider="ollama", kind="completion") == 2
+    assert m.routes.value(status="ok") == 1
+    assert m.fallback_depth.count() == 1
+
+    text = m.registry.render()
+    assert "# TYPE roaudter_fallback_depth histogram" in text
+    assert 'roaudter_fallback_depth_bucket{le="0"} 0' in text
+    assert 'roaudter_fallback_depth_bucket{le="1"} 1' in text
+    assert 'roaudter_provider_errors_total{provider="openai",code="http_error"} 2' in text
+    assert text.endswith("# EOF\n")
+
+
+def test_http_endpoint_serves_openmetrics():
+    reg = MetricsRegistry()
+    reg.counter("demo_events", "Demo.", ("kind",)).inc(kind='a"b')
+    server = reg.serve(port=0)
+    try:
+        host, port = server.server_address[:2]
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics", timeout=5) as resp:
+            body = resp.read().decode("utf-8")
+            assert resp.headers["Content-Type"] == CONTENT_TYPE
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert 'demo_events_total{kind="a\\"b"} 1' in body
+
+
+def test_default_routers_share_one_metrics_endpoint(monkeypatch):
+    from roaudter_agent import registry
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    monkeypatch.setattr(registry, "_served_metrics", None)
+    monkeypatch.setenv("ROAUDTER_METRICS_PORT", str(port))
+
+    first = registry.build_default_router()
+    second = registry.build_default_router()  # would fail on the bound port if it served again
+    assert second.metrics is first.metrics
+
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as resp:
+        assert resp.status == 200
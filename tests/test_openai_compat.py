@@ -0,0 +1,84 @@
+import gzip
+import io
+import json
+import urllib.error
+from email.message import Message
+
+from roaudter_agent.contracts import TaskEnvelope
+from roaudter_agent.policy import RouterPolicy
+from roaudter_agent.providers.base import ProviderError, ProviderState
+from roaudter_agent.providers.grok import GrokAdapter
+from roaudter_agent.providers.ollama import OllamaAdapter
+from roaudter_agent.providers.openai_compat import PROFILES, OpenAICompatAdapter, VendorProfile
+from roaudter_agent.router import RouterAgent
+from roaudter_agent.stub_server import StubLLMServer
+from roaudter_agent.transport import HttpResponse, PooledTransport
+
+
+def _task(**constraints) -> TaskEnvelope:
+    return TaskEnvelope(task_id="t1", agent="comm", intent="chat", payload={"msg": "ping"}, constraints=constraints)
+
+
+def test_new_vendor_is_configuration_only():
+    with StubLLMServer(reply="from vllm") as srv:
+        vllm = OpenAICompatAdapter(
+            name="vllm", base_url=srv.base_url + "/v1", default_model="qwen2.5-7b",
+            profile=PROFILES["vllm"], transport=PooledTransport(),
+        )
+        assert vllm.healthcheck()
+        router = RouterAgent(policy=RouterPolicy(default_chain=[]), providers=[ProviderState(vllm)])
+        res = router.route(_task())
+        streamed = "".join(c.get("delta", "") for c in vllm.stream(_task()))
+
+    assert res.status == "ok" and res.provider_used == "vllm"
+    assert res.result["text"] == "from vllm" and res.result["provider"] == "vllm"
+    assert streamed == "from vllm"
+    post = [r for r in srv.requests if r["method"] == "POST"][0]
+    assert post["path"] == "/v1/chat/completions"
+    assert post["body"]["model"] == "qwen2.5-7b"
+
+
+def test_vendor_env_and_legacy_kwargs(monkeypatch):
+    monkeypatch.setenv("GROK_API_KEY", "k")
+    monkeypatch.setenv("GROK_BASE_URL", "http://override/v1/")
+    assert GrokAdapter(base_url_default="http://legacy/v1")._base_url() == "http://override/v1"
+    monkeypatch.delenv("GROK_BASE_URL")
+    assert GrokAdapter(base_url_default="http://legacy/v1")._base_url() == "http://legacy/v1"
+
+    monkeypatch.delenv("GROK_API_KEY")
+    assert GrokAdapter().healthcheck() is False
+    try:
+        GrokAdapter().generate(_task())
+        raise AssertionError("expected ProviderError")
+    except ProviderError as e:
+        assert e.code == "missing_api_key"
+
+
+def test_quota_quirk_and_gzip_body(monkeypatch):
+    monkeypatch.delenv("ROAUDTER_OFFLINE_TEST_MODE", raising=False)
+
+    class T:
+        def __init__(self, resp=None, err=None):
+            self.resp, self.err, self.headers = resp, err, None
+        def request(self, method, url, *, body=None, headers=None, timeout=60.0):
+            self.headers = headers
+            if self.err:
+                raise self.err
+            return self.resp
+
+    err = urllib.error.HTTPError("u", 429, "Too Many Requests", Message(), io.BytesIO(b""))
+    cloud = OllamaAdapter(name="ollama_cloud", default_model="glm-4.7:cloud", transport=T(err=err))
+    try:
+        cloud.generate(_task())
+        raise AssertionError("expected ProviderError")
+    except ProviderError as e:
+        assert e.code == "quota_exhausted" and e.retryable is False
+
+    body = {"choices": [{"message": {"content": "zipped"}}], "usage": {"prompt_tokens": 3}}
+    headers = Message()
+    headers["Content-Encoding"] = "gzip"
+    t = T(resp=HttpResponse(200, "OK", headers, gzip.compress(json.dumps(body).encode("utf-8"))))
+    plain = OpenAICompatAdapter(profile=VendorProfile(auth_header=None), transport=t)
+    out = plain.generate(_task())
+    assert out["text"] == "zipped" and out["usage"] == {"prompt_tokens": 3}
+    assert t.headers["Accept-Encoding"] == "gzip"
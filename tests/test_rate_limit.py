@@ -0,0 +1,81 @@
+from dataclasses import dataclass
+
+from roaudter_agent.contracts import TaskEnvelope
+from roaudter_agent.policy import RouterPolicy
+from roaudter_agent.router import RouterAgent
+from roaudter_agent.providers.base import ProviderState
+from roaudter_agent.ratelimit import RateLimit, RateLimiter, TokenBucket
+
+
+@dataclass
+class CountingProvider:
+    name: str
+    api_key_env: str = ""
+    calls: int = 0
+    tokens: int = 10
+
+    def healthcheck(self) -> bool: return True
+
+    def generate(self, task: TaskEnvelope):
+        self.calls += 1
+        return {"text": f"pong-{self.name}", "usage": {"total_tokens": self.tokens}}
+
+
+def _task() -> TaskEnvelope:
+    return TaskEnvelope(task_id="t1", agent="comm", intent="chat", payload={"msg": "ping"})
+
+
+def test_token_bucket_refills_with_clock():
+    now = [0.0]
+    b = TokenBucket(rate=1.0, capacity=2.0, clock=lambda: now[0])
+    assert b.try_take() and b.try_take()
+    assert b.try_take() is False
+    now[0] = 1.5
+    assert b.try_take() is True
+    b.consume(5.0)
+    assert b.level() < 0  # usage debt
+    now[0] = 10.0
+    assert b.level() == 2.0
+
+
+def test_router_skips_provider_over_rpm_budget():
+    now = [0.0]
+    limiter = RateLimiter({"ollama": RateLimit(requests_per_minute=2)}, clock=lambda: now[0])
+    local, remote = CountingProvider("ollama"), CountingProvider("openai")
+    router = RouterAgent(
+        policy=RouterPolicy(default_chain=[]),
+        providers=[ProviderState(local), ProviderState(remote)],
+        rate_limiter=limiter,
+    )
+
+    assert [router.route(_task()).provider_used for _ in range(3)] == ["ollama", "ollama", "openai"]
+    assert local.calls == 2
+
+    now[0] = 30.0  # one request refilled
+    assert router.route(_task()).provider_used == "ollama"
+
+
+def test_tpm_budget_charges_usage_and_policy_deprioritizes():
+    now = [0.0]
+    limiter = RateLimiter({"ollama": RateLimit(tokens_per_minute=15)}, clock=lambda: now[0])
+    local = CountingProvider("ollama", tokens=20)
+    remote = CountingProvider("openai")
+    router = RouterAgent(
+        policy=RouterPolicy(default_chain=[], limiter=limiter),
+        providers=[ProviderState(local), ProviderState(remote)],
+        rate_limiter=limiter,
+    )
+
+    assert router.route(_task()).provider_used == "ollama"
+    res = router.route(_task())
+    assert res.provider_used == "openai"
+    assert res.selected_chain == ["openai", "ollama"]  # moved to the back, not dropped
+    assert res.errors == []
+
+
+def test_buckets_are_per_api_key():
+    limiter = RateLimiter({"openai": RateLimit(requests_per_minute=1)}, clock=lambda: 0.0)
+    a = CountingProvider("openai", api_key_env="OPENAI_KEY_A")
+    b = CountingProvider("openai", api_key_env="OPENAI_KEY_B")
+    assert limiter.try_acquire(a) and limiter.try_acquire(b)
+    assert limiter.try_acquire(a) is False
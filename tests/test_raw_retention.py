@@ -0,0 +1,81 @@
+from dataclasses import dataclass
+
+import pytest
+
+from roaudter_agent.cache import MemoryCache
+from roaudter_agent.contracts import TaskEnvelope
+from roaudter_agent.policy import RouterPolicy
+from roaudter_agent.providers.base import ProviderState
+from roaudter_agent.retention import RawRetention, retention_from_env
+from roaudter_agent.router import RouterAgent
+
+RAW = {
+    "id": "chatcmpl-1",
+    "choices": [{"message": {"content": "pong"}, "finish_reason": "stop"}],
+    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+    "system_fingerprint": "x" * 4096,
+}
+
+
+@dataclass
+class P:
+    name: str = "openai"
+    calls: int = 0
+    def healthcheck(self) -> bool: return True
+    def generate(self, task: TaskEnvelope):
+        self.calls += 1
+        return {"provider": self.name, "text": "pong", "usage": RAW["usage"], "raw": RAW}
+
+
+def _route(retention, cache=None):
+    router = RouterAgent(
+        policy=RouterPolicy(default_chain=[]), providers=[ProviderState(P())],
+        raw_retention=retention, cache=cache,
+    )
+    task = TaskEnvelope(task_id="t", agent="comm", intent="chat", payload={"msg": "ping"},
+                        constraints={"temperature": 0})
+    return router.route(task)
+
+
+def test_modes_shape_result_raw():
+    assert _route(None).result["raw"] is RAW
+    assert _route(RawRetention("full")).result["raw"] is RAW
+    assert "raw" not in _route(RawRetention("none")).result
+
+    res = _route(RawRetention("summary"))
+    assert res.result["raw"] == {"id": "chatcmpl-1", "finish_reason": "stop",
+                                 "keys": ["choices", "id", "system_fingerprint", "usage"]}
+    # text/usage survive every mode
+    assert res.result["text"] == "pong" and res.usage == RAW["usage"]
+
+    with pytest.raises(ValueError):
+        RawRetention("most")
+
+
+def test_spill_writes_ref_and_cache_holds_the_ref(tmp_path):
+    retention = RawRetention("spill", spill_dir=str(tmp_path))
+    cache = MemoryCache()
+    first = _route(retention, cache)
+    ref = first.result["raw"]["ref"]
+    assert first.result["raw"]["bytes"] > 4096
+    assert retention.load(ref) == RAW
+    assert cache.bytes_used < 1024
+
+    again = _route(retention, cache)
+    assert again.metrics["cache_hit"] is True and again.result["raw"]["ref"] == ref
+
+    assert retention.purge(max_age_s=-1) == 1
+    with pytest.raises(FileNotFoundError):
+        retention.load(ref)
+    with pytest.raises(ValueError):
+        retention.load("../etc/passwd")
+
+
+def test_retention_from_env(monkeypatch, tmp_path):
+    monkeypatch.delenv("ROAUDTER_RAW_RETENTION", raising=False)
+    assert retention_from_env() is None
+    monkeypatch.setenv("ROAUDTER_RAW_RETENTION", "Summary")
+    assert retention_from_env().mode == "summary"
+    monkeypatch.setenv("ROAUDTER_RAW_RETENTION", f"spill:{tmp_path}")
+    r = retention_from_env()
+    assert r.mode == "spill" and r.spill_dir == str(tmp_path)
@@ -0,0 +1,98 @@
+from dataclasses import dataclass
+
+from roaudter_agent.cache import MemoryCache, SqliteCache, TieredCache, cache_key
+from roaudter_agent.contracts import TaskEnvelope
+from roaudter_agent.policy import RouterPolicy
+from roaudter_agent.router import RouterAgent
+from roaudter_agent.providers.base import ProviderState
+
+
+@dataclass
+class CountingProvider:
+    name: str = "ollama"
+    calls: int = 0
+
+    def healthcheck(self) -> bool: return True
+
+    def generate(self, task: TaskEnvelope):
+        self.calls += 1
+        return {"text": "pong", "usage": {"total_tokens": 2}}
+
+
+def _task(intent: str = "chat", **constraints) -> TaskEnvelope:
+    return TaskEnvelope(task_id="t1", agent="comm", intent=intent, payload={"msg": "ping"}, constraints=constraints)
+
+
+def _router(p: CountingProvider, **kw) -> RouterAgent:
+    return RouterAgent(policy=RouterPolicy(default_chain=[]), providers=[ProviderState(p)], cache=MemoryCache(), **kw)
+
+
+def test_deterministic_task_is_served_from_cache():
+    p = CountingProvider()
+    router = _router(p)
+
+    first = router.route(_task(temperature=0))
+    second = router.route(_task(temperature=0))
+
+    assert p.calls == 1
+    assert first.metrics["cache_hit"] is False
+    assert second.metrics["cache_hit"] is True
+    assert second.provider_used == "ollama"
+    assert second.result == {"text": "pong", "usage": {"total_tokens": 2}}
+    assert second.tokens == 2
+    assert second.attempts == 0
+
+
+def test_sampling_temperature_bypasses_cache_unless_forced():
+    p = CountingProvider()
+    router = _router(p)
+
+    router.route(_task())
+    router.route(_task())
+    assert p.calls == 2
+
+    router.route(_task(cache="force"))
+    router.route(_task(cache="force"))
+    assert p.calls == 3
+
+
+def test_key_depends_on_sent_fields():
+    assert cache_key(_task(temperature=0)) == cache_key(_task(temperature=0))
+    assert cache_key(_task(temperature=0)) != cache_key(_task(temperature=0, model="x"))
+
+
+def test_key_depends_on_routing_inputs():
+    # select_chain orders by intent, the budget profile by max_cost: answers from
+    # one chain must not serve the other
+    assert cache_key(_task(temperature=0)) != cache_key(_task("code", temperature=0))
+    assert cache_key(_task(temperature=0)) != cache_key(_task(temperature=0, max_cost=0.01))
+    assert cache_key(_task(temperature=0, cache="force")) == cache_key(_task(temperature=0))
+
+    p = CountingProvider()
+    router = _router(p)
+    router.route(_task(temperature=0))
+    assert router.route(_task("code", temperature=0)).metrics["cache_hit"] is False
+    assert p.calls == 2
+
+
+def test_memory_cache_ttl_and_byte_budget():
+    now = [0.0]
+    c = MemoryCache(ttl_seconds=10.0, max_bytes=30, clock=lambda: now[0])
+    c.set("a", {"v": "x" * 10})
+    c.set("b", {"v": "y" * 10})
+    assert c.get("a") is None  # evicted: budget fits one entry
+    assert c.get("b") == {"v": "y" * 10}
+
+    now[0] = 11.0
+    assert c.get("b") is None
+    assert c.bytes_used == 0
+
+
+def test_sqlite_tier_is_promoted(tmp_path):
+    disk = SqliteCache(str(tmp_path / "cache.db"))
+    disk.set("k", {"provider": "ollama", "result": {"text": "pong"}})
+
+    tiered = TieredCache(MemoryCache(), disk)
+    assert tiered.get("k") == {"provider": "ollama", "result": {"text": "pong"}}
+    assert tiered.memory.get("k") is not None
+    disk.close()
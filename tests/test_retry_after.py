@@ -0,0 +1,100 @@
+import io
+import random
+import time
+import urllib.error
+from dataclasses import dataclass, field
+from email.message import Message
+
+from roaudter_agent.contracts import TaskEnvelope
+from roaudter_agent.policy import RouterPolicy
+from roaudter_agent.router import RouterAgent
+from roaudter_agent.providers.base import ProviderError, ProviderState, retry_after_ms
+from roaudter_agent.providers.openai import OpenAIAdapter
+from roaudter_agent.retry import RetryPolicy
+
+
+def _headers(**kv) -> Message:
+    m = Message()
+    for k, v in kv.items():
+        m[k.replace("_", "-")] = v
+    return m
+
+
+def test_retry_after_header_forms():
+    assert retry_after_ms(_headers(retry_after="2")) == 2000
+    assert retry_after_ms(_headers(retry_after_ms="150")) == 150
+    assert retry_after_ms(_headers(retry_after="Thu, 01 Jan 1970 00:00:10 GMT"), now=4.0) == 6000
+    assert retry_after_ms(_headers(x_ratelimit_reset_requests="1m0.5s", x_ratelimit_reset_tokens="20ms")) == 60500
+    assert retry_after_ms(_headers(anthropic_ratelimit_requests_reset="1970-01-01T00:00:03Z"), now=1.0) == 2000
+    assert retry_after_ms(_headers(retry_after="soon")) is None
+    assert retry_after_ms(None) is None
+
+
+def test_adapter_keeps_headers_in_error_meta():
+    err = urllib.error.HTTPError("u", 429, "Too Many Requests", _headers(retry_after="1"), io.BytesIO(b""))
+    pe = OpenAIAdapter()._call_failed(err, "m")
+    assert pe.code == "rate_limited"
+    assert pe.meta["retry_after_ms"] == 1000
+
+
+def test_decorrelated_jitter_stays_within_bounds():
+    rp = RetryPolicy(max_attempts=10, budget_ms=10_000, base_ms=10, cap_ms=80, rng=random.Random(7))
+    prev = None
+    for attempt in range(1, 9):
+        prev = rp.next_delay_ms(attempt, 0, prev)
+        assert 10 <= prev <= 80
+    assert rp.next_delay_ms(10, 0) is None
+    assert rp.next_delay_ms(1, 10_000) is None
+
+
+@dataclass
+class ThrottledProvider:
+    wait_ms: int
+    name: str = "openai"
+    calls: list = field(default_factory=list)
+
+    def healthcheck(self) -> bool: return True
+
+    def generate(self, task: TaskEnvelope):
+        self.calls.append(time.time())
+        if len(self.calls) == 1:
+            raise ProviderError(
+                "HTTP 429", code="rate_limited", http_status=429, retryable=True,
+                meta={"retry_after_ms": self.wait_ms},
+            )
+        return {"text": "pong-remote"}
+
+
+@dataclass
+class LocalProvider:
+    name: str = "ollama"
+    def healthcheck(self) -> bool: return True
+    def generate(self, task: TaskEnvelope): return {"text": "pong-local"}
+
+
+def _router(p) -> RouterAgent:
+    return RouterAgent(
+        policy=RouterPolicy(default_chain=[]),
+        providers=[ProviderState(p), ProviderState(LocalProvider())],
+        retry=RetryPolicy(budget_ms=500, base_ms=1, cap_ms=2),
+    )
+
+
+def _task() -> TaskEnvelope:
+    return TaskEnvelope(task_id="t1", agent="comm", intent="code", payload={"msg": "ping"})
+
+
+def test_router_honors_short_retry_after():
+    p = ThrottledProvider(wait_ms=60)
+    res = _router(p).route(_task())
+    assert res.provider_used == "openai"
+    assert (p.calls[1] - p.calls[0]) * 1000 >= 55  # not the 1-2ms jitter
+
+
+def test_router_switches_when_retry_after_exceeds_budget():
+    p = ThrottledProvider(wait_ms=30_000)
+    t0 = time.time()
+    res = _router(p).route(_task())
+    assert res.provider_used == "ollama"
+    assert len(p.calls) == 1
+    assert time.time() - t0 < 0.2
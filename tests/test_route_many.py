@@ -0,0 +1,82 @@
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
+
+from roaudter_agent.contracts import TaskEnvelope
+from roaudter_agent.policy import RouterPolicy
+from roaudter_agent.router import RouterAgent
+from roaudter_agent.providers.base import ProviderState
+
+
+@dataclass
+class ConcurrencyProbe:
+    name: str = "ollama"
+    in_flight: int = 0
+    peak: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def healthcheck(self) -> bool: return True
+
+    def _enter(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+
+    def _exit(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def generate(self, task: TaskEnvelope):
+        self._enter()
+        try:
+            time.sleep(float(task.payload["delay"]))
+        finally:
+            self._exit()
+        return {"text": task.task_id}
+
+    async def agenerate(self, task: TaskEnvelope):
+        self._enter()
+        try:
+            await asyncio.sleep(float(task.payload["delay"]))
+        finally:
+            self._exit()
+        return {"text": task.task_id}
+
+
+def _tasks(delays: list[float]) -> list[TaskEnvelope]:
+    return [
+        TaskEnvelope(task_id=f"t{i}", agent="comm", intent="chat", payload={"msg": "ping", "delay": d})
+        for i, d in enumerate(delays)
+    ]
+
+
+def _router(p: ConcurrencyProbe) -> RouterAgent:
+    return RouterAgent(policy=RouterPolicy(default_chain=[]), providers=[ProviderState(p)])
+
+
+def test_route_many_keeps_input_order():
+    router = _router(ConcurrencyProbe())
+    results = router.route_many(_tasks([0.05, 0.0, 0.02]), max_concurrency=3)
+    assert [r.result["text"] for r in results] == ["t0", "t1", "t2"]
+
+
+def test_iter_route_many_yields_in_completion_order():
+    router = _router(ConcurrencyProbe())
+    order = [i for i, _res in router.iter_route_many(_tasks([0.1, 0.0]), max_concurrency=2)]
+    assert order == [1, 0]
+
+
+def test_per_provider_limit_caps_concurrency():
+    p = ConcurrencyProbe()
+    results = _router(p).route_many(_tasks([0.02] * 8), max_concurrency=8, per_provider_limits={"ollama": 2})
+    assert all(r.status == "ok" for r in results)
+    assert p.peak == 2
+
+
+def test_aroute_many_with_limits():
+    p = ConcurrencyProbe()
+    router = _router(p)
+    results = asyncio.run(router.aroute_many(_tasks([0.01] * 10), per_provider_limits={"ollama": 3}))
+    assert [r.result["text"] for r in results] == [f"t{i}" for i in range(10)]
+    assert p.peak == 3
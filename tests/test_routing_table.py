@@ -0,0 +1,60 @@
+from dataclasses import dataclass
+
+from roaudter_agent.contracts import TaskEnvelope
+from roaudter_agent.policy import RouterPolicy
+from roaudter_agent.providers.base import ProviderState
+from roaudter_agent.router import RouterAgent
+
+
+@dataclass
+class P:
+    name: str
+    def healthcheck(self) -> bool: return True
+    def generate(self, task: TaskEnvelope):
+        return {"text": self.name}
+
+
+def _task(intent: str = "chat", hint: str | None = None) -> TaskEnvelope:
+    return TaskEnvelope(task_id="t1", agent="comm", intent=intent, payload={"msg": "ping"}, provider_hint=hint)
+
+
+def _names(chain):
+    return [p.adapter.name for p in chain]
+
+
+def test_chain_is_compiled_once_per_key():
+    policy = RouterPolicy(default_chain=[])
+    providers = (ProviderState(P("openai")), ProviderState(P("ollama")))
+
+    first = policy.select_chain(_task(), providers)
+    assert policy.select_chain(_task(), providers) is first
+    assert _names(first) == ["ollama", "openai"]
+    # intent class and hint are part of the key
+    assert _names(policy.select_chain(_task("patch"), providers)) == ["openai", "ollama"]
+    assert _names(policy.select_chain(_task(hint="openai!"), providers)) == ["openai"]
+
+
+def test_health_flip_selects_a_different_entry():
+    ollama, openai = ProviderState(P("ollama")), ProviderState(P("openai"))
+    router = RouterAgent(policy=RouterPolicy(default_chain=[]), providers=[ollama, openai])
+
+    assert router.route(_task()).provider_used == "ollama"
+    ollama.healthy = False
+    res = router.route(_task())
+    assert res.provider_used == "openai"
+    assert res.selected_chain == ["openai"]
+    ollama.healthy = True
+    assert router.route(_task()).selected_chain == ["ollama", "openai"]
+
+
+def test_runtime_profile_is_read_once(monkeypatch):
+    providers = (ProviderState(P("openai")), ProviderState(P("ollama")))
+    monkeypatch.setenv("ROAUDTER_RUNTIME_PROFILE", "smoke")
+    policy = RouterPolicy(default_chain=[])
+    assert _names(policy.select_chain(_task(), providers))[0] == "ollama"
+
+    monkeypatch.setenv("ROAUDTER_RUNTIME_PROFILE", "best")
+    assert policy.inspect_hint(_task())[0] == "local_only"
+
+    policy.invalidate()
+    assert policy.inspect_hint(_task())[0] == "best"
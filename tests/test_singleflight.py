@@ -0,0 +1,110 @@
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
+
+from roaudter_agent.contracts import TaskEnvelope
+from roaudter_agent.metrics import RouterMetrics
+from roaudter_agent.policy import RouterPolicy
+from roaudter_agent.providers.base import ProviderState
+from roaudter_agent.router import RouterAgent
+
+
+@dataclass
+class SlowProvider:
+    name: str = "ollama"
+    delay_s: float = 0.2
+    calls: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def healthcheck(self) -> bool: return True
+
+    def generate(self, task: TaskEnvelope):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay_s)
+        return {"text": "pong", "usage": {"total_tokens": 2}}
+
+    async def agenerate(self, task: TaskEnvelope):
+        with self._lock:
+            self.calls += 1
+        await asyncio.sleep(self.delay_s)
+        return {"text": "pong"}
+
+
+def _router(p: SlowProvider, metrics=None) -> RouterAgent:
+    return RouterAgent(policy=RouterPolicy(default_chain=[]), providers=[ProviderState(p)], coalesce=True, metrics=metrics)
+
+
+def _task(i: int, intent: str = "chat", **constraints) -> TaskEnvelope:
+    return TaskEnvelope(task_id=f"t{i}", agent="comm", intent=intent, payload={"msg": "ping"}, constraints=constraints)
+
+
+def test_concurrent_identical_tasks_share_one_call():
+    p, m = SlowProvider(), RouterMetrics()
+    results = _router(p, m).route_many([_task(i) for i in range(6)], max_concurrency=6)
+
+    assert p.calls == 1
+    assert [r.task_id for r in results] == [f"t{i}" for i in range(6)]
+    assert all(r.status == "ok" and r.result["text"] == "pong" for r in results)
+    assert sum(1 for r in results if r.metrics["coalesced"]) == 5
+    assert {r.metrics["coalesce_callers"] for r in results} == {6}
+    assert sum(r.attempts for r in results) == 1
+    assert m.coalesced.value(role="leader") == 1
+    assert m.coalesced.value(role="waiter") == 5
+    assert m.routes.value(status="ok") == 6
+
+
+def test_waiter_deadline_and_opt_out():
+    p = SlowProvider(delay_s=0.3)
+    router = _router(p)
+    out = {}
+    leader = threading.Thread(target=lambda: out.setdefault("leader", router.route(_task(0))))
+    leader.start()
+    time.sleep(0.05)
+
+    t0 = time.time()
+    res = router.route(_task(1, deadline_ms=100))
+    assert time.time() - t0 < 0.25
+    assert res.status == "error"
+    assert res.error["code"] == "deadline_exceeded"
+
+    assert router.route(_task(2, coalesce=False)).status == "ok"
+    leader.join()
+    assert out["leader"].status == "ok"
+    assert p.calls == 2
+
+
+def test_async_path_coalesces_per_loop():
+    p = SlowProvider(delay_s=0.1)
+    router = _router(p)
+
+    async def main():
+        return await asyncio.gather(*(router.aroute(_task(i)) for i in range(5)))
+
+    results = asyncio.run(main())
+    assert p.calls == 1
+    assert sorted(r.metrics["coalesced"] for r in results) == [False, True, True, True, True]
+    assert [r.task_id for r in results] == [f"t{i}" for i in range(5)]
+
+
+def test_waiters_get_their_own_result_copy():
+    results = _router(SlowProvider()).route_many([_task(i) for i in range(3)], max_concurrency=3)
+    leader = next(r for r in results if not r.metrics["coalesced"])
+    waiter = next(r for r in results if r.metrics["coalesced"])
+
+    waiter.result["text"] = "edited"
+    waiter.result["usage"]["total_tokens"] = 99
+    waiter.usage["total_tokens"] = 99
+    assert leader.result["text"] == "pong"
+    assert leader.result["usage"] == {"total_tokens": 2}
+    assert leader.usage == {"total_tokens": 2}
+
+
+def test_tasks_routed_differently_are_not_coalesced():
+    p = SlowProvider()
+    tasks = [_task(0), _task(1, "code"), _task(2, max_cost=0.01), _task(3, tenant="acme")]
+    results = _router(p).route_many(tasks, max_concurrency=4)
+
+    assert p.calls == 4
+    assert not any(r.metrics["coalesced"] for r in results)
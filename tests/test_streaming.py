@@ -0,0 +1,162 @@
+import threading
+import time
+from dataclasses import dataclass
+
+from roaudter_agent.contracts import TaskEnvelope
+from roaudter_agent.deadline import remaining_s
+from roaudter_agent.lam_entrypoint import RoaudterComAgent
+from roaudter_agent.policy import RouterPolicy
+from roaudter_agent.router import RouterAgent
+from roaudter_agent.providers.base import ProviderError, ProviderState
+from roaudter_agent.providers.ollama import OllamaAdapter
+from roaudter_agent.providers.openai import OpenAIAdapter
+from roaudter_agent.providers.streaming import anthropic_chunks, gemini_chunks
+from roaudter_agent.stub_server import StubLLMServer
+from roaudter_agent.transport import PooledTransport
+
+
+def _task() -> TaskEnvelope:
+    return TaskEnvelope(task_id="t1", agent="comm", intent="chat", payload={"msg": "ping"})
+
+
+def _drain(router: RouterAgent):
+    events = list(router.route_stream(_task()))
+    deltas = [e["text"] for e in events if e["event"] == "delta"]
+    assert events[-1]["event"] == "result"
+    return deltas, events[-1]["result"]
+
+
+def test_openai_sse_stream_through_router(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    with StubLLMServer(reply="hello streaming world") as srv:
+        adapter = OpenAIAdapter(base_url=srv.base_url + "/v1", transport=PooledTransport())
+        router = RouterAgent(policy=RouterPolicy(default_chain=[]), providers=[ProviderState(adapter)])
+        deltas, res = _drain(router)
+
+    assert deltas == ["hello ", "streaming ", "world"]
+    assert res.status == "ok"
+    assert res.result["text"] == "hello streaming world"
+    assert res.tokens == 2
+    assert res.metrics["streamed"] is True
+    assert isinstance(res.metrics["ttft_ms"], int)
+    assert srv.requests[0]["body"]["stream"] is True
+
+
+def test_ollama_ndjson_stream(monkeypatch):
+    monkeypatch.setenv("ROAUDTER_OFFLINE_TEST_MODE", "0")
+    with StubLLMServer(reply="a b") as srv:
+        adapter = OllamaAdapter(base_url=srv.base_url, transport=PooledTransport())
+        chunks = list(adapter.stream(_task()))
+
+    assert [c["delta"] for c in chunks if "delta" in c] == ["a ", "b"]
+    assert chunks[-1]["usage"]["total_tokens"] == 2
+
+
+def test_anthropic_and_gemini_event_parsing():
+    claude_lines = [
+        b"event: message_start",
+        b'data: {"type":"message_start","message":{"model":"c","usage":{"input_tokens":3}}}',
+        b"",
+        b"event: content_block_delta",
+        b'data: {"type":"content_block_delta","delta":{"type":"text_delta","text":"Hi"}}',
+        b"",
+        b"event: message_delta",
+        b'data: {"type":"message_delta","usage":{"output_tokens":1}}',
+        b"",
+    ]
+    assert list(anthropic_chunks(claude_lines)) == [
+        {"delta": "Hi"},
+        {"usage": {"input_tokens": 3, "output_tokens": 1}, "model": "c"},
+    ]
+
+    gemini_lines = [
+        b'data: {"candidates":[{"content":{"parts":[{"text":"Yo"}]}}],'
+        b'"usageMetadata":{"promptTokenCount":3,"candidatesTokenCount":1,"totalTokenCount":4}}',
+        b"",
+    ]
+    assert list(gemini_chunks(gemini_lines)) == [
+        {"delta": "Yo"},
+        {"usage": {"prompt_tokens": 3, "completion_tokens": 1, "total_tokens": 4}},
+    ]
+
+
+@dataclass
+class FailingStream:
+    name: str = "ollama"
+    def healthcheck(self) -> bool: return True
+    def generate(self, task): raise AssertionError("unused")
+    def stream(self, task):
+        raise ProviderError("down", code="http_error", http_status=500, retryable=False)
+        yield  # pragma: no cover
+
+
+@dataclass
+class PlainProvider:
+    name: str = "openai"
+    def healthcheck(self) -> bool: return True
+    def generate(self, task): return {"text": "whole reply", "usage": {"total_tokens": 5}}
+
+
+def test_falls_back_before_first_token_and_degrades_non_streaming_adapter():
+    router = RouterAgent(
+        policy=RouterPolicy(default_chain=[]),
+        providers=[ProviderState(FailingStream()), ProviderState(PlainProvider())],
+    )
+    deltas, res = _drain(router)
+
+    assert deltas == ["whole reply"]
+    assert res.provider_used == "openai"
+    assert res.errors[0]["provider"] == "ollama"
+
+
+def test_com_agent_answer_stream():
+    agent = RoaudterComAgent()
+    agent.router = RouterAgent(policy=RouterPolicy(default_chain=[]), providers=[ProviderState(PlainProvider())])
+    events = list(agent.answer_stream({"task_id": "t9", "msg": "ping"}))
+
+    assert events[0] == {"event": "delta", "task_id": "t9", "provider": "openai", "text": "whole reply"}
+    assert events[-1]["event"] == "reply"
+    assert events[-1]["reply"]["status"] == "ok"
+    assert events[-1]["reply"]["task_id"] == "t9"
+
+
+@dataclass
+class DeadlineProbe:
+    name: str = "probe"
+    seen: list = None
+    def healthcheck(self) -> bool: return True
+    def stream(self, task):
+        for word in ("a ", "b ", "c"):
+            self.seen.append(remaining_s())
+            yield {"delta": word}
+    def generate(self, task):
+        self.seen.append(remaining_s())
+        return {"text": "ok"}
+
+
+def test_abandoned_stream_does_not_leak_its_deadline():
+    p = DeadlineProbe(seen=[])
+    router = RouterAgent(policy=RouterPolicy(default_chain=[]), providers=[ProviderState(p)])
+    task = TaskEnvelope(task_id="t1", agent="comm", intent="chat", payload={"msg": "ping"},
+                        constraints={"deadline_ms": 20})
+    stream = router.route_stream(task)
+    assert next(stream)["text"] == "a "
+    assert p.seen[-1] is not None
+
+    # consumer walks away mid-stream but keeps the generator; the deadline passes
+    time.sleep(0.03)
+    res = router.route(_task())
+    assert res.status == "ok"
+    assert p.seen[-1] is None
+
+    # finalized from another thread/context: no "created in a different Context"
+    errors = []
+    def close():
+        try:
+            stream.close()
+        except Exception as e:  # pragma: no cover - the regression
+            errors.append(e)
+    t = threading.Thread(target=close)
+    t.start()
+    t.join()
+    assert errors == []
@@ -0,0 +1,43 @@
+from roaudter_agent.contracts import TaskEnvelope
+from roaudter_agent.providers.base import ProviderError
+from roaudter_agent.providers.claude import ClaudeAdapter
+from roaudter_agent.providers.gemini import GeminiAdapter
+from roaudter_agent.providers.openai import OpenAIAdapter
+from roaudter_agent.stub_server import StubFaults, StubLLMServer
+from roaudter_agent.transport import PooledTransport
+
+
+def _task() -> TaskEnvelope:
+    return TaskEnvelope(task_id="t1", agent="comm", intent="chat", payload={"msg": "ping"})
+
+
+def test_anthropic_and_gemini_endpoints(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+    monkeypatch.setenv("GEMINI_API_KEY", "test")
+    with StubLLMServer(reply="hi there") as srv:
+        claude = ClaudeAdapter(base_url=srv.base_url + "/v1", transport=PooledTransport())
+        gemini = GeminiAdapter(base_url=srv.base_url, transport=PooledTransport())
+
+        assert claude.generate(_task())["text"] == "hi there"
+        out = gemini.generate(_task())
+        assert out["text"] == "hi there"
+        assert out["usage"] == {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+        lean = GeminiAdapter(base_url=srv.base_url, keep_raw=False, transport=PooledTransport())
+        assert lean.generate(_task())["usage"] == out["usage"]
+        assert "".join(c.get("delta", "") for c in claude.stream(_task())) == "hi there"
+        chunks = list(gemini.stream(_task()))
+        assert "".join(c.get("delta", "") for c in chunks) == "hi there"
+        assert chunks[-1]["usage"]["completion_tokens"] == 1
+
+
+def test_fault_injection_with_retry_after(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    with StubLLMServer(faults=StubFaults(rate_429=1.0, retry_after_s=0.25)) as srv:
+        adapter = OpenAIAdapter(base_url=srv.base_url + "/v1", transport=PooledTransport())
+        try:
+            adapter.generate(_task())
+            raise AssertionError("expected an injected 429")
+        except ProviderError as e:
+            assert e.code == "rate_limited"
+            assert e.meta["retry_after_ms"] == 250
+    assert srv.injected == {"429": 1, "5xx": 0}
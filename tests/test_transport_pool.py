@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+from roaudter_agent.contracts import TaskEnvelope
+from roaudter_agent.deadline import deadline_scope
+from roaudter_agent.providers.base import ProviderError
+from roaudter_agent.providers.deepseek import DeepSeekAdapter
+from roaudter_agent.providers.openai import OpenAIAdapter
+from roaudter_agent.stub_server import StubFaults, StubLLMServer
+from roaudter_agent.transport import PoolConfig, PooledTransport
+
+
+def _task() -> TaskEnvelope:
+    return TaskEnvelope(task_id="t1", agent="comm", intent="chat", payload={"msg": "ping"})
+
+
+def test_keep_alive_connection_is_reused(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    transport = PooledTransport()
+    with StubLLMServer() as srv:
+        a = OpenAIAdapter(base_url=srv.base_url + "/v1", transport=transport)
+        outs = [a.generate(_task()) for _ in range(5)]
+
+    assert [o["text"] for o in outs] == ["pong"] * 5
+    assert len(srv.requests) == 5
+    assert srv.connections == 1
+    assert transport.connections_opened == 1
+    transport.close()
+
+
+def test_idle_connections_are_evicted(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    transport = PooledTransport(PoolConfig(idle_timeout_seconds=0.0))
+    with StubLLMServer() as srv:
+        a = OpenAIAdapter(base_url=srv.base_url + "/v1", transport=transport)
+        a.generate(_task())
+        a.generate(_task())
+        assert transport.evict_idle() == 1
+
+    assert srv.connections == 2
+    assert transport.idle_count() == 0
+
+
+def test_http_error_status_is_mapped(monkeypatch):
+    monkeypatch.setenv("DEEPSEEK_API_KEY", "test")
+    transport = PooledTransport()
+    with StubLLMServer() as srv:
+        a = DeepSeekAdapter(base_url_default=srv.base_url + "/missing", transport=transport)
+        monkeypatch.delenv("DEEPSEEK_BASE_URL", raising=False)
+        try:
+            a.generate(_task())
+            raise AssertionError("expected ProviderError")
+        except ProviderError as e:
+            assert e.http_status == 404
+            assert e.retryable is False
+    transport.close()
+
+
+def test_async_requests_share_the_pool_and_map_errors(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("DEEPSEEK_API_KEY", "test")
+    monkeypatch.delenv("DEEPSEEK_BASE_URL", raising=False)
+    transport = PooledTransport()
+    with StubLLMServer() as srv, StubLLMServer(faults=StubFaults(latency_ms=500)) as slow:
+        ok = OpenAIAdapter(base_url=srv.base_url + "/v1", transport=transport)
+        missing = DeepSeekAdapter(base_url_default=srv.base_url + "/missing", transport=transport)
+        hung = OpenAIAdapter(base_url=slow.base_url + "/v1", transport=transport)
+
+        async def main():
+            outs = [await ok.agenerate(_task()) for _ in range(3)]
+            errors = []
+            try:
+                await missing.agenerate(_task())
+            except ProviderError as e:
+                errors.append(e)
+            with deadline_scope(time.time() + 0.05):
+                try:
+                    await hung.agenerate(_task())
+                except ProviderError as e:
+                    errors.append(e)
+            await transport.aclose()
+            return outs, errors
+
+        outs, (not_found, timed_out) = asyncio.run(main())
+
+    assert [o["text"] for o in outs] == ["pong"] * 3
+    assert outs[0]["usage"]["total_tokens"] == 2
+    assert srv.connections == 1  # keep-alive reuse, the 404 included
+    assert not_found.http_status == 404 and not_found.retryable is False
+    assert timed_out.code == "network_error" and timed_out.retryable is True